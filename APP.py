@@ -1,33 +1,53 @@
 import customtkinter as ctk
-from tkinter import messagebox, filedialog
+from tkinter import filedialog
 import threading
-import queue
-import time
 import serial
 import serial.tools.list_ports
+from serial_reader import READER_MODES
+from serial_transport import READER_ASYNCIO, default_serial_mode
+from gui_bridge import GuiBridge
+from toast import ToastManager
+from capture_file import CaptureFile, SCROLLBACK_CHOICES
+from virtual_log import VirtualLog
+from log_view import VirtualLogView
+from search import compile_pattern, KeywordIndex, RecordSearch, SearchError, SEARCH_MODES
+from telemetry import TelemetryBuffer, NUMPY_AVAILABLE
+from plot_view import TelemetryPlot
+from animation import Animator
+from framing import make_framer, FRAMER_CHOICES, FramingError
+from disk_logger import DiskLogger
+from exporters import ExportJob, ExportCancelled, EXPORT_FORMATS, exporter_for_path
+from capture_session import CaptureSession, EVENT_LOST, EVENT_RECONNECTING, EVENT_RECONNECTED, EVENT_CLOSED
+from serial_hub import SerialHub
+from session_store import load_session, save_session
 from datetime import datetime
-import asyncio
-import sys
-from PIL import Image, ImageTk
-import tkinter as tk
 
-# Try to import bleak for modern Bluetooth support
-try:
-    import bleak
-    from bleak import BleakScanner, BleakClient
-    BLEAK_AVAILABLE = True
-    print("Bleak successfully imported!")
-except ImportError as e:
-    BLEAK_AVAILABLE = False
-    print(f"Bleak import failed: {e}")
-except Exception as e:
-    BLEAK_AVAILABLE = False
-    print(f"Bleak import error: {e}")
+# Modern Bluetooth support comes from bleak, driven by one long-lived service loop.
+# Only availability is checked here; bleak itself loads when BLE is first used.
+from ble_service import BleService, BLEAK_AVAILABLE
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
 
+# Name of the remembered device/settings file
+SESSION_NAME = "serial_app"
+
+# View choice that shows every source interleaved
+ALL_SOURCES = "All sources"
+
+# Telemetry plot redraw rate (frames per second)
+PLOT_FPS = 20
+
+# Typing pause before the filter bar pattern is applied (ms)
+SEARCH_DELAY = 300
+
+# Capture size kept on disk until the user picks another (a SCROLLBACK_CHOICES label)
+DEFAULT_SCROLLBACK = "1 GB"
+
+# Delay before the first device scan, so the window is drawn first (ms)
+INITIAL_SCAN_DELAY = 200
+
 class ModernBluetoothApp:
     def __init__(self, root):
         self.root = root
@@ -35,14 +55,49 @@ class ModernBluetoothApp:
         self.root.geometry("1100x800")
         self.root.minsize(900, 600)
         
-        # Connection variables
-        self.connection = None
+        # Connection variables; the main connection is a CaptureSession like the extra ones
+        self.session = None
         self.connected = False
-        self.receive_thread = None
-        self.data_queue = queue.Queue()
+        self.disk_logger = None
+        self.export_job = None
+        self.ble_service = None
+        self.ble_list_pending = False
+        # Capture history lives in a memory-mapped file; the monitor draws visible rows only
+        self.capture_store = CaptureFile(max_bytes=SCROLLBACK_CHOICES[DEFAULT_SCROLLBACK])
+        self.data_log = VirtualLog(self.capture_store, background=True)
+        
+        # Search and live filter; matches are found by worker threads
+        self.keyword_index = KeywordIndex(self.capture_store)
+        self.search = None
+        self.search_pattern = None
+        self.search_record = None
+        self.search_job = None
+        
+        # Numeric fields of received records, plotted at a fixed frame rate once enabled
+        self.telemetry = None
+        self.animator = Animator(self.root, fps=PLOT_FPS)
+        
         self.connection_type = "serial"
+        
+        # Extra capture sessions sharing the store; the main connection is source 0
+        self.sessions = {}
+        self.source_names = {0: "main"}
+        self.next_source = 1
+        self.view_source = None
+        self.serial_hub = None
         self.data_count = 0
         
+        # Worker threads and the I/O loop hand results to the Tk thread through here
+        self.bridge = GuiBridge()
+        
+        # Time to recover (s) of each auto-reconnect of the main connection
+        self.recovery_times = []
+        self.last_device = None
+        
+        # GUI refresh budget
+        self.gui_update_interval = 100
+        self.gui_busy_interval = 10
+        
         # Configure grid
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_rowconfigure(0, weight=1)
@@ -51,11 +106,17 @@ class ModernBluetoothApp:
         self.create_sidebar()
         self.create_main_content()
         
+        # One pooled, rate-limited toast for every notification
+        self.toasts = ToastManager(self.root, self.main_frame)
+        
+        # Restore the last used device and settings
+        self.restore_session()
+        
         # Start GUI update loop
         self.update_gui()
         
-        # Initial scan
-        self.scan_devices()
+        # Initial scan, once the window is up
+        self.root.after(INITIAL_SCAN_DELAY, self.scan_devices)
         
     def create_sidebar(self):
         """Create the left sidebar with controls"""
@@ -96,9 +157,17 @@ class ModernBluetoothApp:
         self.device_combo = ctk.CTkComboBox(self.sidebar_frame, width=300, state="readonly")
         self.device_combo.grid(row=6, column=0, padx=20, pady=5)
         
-        self.scan_btn = ctk.CTkButton(self.sidebar_frame, text="🔍 Scan Devices", 
-                                     command=self.scan_devices, width=300)
-        self.scan_btn.grid(row=7, column=0, padx=20, pady=10)
+        self.scan_frame = ctk.CTkFrame(self.sidebar_frame, fg_color="transparent")
+        self.scan_frame.grid(row=7, column=0, padx=20, pady=10)
+        
+        self.scan_btn = ctk.CTkButton(self.scan_frame, text="🔍 Scan Devices", 
+                                     command=self.scan_devices, width=190)
+        self.scan_btn.grid(row=0, column=0, padx=(0, 10))
+        
+        # Capture the selected device alongside the main connection
+        self.add_session_btn = ctk.CTkButton(self.scan_frame, text="➕ Session",
+                                            command=self.add_session, width=100)
+        self.add_session_btn.grid(row=0, column=1)
         
         # Serial settings frame (initially visible)
         self.serial_settings_frame = ctk.CTkFrame(self.sidebar_frame)
@@ -119,23 +188,71 @@ class ModernBluetoothApp:
         self.databits_combo.set("8")
         self.databits_combo.grid(row=2, column=1, padx=5, pady=2)
         
+        ctk.CTkLabel(self.serial_settings_frame, text="Reader:").grid(row=3, column=0, padx=5, pady=2, sticky="w")
+        self.reader_mode_combo = ctk.CTkComboBox(self.serial_settings_frame,
+                                                 values=[m.capitalize() for m in [READER_ASYNCIO] + READER_MODES],
+                                                 width=100)
+        self.reader_mode_combo.set(default_serial_mode().capitalize())
+        self.reader_mode_combo.grid(row=3, column=1, padx=5, pady=2)
+        
+        # BLE settings frame (shown in BLE mode)
+        self.ble_settings_frame = ctk.CTkFrame(self.sidebar_frame)
+        self.ble_settings_frame.grid(row=8, column=0, padx=20, pady=10, sticky="ew")
+        
+        ctk.CTkLabel(self.ble_settings_frame, text="BLE Settings", 
+                    font=ctk.CTkFont(size=14, weight="bold")).grid(row=0, column=0, columnspan=2, pady=5)
+        
+        ctk.CTkLabel(self.ble_settings_frame, text="Notify UUID:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.ble_uuid_combo = ctk.CTkComboBox(self.ble_settings_frame, values=["Auto"], width=180)
+        self.ble_uuid_combo.set("Auto")
+        self.ble_uuid_combo.grid(row=1, column=1, padx=5, pady=2)
+        
+        ctk.CTkLabel(self.ble_settings_frame, text="Stop scan at:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.ble_target_entry = ctk.CTkEntry(self.ble_settings_frame, width=180,
+                                             placeholder_text="name / address / UUID")
+        self.ble_target_entry.grid(row=2, column=1, padx=5, pady=2)
+        self.ble_settings_frame.grid_remove()
+        
+        # Framing settings frame (applies to every connection type)
+        self.framing_frame = ctk.CTkFrame(self.sidebar_frame)
+        self.framing_frame.grid(row=9, column=0, padx=20, pady=10, sticky="ew")
+        
+        ctk.CTkLabel(self.framing_frame, text="Message Framing", 
+                    font=ctk.CTkFont(size=14, weight="bold")).grid(row=0, column=0, columnspan=2, pady=5)
+        
+        ctk.CTkLabel(self.framing_frame, text="Framing:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.framing_combo = ctk.CTkComboBox(self.framing_frame, values=list(FRAMER_CHOICES), width=140)
+        self.framing_combo.set("Line (\\n)")
+        self.framing_combo.grid(row=1, column=1, padx=5, pady=2)
+        
+        ctk.CTkLabel(self.framing_frame, text="Parameter:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.framing_param_entry = ctk.CTkEntry(self.framing_frame, width=140,
+                                                placeholder_text="delimiter (\\r\\n, 0x0D0A) / length")
+        self.framing_param_entry.grid(row=2, column=1, padx=5, pady=2)
+        
         # Connection section
         self.connection_label = ctk.CTkLabel(self.sidebar_frame, text="Connection", 
                                            font=ctk.CTkFont(size=16, weight="bold"))
-        self.connection_label.grid(row=9, column=0, padx=20, pady=(20, 5), sticky="w")
+        self.connection_label.grid(row=10, column=0, padx=20, pady=(20, 5), sticky="w")
         
         self.connect_btn = ctk.CTkButton(self.sidebar_frame, text="🔌 Connect", 
                                         command=self.toggle_connection, width=300, height=40,
                                         font=ctk.CTkFont(size=14, weight="bold"))
-        self.connect_btn.grid(row=10, column=0, padx=20, pady=10)
+        self.connect_btn.grid(row=11, column=0, padx=20, pady=10)
+        
+        self.auto_reconnect_var = ctk.BooleanVar(value=True)
+        self.auto_reconnect_switch = ctk.CTkSwitch(self.sidebar_frame, text="Auto-reconnect",
+                                                   variable=self.auto_reconnect_var,
+                                                   command=self.on_auto_reconnect_change)
+        self.auto_reconnect_switch.grid(row=12, column=0, padx=20, pady=5)
         
         self.status_label = ctk.CTkLabel(self.sidebar_frame, text="🔴 Disconnected", 
                                         font=ctk.CTkFont(size=12))
-        self.status_label.grid(row=11, column=0, padx=20, pady=5)
+        self.status_label.grid(row=13, column=0, padx=20, pady=5)
         
         # Statistics section
         self.stats_frame = ctk.CTkFrame(self.sidebar_frame)
-        self.stats_frame.grid(row=12, column=0, padx=20, pady=20, sticky="ew")
+        self.stats_frame.grid(row=14, column=0, padx=20, pady=20, sticky="ew")
         
         ctk.CTkLabel(self.stats_frame, text="Statistics", 
                     font=ctk.CTkFont(size=14, weight="bold")).grid(row=0, column=0, columnspan=2, pady=5)
@@ -146,6 +263,15 @@ class ModernBluetoothApp:
         self.connection_time_label = ctk.CTkLabel(self.stats_frame, text="Connected: --:--:--")
         self.connection_time_label.grid(row=2, column=0, columnspan=2, pady=2)
         
+        self.disk_log_label = ctk.CTkLabel(self.stats_frame, text="Logged: off")
+        self.disk_log_label.grid(row=3, column=0, columnspan=2, pady=2)
+        
+        self.recovery_label = ctk.CTkLabel(self.stats_frame, text="Recoveries: 0")
+        self.recovery_label.grid(row=4, column=0, columnspan=2, pady=2)
+        
+        self.sessions_label = ctk.CTkLabel(self.stats_frame, text="Sessions: none", wraplength=280)
+        self.sessions_label.grid(row=5, column=0, columnspan=2, pady=2)
+        
     def create_main_content(self):
         """Create the main content area"""
         # Main content frame
@@ -173,26 +299,94 @@ class ModernBluetoothApp:
         self.format_label.grid(row=0, column=0, padx=(0, 5))
         
         self.display_format = ctk.StringVar(value="text")
-        self.format_combo = ctk.CTkComboBox(self.controls_frame, values=["Text", "Hex"], 
+        self.format_combo = ctk.CTkComboBox(self.controls_frame, values=["Text", "Hex", "Hexdump"], 
                                            width=80, command=self.on_format_change)
         self.format_combo.set("Text")
         self.format_combo.grid(row=0, column=1, padx=5)
         
+        # Scrollback limit
+        self.scrollback_label = ctk.CTkLabel(self.controls_frame, text="Scrollback:")
+        self.scrollback_label.grid(row=0, column=2, padx=(10, 5))
+        
+        self.scrollback_combo = ctk.CTkComboBox(self.controls_frame, values=list(SCROLLBACK_CHOICES),
+                                               width=110, command=self.on_scrollback_change)
+        self.scrollback_combo.set(DEFAULT_SCROLLBACK)
+        self.scrollback_combo.grid(row=0, column=3, padx=5)
+        
         # Auto-scroll switch
         self.auto_scroll_var = ctk.BooleanVar(value=True)
         self.auto_scroll_switch = ctk.CTkSwitch(self.controls_frame, text="Auto-scroll",
                                                variable=self.auto_scroll_var)
-        self.auto_scroll_switch.grid(row=0, column=2, padx=10)
+        self.auto_scroll_switch.grid(row=0, column=4, padx=10)
+        
+        # Per-source view when several sessions are captured
+        self.view_label = ctk.CTkLabel(self.controls_frame, text="View:")
+        self.view_label.grid(row=0, column=5, padx=(10, 5))
+        
+        self.view_combo = ctk.CTkComboBox(self.controls_frame, values=[ALL_SOURCES],
+                                         width=140, command=self.on_view_change, state="readonly")
+        self.view_combo.set(ALL_SOURCES)
+        self.view_combo.grid(row=0, column=6, padx=5)
+        
+        self.close_session_btn = ctk.CTkButton(self.controls_frame, text="✖", width=30,
+                                              command=self.close_viewed_session, state="disabled")
+        self.close_session_btn.grid(row=0, column=7, padx=(0, 5))
+        
+        # Live plot of numeric fields
+        self.plot_var = ctk.BooleanVar(value=False)
+        self.plot_switch = ctk.CTkSwitch(self.controls_frame, text="📈 Plot",
+                                        variable=self.plot_var, command=self.toggle_plot)
+        self.plot_switch.grid(row=0, column=8, padx=10)
         
         # Data display area
         self.data_frame = ctk.CTkFrame(self.main_frame)
         self.data_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
         self.data_frame.grid_columnconfigure(0, weight=1)
-        self.data_frame.grid_rowconfigure(0, weight=1)
+        self.data_frame.grid_rowconfigure(1, weight=1)
+        
+        # Filter bar: search history and optionally show matching records only
+        self.search_frame = ctk.CTkFrame(self.data_frame, fg_color="transparent")
+        self.search_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(15, 0))
+        self.search_frame.grid_columnconfigure(0, weight=1)
+        
+        self.search_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Search text, regex or hex bytes")
+        self.search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
+        self.search_entry.bind("<Return>", lambda e: self.apply_search())
+        
+        self.search_mode_combo = ctk.CTkComboBox(self.search_frame, values=SEARCH_MODES, width=90,
+                                                command=lambda choice: self.apply_search(), state="readonly")
+        self.search_mode_combo.set(SEARCH_MODES[0])
+        self.search_mode_combo.grid(row=0, column=1, padx=5)
+        
+        self.search_case_var = ctk.BooleanVar(value=False)
+        self.search_case_switch = ctk.CTkSwitch(self.search_frame, text="Match case",
+                                               variable=self.search_case_var, command=self.apply_search)
+        self.search_case_switch.grid(row=0, column=2, padx=5)
         
-        # Text area with scrollbar
-        self.data_textbox = ctk.CTkTextbox(self.data_frame, font=ctk.CTkFont(family="Consolas", size=12))
-        self.data_textbox.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
+        self.filter_var = ctk.BooleanVar(value=False)
+        self.filter_switch = ctk.CTkSwitch(self.search_frame, text="Filter",
+                                          variable=self.filter_var, command=self.rerender_data)
+        self.filter_switch.grid(row=0, column=3, padx=5)
+        
+        self.prev_match_btn = ctk.CTkButton(self.search_frame, text="◀", width=30,
+                                           command=lambda: self.find_match(-1))
+        self.prev_match_btn.grid(row=0, column=4, padx=(5, 2))
+        
+        self.next_match_btn = ctk.CTkButton(self.search_frame, text="▶", width=30,
+                                           command=lambda: self.find_match(1))
+        self.next_match_btn.grid(row=0, column=5, padx=(2, 5))
+        
+        self.search_status_label = ctk.CTkLabel(self.search_frame, text="", width=190, anchor="w")
+        self.search_status_label.grid(row=0, column=6, padx=5)
+        
+        # Virtual-scrolling view: only the rows on screen exist in the widget
+        self.data_view = VirtualLogView(self.data_frame, self.data_log,
+                                        font=ctk.CTkFont(family="Consolas", size=12))
+        self.data_view.grid(row=1, column=0, sticky="nsew", padx=20, pady=20)
+        
+        # Telemetry plot below the monitor (shown by the Plot switch)
+        self.plot_view = TelemetryPlot(self.data_frame)
         
         # Bottom controls
         self.bottom_controls = ctk.CTkFrame(self.main_frame, height=50)
@@ -206,7 +400,7 @@ class ModernBluetoothApp:
                                      command=self.save_data, width=120)
         self.save_btn.grid(row=0, column=1, padx=10, pady=10)
         
-        self.export_btn = ctk.CTkButton(self.bottom_controls, text="📤 Export CSV", 
+        self.export_btn = ctk.CTkButton(self.bottom_controls, text="📤 Export", 
                                        command=self.export_csv, width=120)
         self.export_btn.grid(row=0, column=2, padx=10, pady=10)
         
@@ -215,18 +409,178 @@ class ModernBluetoothApp:
                                       command=self.toggle_theme, width=120)
         self.theme_btn.grid(row=0, column=3, padx=10, pady=10)
         
+        # Continuous capture to disk
+        self.disk_log_var = ctk.BooleanVar(value=False)
+        self.disk_log_switch = ctk.CTkSwitch(self.bottom_controls, text="Log to Disk",
+                                            variable=self.disk_log_var, command=self.toggle_disk_logging)
+        self.disk_log_switch.grid(row=0, column=4, padx=10, pady=10)
+        
+        # Export progress (shown while an export runs)
+        self.export_progress = ctk.CTkProgressBar(self.bottom_controls, width=120)
+        self.export_progress.set(0)
+        
     def on_connection_type_change(self):
         """Handle connection type change"""
+        self.show_connection_settings()
+        self.scan_devices()
+        
+    def show_connection_settings(self):
+        """Show the settings frame for the selected connection type"""
         self.connection_type = self.conn_type_var.get()
         if self.connection_type == "serial":
+            self.ble_settings_frame.grid_remove()
             self.serial_settings_frame.grid()
         else:
             self.serial_settings_frame.grid_remove()
-        self.scan_devices()
+            self.ble_settings_frame.grid()
+            
+    def session_settings(self):
+        """Settings remembered between runs"""
+        return {
+            "connection_type": self.connection_type,
+            "device": self.device_combo.get(),
+            "baudrate": self.baud_combo.get(),
+            "databits": self.databits_combo.get(),
+            "reader_mode": self.reader_mode_combo.get(),
+            "framing": self.framing_combo.get(),
+            "framing_param": self.framing_param_entry.get(),
+            "ble_uuid": self.ble_uuid_combo.get(),
+            "ble_target": self.ble_target_entry.get(),
+            "display_format": self.display_format.get(),
+            "auto_reconnect": self.auto_reconnect_var.get(),
+        }
+        
+    def restore_session(self):
+        """Apply the settings and last device saved by a previous run"""
+        session = load_session(SESSION_NAME)
+        if not session:
+            return
+        if session.get("connection_type") in ("serial", "ble"):
+            self.conn_type_var.set(session["connection_type"])
+            self.show_connection_settings()
+        for combo, key in ((self.baud_combo, "baudrate"), (self.databits_combo, "databits"),
+                           (self.reader_mode_combo, "reader_mode"), (self.framing_combo, "framing"),
+                           (self.ble_uuid_combo, "ble_uuid")):
+            if session.get(key):
+                combo.set(session[key])
+        for entry, key in ((self.framing_param_entry, "framing_param"), (self.ble_target_entry, "ble_target")):
+            if session.get(key):
+                entry.insert(0, session[key])
+        # Through the combo's handler, so the combo, the view and exports all agree
+        choice = str(session.get("display_format", "")).capitalize()
+        if choice in self.format_combo.cget("values"):
+            self.format_combo.set(choice)
+            self.on_format_change(choice)
+        self.auto_reconnect_var.set(session.get("auto_reconnect", True))
+        
+        # The last device can be connected to directly, without waiting for a scan
+        self.last_device = session.get("device") or None
+        if self.last_device:
+            self.device_combo.configure(values=[self.last_device])
+            self.device_combo.set(self.last_device)
         
     def on_format_change(self, choice):
         """Handle display format change"""
         self.display_format.set(choice.lower())
+        self.rerender_data()
+        
+    def on_scrollback_change(self, choice):
+        """Limit how much history the capture keeps on disk; the oldest records go first"""
+        self.capture_store.set_limits(max_bytes=SCROLLBACK_CHOICES[choice])
+        self.data_view.redraw()
+        
+    def on_view_change(self, choice):
+        """Show one source or all of them"""
+        sources = {name: source for source, name in self.source_names.items()}
+        self.view_source = sources.get(choice)
+        self.close_session_btn.configure(state="normal" if self.view_source in self.sessions else "disabled")
+        self.apply_search()
+        
+    def source_labels(self):
+        """Source names for tagging lines, or None while only one source exists"""
+        return dict(self.source_names) if self.sessions else None
+        
+    def view_predicate(self):
+        """Which records the monitor shows: the viewed source, narrowed by the live filter"""
+        source = self.view_source
+        if self.filter_var.get() and self.search_pattern:
+            return self.search_pattern.matcher(source)
+        if source is None:
+            return None
+        return lambda timestamp, data, s: s == source
+        
+    def rerender_data(self):
+        """Re-render the visible rows with the current format, labels, source view and filter"""
+        predicate = self.view_predicate()
+        if predicate is None and self.data_log.predicate is None:
+            predicate = False  # Unchanged; keeps the row index
+        self.data_log.configure(display_format=self.display_format.get(),
+                                labels=self.source_labels(), predicate=predicate)
+        self.data_view.refresh(self.auto_scroll_var.get())
+        self.data_view.redraw(force=True)
+        
+    def on_search_typed(self, event):
+        """Apply the pattern once typing pauses"""
+        if event.keysym == "Return":
+            return
+        if self.search_job:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY, self.apply_search)
+        
+    def apply_search(self):
+        """Start a background search for the filter bar pattern and re-apply the live filter"""
+        if self.search_job:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+        if self.search:
+            self.search.cancel()
+            self.search = None
+        self.search_pattern = None
+        self.search_record = None
+        self.data_view.show_row(None)
+        
+        text = self.search_entry.get()
+        if text:
+            try:
+                self.search_pattern = compile_pattern(text, self.search_mode_combo.get(),
+                                                      not self.search_case_var.get())
+            except SearchError as e:
+                self.search_status_label.configure(text=str(e))
+            else:
+                self.keyword_index.start()
+                self.search = RecordSearch(self.capture_store, self.search_pattern,
+                                           self.view_source, self.keyword_index)
+        self.update_search_status()
+        self.rerender_data()
+        
+    def find_match(self, step):
+        """Jump to the next (step 1) or previous (step -1) match"""
+        if not self.search:
+            return
+        current = self.search_record
+        if step > 0:
+            record = self.search.next_after(-1 if current is None else current)
+        else:
+            record = self.search.previous_before(self.capture_store.end_index if current is None else current)
+        if record is None:
+            self.show_notification("No more matches", "info")
+            return
+        self.search_record = record
+        self.data_view.show_row(self.data_log.row_of(record))
+        
+    def update_search_status(self):
+        """Match count and search progress, read without waiting on the workers"""
+        if not self.search:
+            if not self.search_entry.get():
+                self.search_status_label.configure(text="")
+            return
+        text = f"{self.search.count} matches"
+        if not self.search.caught_up:
+            text += f" (searching {self.search.progress:.0%})"
+        elif self.filter_var.get() and self.data_log.pending:
+            text += " (filtering)"
+        if text != self.search_status_label.cget("text"):
+            self.search_status_label.configure(text=text)
         
     def scan_devices(self):
         """Scan for available devices based on connection type"""
@@ -239,7 +593,7 @@ class ModernBluetoothApp:
             self.scan_ble_devices()
         else:
             self.scan_btn.configure(state="normal", text="🔍 Scan Devices")
-            messagebox.showerror("Error", "BLE not available. Install bleak: pip install bleak")
+            self.show_notification("BLE not available. Install bleak: pip install bleak", "error")
             
     def scan_serial_ports(self):
         """Scan for available serial/COM ports"""
@@ -255,64 +609,86 @@ class ModernBluetoothApp:
                     else:
                         port_list.append(f"{port.device} - {port.description}")
                 
-                self.root.after(0, self.update_device_list, port_list, "serial")
+                self.bridge.post(self.update_device_list, port_list, "serial")
                 
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Port scan failed: {str(e)}"))
+                error = str(e)
+                self.bridge.post(lambda: self.show_notification(f"Port scan failed: {error}", "error"))
             finally:
-                self.root.after(0, lambda: self.scan_btn.configure(state="normal", text="🔍 Scan Devices"))
+                self.bridge.post(lambda: self.scan_btn.configure(state="normal", text="🔍 Scan Devices"))
                 
         threading.Thread(target=scan_worker, daemon=True).start()
         
+    def get_ble_service(self):
+        """Return the shared BLE service, starting it on first use"""
+        if self.ble_service is None:
+            self.ble_service = BleService().start()
+        return self.ble_service
+        
     def scan_ble_devices(self):
-        """Scan for BLE devices"""
-        def scan_worker():
-            try:
-                async def ble_scan():
-                    devices = await BleakScanner.discover(timeout=10)
-                    return [(device.address, device.name or "Unknown Device") for device in devices]
-                
-                if sys.platform == "win32":
-                    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                devices = loop.run_until_complete(ble_scan())
-                loop.close()
+        """Stream BLE advertisements into the device list as they arrive"""
+        service = self.get_ble_service()
+        
+        # Start from devices seen recently, then add new ones as they advertise
+        self.ble_list_pending = False
+        self.show_ble_devices()
+        
+        def on_device(device, changed):
+            # Runs on the BLE loop for every advertisement; only refresh the
+            # combo for new devices, at most once per GUI tick
+            if changed and not self.ble_list_pending:
+                self.ble_list_pending = True
+                self.bridge.post(self.show_ble_devices)
                 
-                device_list = [f"{name} ({addr})" for addr, name in devices]
-                self.root.after(0, self.update_device_list, device_list, "ble")
+        def scan_done(future):
+            try:
+                match = future.result()
+                self.bridge.post(self.ble_scan_finished, match)
                 
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"BLE scan failed: {str(e)}"))
+                error = str(e)
+                self.bridge.post(lambda: self.show_notification(f"BLE scan failed: {error}", "error"))
             finally:
-                self.root.after(0, lambda: self.scan_btn.configure(state="normal", text="🔍 Scan Devices"))
+                self.bridge.post(lambda: self.scan_btn.configure(state="normal", text="🔍 Scan Devices"))
                 
-        threading.Thread(target=scan_worker, daemon=True).start()
-        
+        target = self.ble_target_entry.get().strip() or None
+        service.discover(on_device, timeout=10, target=target).add_done_callback(scan_done)
+        
+    def show_ble_devices(self):
+        """Fill the device combo from the BLE device cache, strongest first"""
+        self.ble_list_pending = False
+        devices = [device.label for device in self.ble_service.cache.devices()]
+        if self.last_device and self.last_device not in devices and "(" in self.last_device:
+            # Remembered board, connectable by address even before it advertises
+            devices.append(self.last_device)
+        current = self.device_combo.get()
+        self.device_combo.configure(values=devices)
+        if devices and current not in devices:
+            self.device_combo.set(devices[0])
+            
+    def ble_scan_finished(self, match):
+        """Final refresh once the streaming scan times out or finds its target"""
+        self.show_ble_devices()
+        if match is not None:
+            self.device_combo.set(match.label)
+            self.show_notification(f"Found {match.name}", "success")
+        elif len(self.ble_service.cache):
+            self.show_notification(f"Found {len(self.ble_service.cache)} ble devices", "success")
+        else:
+            self.show_notification("No ble devices found", "warning")
+            
     def update_device_list(self, devices, scan_type):
         """Update the device combobox with found devices"""
         self.device_combo.configure(values=devices)
         if devices:
-            self.device_combo.set(devices[0])
+            self.device_combo.set(self.last_device if self.last_device in devices else devices[0])
             self.show_notification(f"Found {len(devices)} {scan_type} devices", "success")
         else:
             self.show_notification(f"No {scan_type} devices found", "warning")
             
     def show_notification(self, message, type="info"):
-        """Show a temporary notification"""
-        # Create notification frame
-        notification = ctk.CTkFrame(self.main_frame, fg_color=("gray70", "gray25"))
-        notification.place(relx=0.5, rely=0.1, anchor="center")
-        
-        color = {"success": "green", "warning": "orange", "error": "red", "info": "blue"}[type]
-        
-        label = ctk.CTkLabel(notification, text=message, text_color=color,
-                            font=ctk.CTkFont(size=12, weight="bold"))
-        label.pack(padx=20, pady=10)
-        
-        # Auto-hide after 3 seconds
-        self.root.after(3000, notification.destroy)
+        """Show a temporary notification (repeats are coalesced, never modal)"""
+        self.toasts.post(message, type)
         
     def get_device_identifier(self):
         """Get device identifier from selected device string"""
@@ -338,157 +714,287 @@ class ModernBluetoothApp:
         """Connect to the selected device"""
         device_id = self.get_device_identifier()
         if not device_id:
-            messagebox.showerror("Error", "Please select a device first")
+            self.show_notification("Please select a device first", "warning")
+            return
+            
+        try:
+            framer = make_framer(self.framing_combo.get(), self.framing_param_entry.get())
+        except FramingError as e:
+            self.show_notification(f"Invalid framing: {str(e)}", "error")
             return
             
         self.connect_btn.configure(state="disabled", text="🔄 Connecting...")
         self.status_label.configure(text="🟡 Connecting...")
         
+        session = CaptureSession(
+            framer, store=self.capture_store, on_record=self.process_received_data,
+            on_event=lambda event, detail: self.bridge.post(self.on_link_event, session, event, detail),
+            reconnect=self.auto_reconnect_var.get())
+            
+        # Read the widgets here; the worker thread must not touch them
         if self.connection_type == "serial":
-            self.connect_serial(device_id)
-        elif self.connection_type == "ble":
-            self.connect_ble(device_id)
+            baudrate, bytesize = int(self.baud_combo.get()), int(self.databits_combo.get())
+            mode = self.reader_mode_combo.get().lower()
+            # The asyncio mode runs the port as a transport on the BLE service loop
+            service = self.get_ble_service() if mode == READER_ASYNCIO else None
+            open_link = lambda: session.open_serial(device_id, baudrate, bytesize, mode, service=service)
+        else:
+            uuid, service = self.ble_uuid_combo.get(), self.get_ble_service()
+            open_link = lambda: session.open_ble(device_id, uuid, service=service)
             
-    def connect_serial(self, port):
-        """Connect to serial port"""
         def connect_worker():
             try:
-                self.connection = serial.Serial(
-                    port=port,
-                    baudrate=int(self.baud_combo.get()),
-                    bytesize=int(self.databits_combo.get()),
-                    stopbits=1,
-                    timeout=1
-                )
-                self.connection_start_time = datetime.now()
-                self.root.after(0, self.on_connected)
+                open_link()
+                self.bridge.post(self.on_connected, session, device_id)
                 
             except Exception as e:
-                self.root.after(0, lambda: self.on_connection_failed(str(e)))
+                error = str(e)
+                session.close()
+                self.bridge.post(lambda: self.on_connection_failed(error))
                 
         threading.Thread(target=connect_worker, daemon=True).start()
         
-    def connect_ble(self, address):
-        """Connect to BLE device"""
-        def connect_worker():
-            try:
-                async def ble_connect():
-                    self.connection = BleakClient(address)
-                    await self.connection.connect()
-                    return True
-                
-                if sys.platform == "win32":
-                    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-                    
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                success = loop.run_until_complete(ble_connect())
-                
-                if success:
-                    self.connection_start_time = datetime.now()
-                    self.root.after(0, self.on_connected)
-                else:
-                    self.root.after(0, lambda: self.on_connection_failed("Connection failed"))
-                    
-            except Exception as e:
-                self.root.after(0, lambda: self.on_connection_failed(str(e)))
-                
-        threading.Thread(target=connect_worker, daemon=True).start()
-        
-    def on_connected(self):
+    def on_connected(self, session, device_id):
         """Handle successful connection"""
+        self.session = session
         self.connected = True
+        self.connection_start_time = datetime.now()
         self.connect_btn.configure(state="normal", text="🔌 Disconnect", fg_color="red", hover_color="darkred")
         self.status_label.configure(text="🟢 Connected")
         self.show_notification("Successfully connected!", "success")
-        self.start_receiving()
-        
+        if session.ble_address is not None:
+            self.ble_uuid_combo.configure(values=["Auto"] + [uuid for _, uuid, _ in session.characteristics])
+            self.show_notification(f"Receiving from {session.char_uuid}", "info")
+        
+        # Remember this device and its settings for the next run
+        self.last_device = self.device_combo.get()
+        self.source_names[0] = device_id
+        self.update_view_choices()
+        save_session(SESSION_NAME, self.session_settings())
+        
+    def on_link_event(self, session, event, detail):
+        """Reflect the main connection's link state; the session reconnects by itself"""
+        if session is not self.session:
+            return
+        if event == EVENT_LOST:
+            if isinstance(detail, serial.SerialException):
+                message = f"Serial error: {str(detail)}"
+            elif isinstance(detail, Exception):
+                message = f"Receive error: {str(detail)}"
+            else:
+                message = detail
+            self.show_notification(message, "error")
+        elif event == EVENT_RECONNECTING:
+            self.status_label.configure(text=f"🟡 Reconnecting (attempt {detail})...")
+        elif event == EVENT_RECONNECTED:
+            self.on_reconnected(detail)
+        elif event == EVENT_CLOSED:
+            self.disconnect_device()
+            
+    def on_reconnected(self, incident):
+        """Report a recovered link; the session already resumed receiving"""
+        self.status_label.configure(text="🟢 Connected")
+        self.show_notification(f"Reconnected after {incident.recovered_s:.1f} s "
+                               f"({incident.attempts} attempts)", "success")
+        
+        self.recovery_times.append(incident.recovered_s)
+        self.recovery_label.configure(
+            text=f"Recoveries: {len(self.recovery_times)} (last {incident.recovered_s:.1f} s, "
+                 f"max {max(self.recovery_times):.1f} s)")
+        
+    def on_auto_reconnect_change(self):
+        """Apply the auto-reconnect switch to the running sessions"""
+        reconnect = self.auto_reconnect_var.get()
+        for session in [self.session] + list(self.sessions.values()):
+            if session is not None:
+                session.reconnect = reconnect
+                
     def on_connection_failed(self, error_msg):
         """Handle connection failure"""
         self.connect_btn.configure(state="normal", text="🔌 Connect", fg_color=None, hover_color=None)
         self.status_label.configure(text="🔴 Connection Failed")
         self.show_notification(f"Connection failed: {error_msg}", "error")
         
-    def start_receiving(self):
-        """Start receiving data"""
-        if self.connection_type == "serial":
-            self.start_serial_receiving()
-        elif self.connection_type == "ble":
-            self.start_ble_receiving()
-            
-    def start_serial_receiving(self):
-        """Start receiving data from serial port"""
-        def receive_worker():
-            try:
-                while self.connected and self.connection and self.connection.is_open:
-                    try:
-                        if self.connection.in_waiting > 0:
-                            data = self.connection.read(self.connection.in_waiting)
-                            if data:
-                                self.process_received_data(data)
-                        else:
-                            time.sleep(0.01)
-                            
-                    except serial.SerialException as e:
-                        if self.connected:
-                            self.root.after(0, lambda: self.show_notification(f"Serial error: {str(e)}", "error"))
-                        break
-                        
-            except Exception as e:
-                if self.connected:
-                    self.root.after(0, lambda: self.show_notification(f"Receive error: {str(e)}", "error"))
-                    
-            self.root.after(0, self.disconnect_device)
-            
-        self.receive_thread = threading.Thread(target=receive_worker, daemon=True)
-        self.receive_thread.start()
-        
-    def start_ble_receiving(self):
-        """Start receiving data from BLE device"""
-        self.show_notification("BLE data receiving requires device-specific implementation", "info")
+    def process_received_data(self, data, timestamp):
+        """Count, plot and log a record of the main connection (session thread); the session stores it"""
+        self.data_count += 1
         
-    def process_received_data(self, data):
-        """Process received data and add to queue"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        telemetry = self.telemetry
+        if telemetry is not None:
+            telemetry.append(data, timestamp)
         
-        if self.display_format.get() == "hex":
-            formatted_data = " ".join([f"{b:02X}" for b in data])
+        logger = self.disk_logger
+        if logger:
+            logger.write(data, timestamp)
+            
+    def toggle_plot(self):
+        """Show or hide the telemetry plot; samples are collected from the first time it is shown"""
+        if not self.plot_var.get():
+            self.animator.stop("plot")
+            self.plot_view.grid_remove()
+            return
+        if not NUMPY_AVAILABLE:
+            self.plot_var.set(False)
+            self.show_notification("Plotting needs numpy: pip install numpy", "warning")
+            return
+        if self.telemetry is None:
+            self.telemetry = TelemetryBuffer()
+            self.plot_view.buffer = self.telemetry
+        self.plot_view.grid(row=2, column=0, sticky="ew", padx=20, pady=(0, 20))
+        self.animator.start("plot", self.plot_view.draw, 1.0 / PLOT_FPS, delay=0)
+        
+    def toggle_disk_logging(self):
+        """Start or stop streaming received records to disk"""
+        if self.disk_log_var.get():
+            directory = filedialog.askdirectory(title="Select capture folder")
+            if not directory:
+                self.disk_log_var.set(False)
+                return
+            self.disk_logger = DiskLogger(directory, compression="gzip",
+                                          on_error=self.on_disk_log_error).start()
+            self.show_notification(f"Logging to {directory}", "info")
         else:
-            formatted_data = data.decode('utf-8', errors='ignore').strip()
+            self.stop_disk_logging()
             
-        self.data_queue.put(f"[{timestamp}] {formatted_data}")
-        self.data_count += 1
+    def stop_disk_logging(self):
+        """Flush and close the disk logger, if running"""
+        logger, self.disk_logger = self.disk_logger, None
+        if logger:
+            logger.stop()
+            
+    def on_disk_log_error(self, error):
+        """Handle a write failure in the disk logger thread"""
+        def handle():
+            self.disk_log_var.set(False)
+            self.stop_disk_logging()
+            self.show_notification(f"Disk logging stopped: {str(error)}", "error")
+        self.bridge.post(handle)
         
     def disconnect_device(self):
         """Disconnect from device"""
         self.connected = False
-        
-        if self.connection:
-            try:
-                if self.connection_type == "serial":
-                    self.connection.close()
-                elif self.connection_type == "ble":
-                    pass  # BLE disconnect would be async
-            except:
-                pass
-            self.connection = None
+        session, self.session = self.session, None
+        if session:
+            # Off the Tk thread: stopping a reader joins its thread
+            threading.Thread(target=session.close, daemon=True).start()
             
         self.connect_btn.configure(text="🔌 Connect", fg_color=None, hover_color=None)
         self.status_label.configure(text="🔴 Disconnected")
         
-    def update_gui(self):
-        """Update GUI with received data and statistics"""
-        # Update received data
+    def get_serial_hub(self):
+        """Return the shared serial hub that reads every extra serial session"""
+        if self.serial_hub is None:
+            self.serial_hub = SerialHub().start()
+        return self.serial_hub
+        
+    def add_session(self):
+        """Capture the selected device as an extra, concurrently running session"""
+        device_id = self.get_device_identifier()
+        if not device_id:
+            self.show_notification("Please select a device first", "warning")
+            return
+        busy = [self.source_names[source] for source in self.sessions]
+        if self.connected:
+            busy.append(self.source_names[0])
+        if device_id in busy:
+            self.show_notification(f"{device_id} is already being captured", "warning")
+            return
+            
         try:
-            while True:
-                data = self.data_queue.get_nowait()
-                self.data_textbox.insert("end", data + "\n")
+            framer = make_framer(self.framing_combo.get(), self.framing_param_entry.get())
+        except FramingError as e:
+            self.show_notification(f"Invalid framing: {str(e)}", "error")
+            return
+            
+        source = self.next_source
+        self.next_source += 1
+        session = CaptureSession(
+            framer, store=self.capture_store, on_record=self.on_session_record,
+            on_event=lambda event, detail: self.bridge.post(self.on_session_event, source, event, detail),
+            reconnect=self.auto_reconnect_var.get(), source=source)
+            
+        # Read the widgets here; the worker thread must not touch them
+        if self.connection_type == "serial":
+            session.hub = self.get_serial_hub()
+            baudrate, bytesize = int(self.baud_combo.get()), int(self.databits_combo.get())
+            open_link = lambda: session.open_serial(device_id, baudrate, bytesize)
+        else:
+            uuid, service = self.ble_uuid_combo.get(), self.get_ble_service()
+            open_link = lambda: session.open_ble(device_id, uuid, service=service)
+            
+        def open_worker():
+            try:
+                open_link()
+                self.bridge.post(self.on_session_opened, source, device_id, session)
+            except Exception as e:
+                error = str(e)
+                self.bridge.post(lambda: self.show_notification(f"Session {device_id} failed: {error}", "error"))
                 
-                if self.auto_scroll_var.get():
-                    self.data_textbox.see("end")
-                    
-        except queue.Empty:
-            pass
+        self.show_notification(f"Opening {device_id}...", "info")
+        threading.Thread(target=open_worker, daemon=True).start()
+        
+    def on_session_opened(self, source, name, session):
+        """Register a newly opened session"""
+        self.sessions[source] = session
+        self.source_names[source] = name
+        self.update_view_choices()
+        self.rerender_data()
+        self.show_notification(f"Capturing {name}", "success")
+        
+    def on_session_record(self, data, timestamp):
+        """Count and log a record from an extra session (session thread)"""
+        self.data_count += 1
+        logger = self.disk_logger
+        if logger:
+            logger.write(data, timestamp)
+            
+    def on_session_event(self, source, event, detail):
+        """Reflect an extra session's link state"""
+        name = self.source_names.get(source, source)
+        if event == EVENT_LOST:
+            self.show_notification(f"{name}: {detail}", "error")
+        elif event == EVENT_RECONNECTED:
+            self.show_notification(f"{name} reconnected", "success")
+        elif event == EVENT_CLOSED and self.sessions.pop(source, None) is not None:
+            self.source_names.pop(source, None)
+            if self.view_source == source:
+                self.view_combo.set(ALL_SOURCES)
+                self.view_source = None
+                self.close_session_btn.configure(state="disabled")
+            self.update_view_choices()
+            self.rerender_data()
+            
+    def update_view_choices(self):
+        """Refresh the view selector and the session summary"""
+        names = [self.source_names[0]] + [self.source_names[source] for source in sorted(self.sessions)]
+        self.view_combo.configure(values=[ALL_SOURCES] + names)
+        if self.sessions:
+            self.sessions_label.configure(text="Sessions: " + ", ".join(names[1:]))
+        else:
+            self.sessions_label.configure(text="Sessions: none")
+            
+    def close_viewed_session(self):
+        """Close the extra session shown in the current view"""
+        session = self.sessions.get(self.view_source)
+        if session:
+            threading.Thread(target=session.close, daemon=True).start()
+            
+    def close_sessions(self):
+        """Close every extra session and the serial hub"""
+        for session in list(self.sessions.values()):
+            session.close()
+        if self.serial_hub:
+            self.serial_hub.stop(join_timeout=0)
+            self.serial_hub = None
+            
+    def update_gui(self):
+        """Update GUI with received data and statistics"""
+        # Run everything other threads posted since the last tick in one batch
+        bridge_pending = self.bridge.drain()
+        
+        # Redraw the visible rows if new records moved them
+        pending = self.data_view.refresh(self.auto_scroll_var.get())
+        self.update_search_status()
             
         # Update statistics
         self.data_count_label.configure(text=f"Messages: {self.data_count}")
@@ -501,64 +1007,82 @@ class ModernBluetoothApp:
         else:
             self.connection_time_label.configure(text="Connected: --:--:--")
             
-        self.root.after(100, self.update_gui)
+        self.update_export_progress()
+        
+        if self.disk_logger:
+            logged = f"Logged: {self.disk_logger.records_written}"
+            if self.disk_logger.dropped:
+                logged += f" ({self.disk_logger.dropped} dropped)"
+            self.disk_log_label.configure(text=logged)
+        else:
+            self.disk_log_label.configure(text="Logged: off")
+            
+        # Come back sooner while a backlog is still queued
+        busy = pending or bridge_pending
+        self.root.after(self.gui_busy_interval if busy else self.gui_update_interval, self.update_gui)
         
     def clear_data(self):
         """Clear the data display"""
-        self.data_textbox.delete("1.0", "end")
+        self.capture_store.clear()
+        self.keyword_index.clear()
+        if self.telemetry is not None:
+            self.telemetry.clear()
+        self.data_view.reset()
         self.data_count = 0
+        if self.search:
+            self.apply_search()
         
     def save_data(self):
         """Save received data to file"""
-        data = self.data_textbox.get("1.0", "end")
-        if not data.strip():
-            self.show_notification("No data to save", "warning")
-            return
-            
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-        )
+        self.start_export("Text", "💾 Save Data", "Data saved successfully!")
         
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(data)
-                self.show_notification(f"Data saved successfully!", "success")
-            except Exception as e:
-                self.show_notification(f"Failed to save file: {str(e)}", "error")
-                
     def export_csv(self):
-        """Export data to CSV format"""
-        data = self.data_textbox.get("1.0", "end").strip()
-        if not data:
+        """Export data to CSV, JSON Lines or a columnar format"""
+        self.start_export(None, "📤 Export", "Data exported successfully!")
+        
+    def start_export(self, export_format, title, success_message):
+        """Stream the capture store to a file on a background thread"""
+        if self.export_job:
+            self.show_notification("An export is already running", "warning")
+            return
+            
+        if not len(self.capture_store):
             self.show_notification("No data to export", "warning")
             return
             
+        formats = [export_format] if export_format else list(EXPORT_FORMATS)
         filename = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            title=title,
+            defaultextension=EXPORT_FORMATS[formats[0]].extension,
+            filetypes=[(f"{label} files", f"*{EXPORT_FORMATS[label].extension}") for label in formats] +
+                      [("All files", "*.*")]
         )
         
         if filename:
-            try:
-                import csv
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Timestamp", "Data"])
-                    
-                    for line in data.split('\n'):
-                        if line.strip() and line.startswith('['):
-                            # Extract timestamp and data
-                            end_bracket = line.find(']')
-                            if end_bracket != -1:
-                                timestamp = line[1:end_bracket]
-                                data_part = line[end_bracket+2:]
-                                writer.writerow([timestamp, data_part])
-                                
-                self.show_notification("Data exported to CSV successfully!", "success")
-            except Exception as e:
-                self.show_notification(f"Failed to export CSV: {str(e)}", "error")
+            self.export_job = ExportJob(self.capture_store, filename,
+                                        export_format or exporter_for_path(filename),
+                                        self.display_format.get()).start()
+            self.export_success_message = success_message
+            self.export_progress.set(0)
+            self.export_progress.grid(row=0, column=5, padx=10, pady=10)
+            
+    def update_export_progress(self):
+        """Reflect background export progress; called from update_gui"""
+        job = self.export_job
+        if not job:
+            return
+        self.export_progress.set(job.fraction)
+        if not job.finished:
+            return
+            
+        self.export_job = None
+        self.export_progress.grid_remove()
+        if job.error is None:
+            self.show_notification(self.export_success_message, "success")
+        elif isinstance(job.error, ExportCancelled):
+            self.show_notification("Export cancelled", "warning")
+        else:
+            self.show_notification(f"Failed to export: {str(job.error)}", "error")
                 
     def toggle_theme(self):
         """Toggle between light and dark themes"""
@@ -572,8 +1096,23 @@ class ModernBluetoothApp:
             
     def on_closing(self):
         """Handle application closing"""
-        if self.connected:
-            self.disconnect_device()
+        if self.session:
+            self.session.close()
+        self.close_sessions()
+        self.stop_disk_logging()
+        if self.export_job:
+            self.export_job.cancel()
+        if self.ble_service:
+            self.ble_service.shutdown()
+        if self.export_job:
+            self.export_job.thread.join(1.0)
+        if self.search:
+            self.search.cancel()
+            self.search.thread.join(1.0)
+        self.keyword_index.stop()
+        self.animator.stop_all()
+        self.data_log.close()
+        self.capture_store.close()
         self.root.destroy()
 
 def main():
@@ -589,11 +1128,6 @@ def main():
         import serial
     except ImportError:
         missing_deps.append("pyserial")
-        
-    try:
-        from PIL import Image
-    except ImportError:
-        missing_deps.append("Pillow")
     
     if missing_deps:
         print("Missing dependencies:")
@@ -113,6 +113,32 @@ class MyCallbacks: public BLECharacteristicCallbacks {
                     Serial.println("❌ Invalid command format");
                 }
             }
+            // Batched frame with every relay state (format: "S<s1><s2><s3><s4>")
+            else if (rxValue.length() >= 5 && rxValue[0] == 'S') {
+                // Check the whole frame first so a bad digit never leaves it half applied
+                bool valid = true;
+                for (int i = 0; i < 4; i++) {
+                    if (rxValue[i + 1] != '0' && rxValue[i + 1] != '1') {
+                        valid = false;
+                    }
+                }
+                
+                if (!valid) {
+                    Serial.println("❌ Invalid frame format");
+                } else if (uxQueueSpacesAvailable(relayQueue) < 4) {
+                    // Only this callback queues commands, so the space cannot shrink below 4 here
+                    Serial.println("❌ Failed to queue frame: queue full");
+                } else {
+                    for (int i = 0; i < 4; i++) {
+                        RelayCommand cmd;
+                        cmd.relay_number = i + 1;
+                        cmd.state = rxValue[i + 1] - '0';
+                        xQueueSend(relayQueue, &cmd, 0);
+                    }
+                    Serial.printf("✅ Frame queued: %c%c%c%c\n",
+                                rxValue[1], rxValue[2], rxValue[3], rxValue[4]);
+                }
+            }
         }
     }
 };
@@ -263,6 +289,7 @@ void setup() {
                         CHARACTERISTIC_UUID,
                         BLECharacteristic::PROPERTY_READ |
                         BLECharacteristic::PROPERTY_WRITE |
+                        BLECharacteristic::PROPERTY_WRITE_NR |
                         BLECharacteristic::PROPERTY_NOTIFY
                       );
     
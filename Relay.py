@@ -1,16 +1,26 @@
 import asyncio
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import filedialog
 import threading
-from bleak import BleakScanner, BleakClient
 import logging
-from PIL import Image, ImageTk
+import os
 import time
+from relay_dispatcher import RelayCommandDispatcher
+from relay_ack import AckTracker
+from relay_fleet import RelayFleet
+from ble_discovery import DeviceCache, discover_stream, matches_target
+from reconnect import ReconnectSupervisor
+from session_store import load_session, save_session
+from animation import Animator
+from toast import ToastManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Name of the remembered device/settings file
+SESSION_NAME = "relay_controller"
+
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -29,23 +39,58 @@ class ModernBLERelayController:
         self.client = None
         self.connected_device = None
         self.characteristic_uuid = "12345678-1234-1234-1234-123456789abc"  # Replace with your ESP32's characteristic UUID
+        self.service_uuid = "12345678-1234-1234-1234-123456789abc"  # Advertised by the relay firmware
+        
+        # Devices seen in recent scans, so rescans don't start from nothing
+        self.device_cache = DeviceCache()
+        self.device_list_pending = False
         
         # UI variables
         self.relay_states = [False, False, False, False]
         self.relay_buttons = []
         self.scanning = False
         
-        # Animation variables
-        self.pulse_animation = {}
-        
         # Create the UI
         self.create_modern_ui()
         
+        # Every pulse/scan effect runs on one frame clock, one animation per widget
+        self.animator = Animator(self.root)
+        
+        # Messages are non-modal toasts, so a burst of errors never blocks the loop
+        self.toasts = ToastManager(self.root, rely=0.12)
+        
         # Start the async event loop in a separate thread
         self.loop = asyncio.new_event_loop()
         self.thread = threading.Thread(target=self.start_event_loop, daemon=True)
         self.thread.start()
         
+        # Ordered relay command queue served on the event loop; ACK_R
+        # notifications are matched back to dispatched commands
+        self.ack_tracker = AckTracker(self.loop, self._resend_relay_command, on_timeout=self.on_ack_timeout)
+        self.dispatcher = RelayCommandDispatcher(self.loop, self._send_relay_command,
+                                                 on_error=self.on_command_error,
+                                                 on_dispatched=self.ack_tracker.on_dispatched)
+        
+        # Fleet mode: many relay boards connected at once on the same loop
+        self.fleet = RelayFleet(self.loop, char_uuid=self.characteristic_uuid,
+                                on_change=lambda device: self.root.after(0, self.refresh_fleet_view))
+        self.fleet_window = None
+        self._fleet_refresh_id = None
+        
+        # Reconnect directly by address when the link drops unexpectedly
+        self.user_disconnect = False
+        self.reconnecting = False
+        self.reconnect_address = None
+        self.reconnect_supervisor = ReconnectSupervisor(
+            self._reconnect_blocking,
+            on_attempt=lambda attempt, delay: self.root.after(0, self._on_reconnect_attempt, attempt),
+            on_recovered=lambda incident: self.root.after(0, self._reconnected, incident))
+        
+        # Restore the last used device and write modes
+        self.restore_session()
+        
+        self.update_dispatch_metrics()
+        
     def start_event_loop(self):
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
@@ -183,6 +228,37 @@ class ModernBLERelayController:
         )
         self.disconnect_btn.grid(row=0, column=2, padx=(10, 0), pady=5)
         
+        self.fleet_btn = ctk.CTkButton(
+            button_frame,
+            text="🛰️ Fleet",
+            command=self.open_fleet_window,
+            width=100,
+            height=35,
+            font=ctk.CTkFont(size=13, weight="bold")
+        )
+        self.fleet_btn.grid(row=0, column=3, padx=(10, 0), pady=5)
+        
+        # Write mode switches
+        self.fast_write_var = ctk.BooleanVar(value=False)
+        self.fast_write_switch = ctk.CTkSwitch(
+            button_frame,
+            text="Fast writes (no response)",
+            variable=self.fast_write_var,
+            command=self.on_write_mode_change,
+            font=ctk.CTkFont(size=12)
+        )
+        self.fast_write_switch.grid(row=1, column=0, columnspan=2, padx=(0, 10), pady=5, sticky="w")
+        
+        self.batch_frames_var = ctk.BooleanVar(value=False)
+        self.batch_frames_switch = ctk.CTkSwitch(
+            button_frame,
+            text="Batch relay frames",
+            variable=self.batch_frames_var,
+            command=self.on_write_mode_change,
+            font=ctk.CTkFont(size=12)
+        )
+        self.batch_frames_switch.grid(row=1, column=2, padx=(10, 0), pady=5, sticky="w")
+        
     def create_relay_section(self, parent):
         """Create modern relay control section"""
         relay_main_frame = ctk.CTkFrame(parent)
@@ -255,68 +331,111 @@ class ModernBLERelayController:
             font=ctk.CTkFont(size=12),
             text_color=("#7f8c8d", "#95a5a6")
         )
-        info_label.pack(pady=15)
+        info_label.pack(pady=(15, 0))
+        
+        self.metrics_label = ctk.CTkLabel(
+            footer_frame,
+            text="Queue: 0 • Latency p50: -- ms • p95: -- ms",
+            font=ctk.CTkFont(size=11),
+            text_color=("#7f8c8d", "#95a5a6")
+        )
+        self.metrics_label.pack()
+        
+        self.ack_metrics_label = ctk.CTkLabel(
+            footer_frame,
+            text="ACK RTT p50: -- ms • p95: -- ms • p99: -- ms • Retries: 0 • Timeouts: 0",
+            font=ctk.CTkFont(size=11),
+            text_color=("#7f8c8d", "#95a5a6")
+        )
+        self.ack_metrics_label.pack(pady=(0, 5))
+        
+        self.export_latency_btn = ctk.CTkButton(
+            footer_frame,
+            text="📊 Export Latency",
+            command=self.export_latency,
+            width=140,
+            height=28,
+            font=ctk.CTkFont(size=12)
+        )
+        self.export_latency_btn.pack(pady=(0, 10))
+        
+    def scan_devices(self, stop_early=True):
+        """Scan for BLE devices with modern UI feedback
         
-    def scan_devices(self):
-        """Scan for BLE devices with modern UI feedback"""
+        Devices appear as they advertise; unless stop_early is False the
+        scan ends as soon as a board advertising the relay service is seen.
+        """
         if self.scanning:
             return
             
         self.scanning = True
         self.scan_btn.configure(text="🔄 Scanning...", state="disabled")
-        self.device_combo.configure(values=[])
+        
+        # Show devices from recent scans right away
+        self._show_cached_devices()
         
         # Start scanning animation
         self.start_scan_animation()
         
-        def scan_task():
-            asyncio.run_coroutine_threadsafe(self._scan_devices(), self.loop)
-            
-        threading.Thread(target=scan_task, daemon=True).start()
+        target = self.service_uuid if stop_early else None
+        asyncio.run_coroutine_threadsafe(self._scan_devices(target), self.loop)
         
     def start_scan_animation(self):
         """Animate the scan button"""
-        if not self.scanning:
-            return
+        dots = [0]
+        
+        def step():
+            if not self.scanning:
+                return False
+            dots[0] = (dots[0] + 1) % 4
+            self.scan_btn.configure(text="🔄 Scanning" + "." * dots[0])
             
-        current_text = self.scan_btn.cget("text")
-        if "Scanning" in current_text:
-            dots = current_text.count(".")
-            if dots >= 3:
-                new_text = "🔄 Scanning"
-            else:
-                new_text = current_text + "."
-                
-            self.scan_btn.configure(text=new_text)
-            self.root.after(500, self.start_scan_animation)
+        self.animator.start(self.scan_btn, step, 0.5)
         
-    async def _scan_devices(self):
-        """Async scan for BLE devices"""
+    async def _scan_devices(self, target=None):
+        """Async streaming scan for BLE devices"""
         try:
-            devices = await BleakScanner.discover(timeout=10.0)
-            device_list = []
+            # bleak is loaded on first use, off the UI thread
+            from bleak import BleakScanner
+            match = await discover_stream(BleakScanner, self.device_cache, self._on_advertisement,
+                                          timeout=10.0, target=target)
+            device_list = [device.label for device in self.device_cache.devices()]
             
-            for device in devices:
-                name = device.name or "Unknown Device"
-                device_list.append(f"{name} ({device.address})")
-                
             # Update UI in main thread
-            self.root.after(0, self._update_device_list, device_list)
+            self.root.after(0, self._update_device_list, device_list, match)
             
         except Exception as e:
             logger.error(f"Scan error: {e}")
             self.root.after(0, self._scan_error, str(e))
             
-    def _update_device_list(self, device_list):
+    def _on_advertisement(self, device, changed):
+        """Detection callback (event loop): refresh the combo for new devices, at most every 200 ms"""
+        if changed and not self.device_list_pending:
+            self.device_list_pending = True
+            self.root.after(200, self._show_cached_devices)
+            
+    def _show_cached_devices(self):
+        """Fill the device combo from the device cache, strongest signal first"""
+        self.device_list_pending = False
+        device_list = [device.label for device in self.device_cache.devices()]
+        current = self.device_combo.get()
+        self.device_combo.configure(values=device_list)
+        if device_list and current not in device_list:
+            self.device_combo.set(device_list[0])
+            
+    def _update_device_list(self, device_list, match=None):
         """Update device list in UI"""
         self.scanning = False
         self.device_combo.configure(values=device_list)
         self.scan_btn.configure(text="🔍 Scan Devices", state="normal")
         
-        if device_list:
+        if match is not None:
+            # Stopped early on a relay board; select it
+            self.device_combo.set(match.label)
+        elif device_list:
             # Show success with modern dialog
             self.show_custom_message("Scan Complete", f"Found {len(device_list)} devices", "success")
-            if device_list:
+            if self.device_combo.get() not in device_list:
                 self.device_combo.set(device_list[0])  # Auto-select first device
         else:
             self.show_custom_message("Scan Complete", "No devices found", "warning")
@@ -328,15 +447,8 @@ class ModernBLERelayController:
         self.show_custom_message("Scan Error", f"Failed to scan devices: {error_msg}", "error")
         
     def show_custom_message(self, title, message, msg_type="info"):
-        """Show custom styled message"""
-        if msg_type == "success":
-            messagebox.showinfo(title, message)
-        elif msg_type == "warning":
-            messagebox.showwarning(title, message)
-        elif msg_type == "error":
-            messagebox.showerror(title, message)
-        else:
-            messagebox.showinfo(title, message)
+        """Show custom styled message as a toast (repeats are coalesced)"""
+        self.toasts.post(f"{title}: {message}", msg_type)
         
     def connect_device(self):
         """Connect to selected device"""
@@ -361,9 +473,15 @@ class ModernBLERelayController:
     async def _connect_device(self, address):
         """Async connect to device"""
         try:
-            self.client = BleakClient(address)
+            from bleak import BleakClient
+            self.user_disconnect = False
+            self.client = BleakClient(address, disconnected_callback=self._on_link_lost)
             await self.client.connect()
             
+            # Subscribe to ACK_R<n><s> notifications from the firmware
+            self.ack_tracker.reset()
+            await self.client.start_notify(self.characteristic_uuid, self.ack_tracker.on_notification)
+            
             # Update UI in main thread
             self.root.after(0, self._connection_success)
             
@@ -375,6 +493,13 @@ class ModernBLERelayController:
         """Handle successful connection with modern UI updates"""
         self.connected_device = self.device_combo.get()
         
+        # Remember the device so the next run can connect without scanning
+        save_session(SESSION_NAME, {
+            "device": self.connected_device,
+            "fast_write": self.fast_write_var.get(),
+            "batch_frames": self.batch_frames_var.get(),
+        })
+        
         # Update status indicator
         self.status_indicator.configure(text_color="#2ecc71")  # Green
         self.status_text.configure(text="Connected")
@@ -390,15 +515,16 @@ class ModernBLERelayController:
         
     def start_status_pulse(self):
         """Animate the connection status indicator"""
-        if self.client and hasattr(self.client, 'is_connected') and self.client.is_connected:
+        shades = ["#2ecc71", "#27ae60"]
+        
+        def step():
+            if not (self.client and self.client.is_connected) or self.reconnecting:
+                return False
             # Pulse between two green shades
-            current_color = self.status_indicator.cget("text_color")
-            if current_color == "#2ecc71":
-                self.status_indicator.configure(text_color="#27ae60")
-            else:
-                self.status_indicator.configure(text_color="#2ecc71")
-                
-            self.root.after(1000, self.start_status_pulse)
+            shades.reverse()
+            self.status_indicator.configure(text_color=shades[0])
+            
+        self.animator.start(self.status_indicator, step, 1.0, delay=0)
         
     def _connection_error(self, error_msg):
         """Handle connection error"""
@@ -407,6 +533,9 @@ class ModernBLERelayController:
         
     def disconnect_device(self):
         """Disconnect from device"""
+        self.user_disconnect = True
+        self.reconnecting = False
+        self.reconnect_supervisor.cancel()
         self.disconnect_btn.configure(text="🔄 Disconnecting...", state="disabled")
         
         def disconnect_task():
@@ -439,10 +568,15 @@ class ModernBLERelayController:
         self.connect_btn.configure(state="normal")
         self.disconnect_btn.configure(text="❌ Disconnect", state="disabled")
         
+        # Drop commands still queued or awaiting ACK for the old link
+        self.dispatcher.clear()
+        self.loop.call_soon_threadsafe(self.ack_tracker.reset)
+        
         # Reset all relay states
         for i in range(4):
             self.relay_states[i] = False  
             btn, colors, icon = self.relay_buttons[i]
+            self.animator.stop(btn)
             btn.configure(
                 text=f"{icon}\nRelay {i+1}\nOFF",
                 fg_color=("#565b5e", "#52595d"),
@@ -454,6 +588,74 @@ class ModernBLERelayController:
         self.disconnect_btn.configure(text="❌ Disconnect", state="normal")
         self.show_custom_message("Disconnection Error", f"Failed to disconnect: {error_msg}", "error")
         
+    def restore_session(self):
+        """Offer the last connected device and restore write mode switches"""
+        session = load_session(SESSION_NAME)
+        if session.get("device"):
+            self.device_combo.configure(values=[session["device"]])
+            self.device_combo.set(session["device"])
+        self.fast_write_var.set(session.get("fast_write", False))
+        self.batch_frames_var.set(session.get("batch_frames", False))
+        self.on_write_mode_change()
+        
+    def _on_link_lost(self, client):
+        """BleakClient disconnected callback (event loop)"""
+        if client is self.client and not self.user_disconnect:
+            self.root.after(0, self._start_reconnect)
+            
+    def _start_reconnect(self):
+        """Keep the relay UI state and reconnect by address in the background"""
+        if self.reconnecting or self.user_disconnect or not self.connected_device:
+            return
+        self.reconnecting = True
+        self.reconnect_address = self.connected_device.split('(')[1].split(')')[0]
+        self.status_indicator.configure(text_color="#f39c12")  # Orange
+        self.status_text.configure(text="Reconnecting...")
+        
+        # Queued commands were meant for the old link
+        self.dispatcher.clear()
+        self.reconnect_supervisor.link_lost("BLE link lost")
+        
+    def _reconnect_blocking(self, attempt):
+        """One reconnect attempt (runs on the supervisor thread)"""
+        incident = self.reconnect_supervisor.current
+        asyncio.run_coroutine_threadsafe(self._reconnect_device(self.reconnect_address, incident),
+                                         self.loop).result(30)
+        
+    async def _reconnect_device(self, address, incident):
+        """Async reconnect without a scan, re-subscribing to ACKs"""
+        from bleak import BleakClient
+        client = BleakClient(address, disconnected_callback=self._on_link_lost)
+        await client.connect()
+        try:
+            if not self.reconnecting or self.reconnect_supervisor.current is not incident:
+                # The user disconnected, or a newer reconnect took over, while this attempt was in flight
+                raise ConnectionAbortedError("reconnect cancelled")
+            self.ack_tracker.reset()
+            await client.start_notify(self.characteristic_uuid, self.ack_tracker.on_notification)
+        except BaseException:
+            await client.disconnect()
+            raise
+        self.client = client
+        
+    def _on_reconnect_attempt(self, attempt):
+        if self.reconnecting:
+            self.status_text.configure(text=f"Reconnecting ({attempt})...")
+            
+    def _reconnected(self, incident):
+        """Link is back: restore relay states the operator still holds"""
+        if not self.reconnecting:
+            return
+        self.reconnecting = False
+        self.status_indicator.configure(text_color="#2ecc71")  # Green
+        self.status_text.configure(text="Connected")
+        logger.info(f"Reconnected after {incident.recovered_s:.2f} s ({incident.attempts} attempts)")
+        
+        for i, state in enumerate(self.relay_states):
+            self.send_relay_command(i, 1 if state else 0)
+            
+        self.start_status_pulse()
+        
     def relay_press(self, relay_index):
         """Handle relay button press with modern animations"""
         if not self.client or not self.client.is_connected:
@@ -478,19 +680,18 @@ class ModernBLERelayController:
         
     def start_relay_pulse(self, relay_index):
         """Animate active relay button"""
-        if not self.relay_states[relay_index]:
-            return
-            
         btn, colors, icon = self.relay_buttons[relay_index]
-        current_color = btn.cget("fg_color")
-        
-        if current_color == colors[0]:
-            btn.configure(fg_color=colors[1])
-        else:
-            btn.configure(fg_color=colors[0])
+        if btn in self.animator:
+            return  # Already pulsing; a repeated press must not add a second chain
+        shade = [0]
+        
+        def step():
+            if not self.relay_states[relay_index]:
+                return False
+            shade[0] ^= 1
+            btn.configure(fg_color=colors[shade[0]])
             
-        if self.relay_states[relay_index]:
-            self.root.after(500, lambda: self.start_relay_pulse(relay_index))
+        self.animator.start(btn, step, 0.5, delay=0)
         
     def relay_release(self, relay_index):
         """Handle relay button release"""
@@ -499,6 +700,7 @@ class ModernBLERelayController:
             
         self.relay_states[relay_index] = False
         btn, colors, icon = self.relay_buttons[relay_index]
+        self.animator.stop(btn)
         
         # Reset button appearance
         btn.configure(
@@ -511,27 +713,215 @@ class ModernBLERelayController:
         self.send_relay_command(relay_index, 0)
         
     def send_relay_command(self, relay_index, state):
-        """Send relay command to ESP32"""
-        def send_task():
-            asyncio.run_coroutine_threadsafe(
-                self._send_relay_command(relay_index, state), self.loop)
+        """Queue relay command for the ESP32"""
+        self.dispatcher.submit(relay_index, state)
+        
+    def update_dispatch_metrics(self):
+        """Show command queue depth and dispatch latency in the footer"""
+        metrics = self.dispatcher.metrics()
+        fmt = lambda value: "--" if value is None else f"{value:.1f}"
+        self.metrics_label.configure(
+            text=f"Queue: {metrics['depth']} • Latency p50: {fmt(metrics['p50_ms'])} ms • "
+                 f"p95: {fmt(metrics['p95_ms'])} ms{self.recovery_summary()}")
+        
+        ack = self.ack_tracker.metrics()
+        self.ack_metrics_label.configure(
+            text=f"ACK RTT p50: {fmt(ack['p50_ms'])} ms • p95: {fmt(ack['p95_ms'])} ms • "
+                 f"p99: {fmt(ack['p99_ms'])} ms • Retries: {ack['retries']} • Timeouts: {ack['timeouts']}")
+        self.root.after(1000, self.update_dispatch_metrics)
+        
+    def recovery_summary(self):
+        """Footer suffix with time-to-recover figures once a link has dropped"""
+        recovery = self.reconnect_supervisor.metrics()
+        if not recovery["incidents"]:
+            return ""
+        fmt = lambda value: "--" if value is None else f"{value:.1f}"
+        return (f" • Recoveries: {recovery['recovered']}/{recovery['incidents']} "
+                f"(last {fmt(recovery['last_s'])} s, max {fmt(recovery['max_s'])} s)")
+        
+    def _resend_relay_command(self, relay_index, state):
+        """Retry an unacknowledged command (runs on the event loop)"""
+        self.dispatcher.resubmit(relay_index, state)
+        
+    def on_ack_timeout(self, relay_index, state):
+        """Flag a relay command the ESP32 never acknowledged"""
+        logger.warning(f"No ACK for relay {relay_index + 1} -> {state}")
+        self.root.after(0, lambda: self.show_custom_message(
+            "No Acknowledgement",
+            f"Relay {relay_index + 1} did not confirm {'ON' if state else 'OFF'} after retries", "warning"))
+        
+    def export_latency(self):
+        """Export ACK round-trip latency histograms to CSV or JSON"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            self.ack_tracker.export(filename)
+            message = f"Latency histograms saved to {filename}"
+            if self.reconnect_supervisor.incidents:
+                # Downtime per link-loss incident goes next to the histograms
+                incidents_file = os.path.splitext(filename)[0] + "_incidents.csv"
+                self.reconnect_supervisor.export(incidents_file)
+                message += f"\nReconnect incidents saved to {incidents_file}"
+            self.show_custom_message("Export Complete", message, "success")
+        except Exception as e:
+            self.show_custom_message("Export Error", f"Failed to export latency: {e}", "error")
+        
+    async def _send_relay_command(self, payload, response=True):
+        """Async write of a relay command or batched frame; raises if it did not reach the board"""
+        if not (self.client and self.client.is_connected):
+            raise ConnectionError("Relay board is not connected")
+        # Format: "R<relay_number><state>" (e.g., "R11" for relay 1 ON, "R10" for relay 1 OFF)
+        # or a batched "S<s1><s2><s3><s4>" frame with every relay state
+        await self.client.write_gatt_char(self.characteristic_uuid, payload, response=response)
+        logger.info(f"Sent command: {payload.decode()}")
+        
+    def on_command_error(self, commands, error):
+        """A write failed; the dispatcher neither counts nor ACK-tracks it (event loop thread)"""
+        msg = str(error)
+        logger.error(f"Failed to send command: {msg}")
+        self.root.after(0, lambda: self.show_custom_message("Command Error",
+                                                           f"Failed to send command: {msg}", "error"))
+            
+    def on_write_mode_change(self):
+        """Apply write-without-response / batched frame switches"""
+        self.dispatcher.response = not self.fast_write_var.get()
+        self.dispatcher.batch = self.batch_frames_var.get()
+        
+    # Fleet mode
+    
+    def open_fleet_window(self):
+        """Open the fleet window for controlling many relay boards at once"""
+        if self.fleet_window is not None and self.fleet_window.winfo_exists():
+            self.fleet_window.lift()
+            return
             
-        threading.Thread(target=send_task, daemon=True).start()
+        self.fleet_window = ctk.CTkToplevel(self.root)
+        self.fleet_window.protocol("WM_DELETE_WINDOW", self.close_fleet_window)
+        self.fleet_window.title("Relay Fleet")
+        self.fleet_window.geometry("820x520")
+        self.fleet_window.grid_columnconfigure(0, weight=1)
+        self.fleet_window.grid_rowconfigure(2, weight=1)
+        
+        # Device management
+        manage_frame = ctk.CTkFrame(self.fleet_window)
+        manage_frame.grid(row=0, column=0, sticky="ew", padx=15, pady=(15, 5))
+        
+        ctk.CTkLabel(manage_frame, text="Group:", font=ctk.CTkFont(size=12)).grid(
+            row=0, column=0, padx=(10, 5), pady=10)
+        self.fleet_group_entry = ctk.CTkEntry(manage_frame, width=120, placeholder_text="optional")
+        self.fleet_group_entry.grid(row=0, column=1, padx=5, pady=10)
+        
+        ctk.CTkButton(manage_frame, text="🔍 Scan All", width=100,
+                      command=lambda: self.scan_devices(stop_early=False)).grid(row=0, column=2, padx=5, pady=10)
+        ctk.CTkButton(manage_frame, text="➕ Add Scanned", width=110,
+                      command=self.fleet_add_scanned).grid(row=0, column=3, padx=5, pady=10)
+        ctk.CTkButton(manage_frame, text="🔌 Connect All", width=110,
+                      command=self.fleet_connect_all).grid(row=0, column=4, padx=5, pady=10)
+        ctk.CTkButton(manage_frame, text="❌ Disconnect All", width=110,
+                      fg_color=("#d63031", "#ff4757"), hover_color=("#a4161a", "#e84545"),
+                      command=self.fleet_disconnect_all).grid(row=0, column=5, padx=(5, 10), pady=10)
+        
+        # Broadcast / group commands
+        command_frame = ctk.CTkFrame(self.fleet_window)
+        command_frame.grid(row=1, column=0, sticky="ew", padx=15, pady=5)
+        
+        ctk.CTkLabel(command_frame, text="Target:", font=ctk.CTkFont(size=12)).grid(
+            row=0, column=0, padx=(10, 5), pady=10)
+        self.fleet_target_combo = ctk.CTkComboBox(command_frame, width=120, values=["All"], state="readonly")
+        self.fleet_target_combo.set("All")
+        self.fleet_target_combo.grid(row=0, column=1, rowspan=2, padx=5, pady=10)
         
-    async def _send_relay_command(self, relay_index, state):
-        """Async send relay command"""
-        try:
-            if self.client and self.client.is_connected:
-                # Format: "R<relay_number><state>" (e.g., "R11" for relay 1 ON, "R10" for relay 1 OFF)
-                command = f"R{relay_index + 1}{state}"
-                await self.client.write_gatt_char(self.characteristic_uuid, command.encode())
-                logger.info(f"Sent command: {command}")
+        for i in range(4):
+            ctk.CTkButton(command_frame, text=f"R{i+1} ON", width=70,
+                          command=lambda idx=i: self.fleet_send(idx, 1)).grid(row=0, column=2 + i, padx=3, pady=(10, 3))
+            ctk.CTkButton(command_frame, text=f"R{i+1} OFF", width=70, fg_color=("#565b5e", "#52595d"),
+                          command=lambda idx=i: self.fleet_send(idx, 0)).grid(row=1, column=2 + i, padx=3, pady=(3, 10))
+        
+        # Per-device state and latency
+        self.fleet_list = ctk.CTkTextbox(self.fleet_window, font=ctk.CTkFont(family="Consolas", size=12))
+        self.fleet_list.grid(row=2, column=0, sticky="nsew", padx=15, pady=(5, 15))
+        
+        self.refresh_fleet_view(periodic=True)
+        
+    def close_fleet_window(self):
+        """Stop the periodic refresh and close the fleet window"""
+        self._cancel_fleet_refresh()
+        self.fleet_window.destroy()
+        self.fleet_window = None
+        
+    def _cancel_fleet_refresh(self):
+        if self._fleet_refresh_id is not None:
+            self.root.after_cancel(self._fleet_refresh_id)
+            self._fleet_refresh_id = None
+        
+    def fleet_add_scanned(self):
+        """Add every relay board from the last scan to the fleet"""
+        group = self.fleet_group_entry.get().strip() or None
+        added = 0
+        for device in self.device_cache.devices():
+            # Only boards advertising the relay service, as the scan's stop-early target
+            if matches_target(device, self.service_uuid):
+                self.fleet.add(device.address, device.name, group)
+                added += 1
+        if not added:
+            message = "No relay boards in the last scan" if len(self.device_cache) else "Scan for devices first"
+            self.show_custom_message("Fleet", message, "warning")
+        self.refresh_fleet_view()
+        
+    def fleet_connect_all(self):
+        """Connect every fleet device, a few at a time"""
+        future = self.fleet.connect()
+        
+        def report(future):
+            try:
+                failed = {a: e for a, e in future.result().items() if e}
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: self.show_custom_message("Fleet", f"Connect failed: {error}", "error"))
+                return
+            if failed:
+                logger.warning(f"Fleet connect failures: {failed}")
                 
-        except Exception as e:
-            logger.error(f"Failed to send command: {e}")
-            self.root.after(0, lambda: self.show_custom_message("Command Error", 
-                                                               f"Failed to send command: {e}", "error"))
+        future.add_done_callback(report)
+        
+    def fleet_disconnect_all(self):
+        self.fleet.disconnect()
+        
+    def fleet_send(self, relay_index, state):
+        """Fan a relay command out to the selected group (or every board)"""
+        target = self.fleet_target_combo.get()
+        sent = self.fleet.send(relay_index, state, group=None if target == "All" else target)
+        if not sent:
+            self.show_custom_message("Fleet", "No connected devices in the selected target", "warning")
+            
+    def refresh_fleet_view(self, periodic=False):
+        """Redraw per-device status, confirmed relay states and ACK latency"""
+        if self.fleet_window is None or not self.fleet_window.winfo_exists():
+            if periodic:
+                self._fleet_refresh_id = None
+            return
             
+        self.fleet_target_combo.configure(values=["All"] + self.fleet.groups)
+        fmt = lambda value: "--" if value is None else f"{value:.1f}"
+        lines = [f"{'Device':<24}{'Group':<10}{'Status':<13}{'Relays':<8}{'p50 ms':>8}{'p95 ms':>8}{'Timeouts':>10}"]
+        for row in self.fleet.snapshot():
+            states = "".join(str(state) for state in row["states"])
+            lines.append(f"{row['name'][:23]:<24}{(row['group'] or '-')[:9]:<10}{row['status']:<13}{states:<8}"
+                         f"{fmt(row['p50_ms']):>8}{fmt(row['p95_ms']):>8}{row['timeouts']:>10}")
+        self.fleet_list.configure(state="normal")
+        self.fleet_list.delete("1.0", "end")
+        self.fleet_list.insert("1.0", "\n".join(lines))
+        self.fleet_list.configure(state="disabled")
+        
+        if periodic:
+            # One chain only: a reopened window replaces the old window's pending refresh
+            self._cancel_fleet_refresh()
+            self._fleet_refresh_id = self.root.after(1000, lambda: self.refresh_fleet_view(periodic=True))
+        
     def run(self):
         """Start the application"""
         try:
@@ -540,6 +930,8 @@ class ModernBLERelayController:
             # Clean up
             if self.client:
                 asyncio.run_coroutine_threadsafe(self._disconnect_device(), self.loop)
+            if self.fleet.devices:
+                self.fleet.disconnect()
             self.loop.call_soon_threadsafe(self.loop.stop)
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+import time
+
+# Frame clock rate; no animation is stepped more often than this
+DEFAULT_FPS = 20
+
+# Time one frame may spend stepping animations before the rest wait a frame (seconds)
+FRAME_BUDGET = 0.008
+
+
+class _Animation:
+    __slots__ = ("key", "step", "period", "due", "frames")
+
+    def __init__(self, key, step, period, due):
+        self.key = key
+        self.step = step
+        self.period = period
+        self.due = due
+        self.frames = 0
+
+
+class Animator:
+    """One frame clock that owns every widget animation in a window
+
+    Animations are keyed (usually by widget), and starting one for a key
+    replaces whatever ran for it, so repeated presses never stack timers.
+    step() is called every `period` seconds and returns False to end the
+    animation. At most one root.after timer is pending at a time: the
+    clock sleeps until the next animation is due, never ticks faster than
+    fps, steps everything due in the same frame together and stops
+    stepping once a frame has used its budget. While the window is
+    minimized the clock is paused entirely.
+    """
+
+    def __init__(self, root, fps=DEFAULT_FPS, frame_budget=FRAME_BUDGET):
+        self.root = root
+        self.frame_interval = 1.0 / fps
+        self.frame_budget = frame_budget
+        self.paused = False
+        self._animations = {}
+        self._timer = None
+        self._timer_due = None
+        self._last_frame = 0.0
+
+        # Counters for diagnostics
+        self.frames = 0
+        self.steps = 0
+        self.overruns = 0
+
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+
+    def __len__(self):
+        return len(self._animations)
+
+    def __contains__(self, key):
+        return key in self._animations
+
+    def start(self, key, step, period, delay=None):
+        """Run step() every period seconds until it returns False or stop(key)
+
+        The first step runs after `delay` (default: one period).
+        """
+        now = time.monotonic()
+        self._animations[key] = _Animation(key, step, period, now + (period if delay is None else delay))
+        self._schedule(now)
+
+    def stop(self, key):
+        self._animations.pop(key, None)
+        if not self._animations:
+            self._cancel()
+
+    def stop_all(self):
+        self._animations.clear()
+        self._cancel()
+
+    def metrics(self):
+        return {"active": len(self._animations), "frames": self.frames,
+                "steps": self.steps, "overruns": self.overruns}
+
+    # Frame clock
+
+    def _schedule(self, now):
+        if self.paused or not self._animations:
+            return
+        # Never tick sooner than one frame after the last one
+        due = max(min(a.due for a in self._animations.values()),
+                  self._last_frame + self.frame_interval, now)
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._cancel()
+        self._timer_due = due
+        self._timer = self.root.after(max(1, int((due - now) * 1000)), self._tick)
+
+    def _cancel(self):
+        if self._timer is not None:
+            try:
+                self.root.after_cancel(self._timer)
+            except Exception:
+                pass
+        self._timer = None
+        self._timer_due = None
+
+    def _tick(self):
+        self._timer = None
+        self._timer_due = None
+        if self.paused:
+            return
+        if self.root.state() in ("iconic", "withdrawn"):
+            self._pause()
+            return
+
+        self.frames += 1
+        start = self._last_frame = time.monotonic()
+        # Anything due within this frame is drawn now rather than a frame later
+        horizon = start + self.frame_interval / 2
+        deadline = start + self.frame_budget
+        for animation in sorted(self._animations.values(), key=lambda a: a.due):
+            if animation.due > horizon:
+                break
+            if time.monotonic() >= deadline:
+                self.overruns += 1
+                break
+            try:
+                keep = animation.step() is not False
+            except Exception:
+                keep = False
+            self.steps += 1
+            animation.frames += 1
+            if self._animations.get(animation.key) is not animation:
+                continue  # Replaced or stopped from inside step()
+            if keep:
+                animation.due = max(animation.due + animation.period, start)
+            else:
+                del self._animations[animation.key]
+        self._schedule(time.monotonic())
+
+    # Minimize handling
+
+    def _pause(self):
+        self.paused = True
+        self._cancel()
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self._pause()
+
+    def _on_map(self, event):
+        if event.widget is self.root and self.paused:
+            self.paused = False
+            now = time.monotonic()
+            for animation in self._animations.values():
+                animation.due = max(animation.due, now)
+            self._schedule(now)
@@ -0,0 +1,125 @@
+"""Timer and redraw load of relay pulse effects: per-press after() chains vs one Animator
+
+Replays a burst of relay presses against a stand-in Tk root (no display
+needed) that runs after() callbacks on time and counts timers and widget
+configure() calls. The old design starts a new 500 ms pulse chain on
+every press; the Animator keeps one animation per button on one clock.
+
+    python benchmarks/bench_animation.py [--seconds 5] [--presses-per-second 10]
+"""
+import argparse
+import heapq
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animator
+
+RELAYS = 4
+
+
+class StandInRoot:
+    """Just enough of a Tk root to run after() timers in real time"""
+
+    def __init__(self):
+        self.timers = []
+        self.ids = itertools.count()
+        self.cancelled = set()
+        self.scheduled = 0
+
+    def after(self, ms, callback):
+        self.scheduled += 1
+        timer_id = next(self.ids)
+        heapq.heappush(self.timers, (time.monotonic() + ms / 1000, timer_id, callback))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def state(self):
+        return "normal"
+
+    @property
+    def pending(self):
+        return sum(1 for _, timer_id, _ in self.timers if timer_id not in self.cancelled)
+
+    def run_until(self, deadline):
+        while self.timers and self.timers[0][0] <= deadline:
+            due, timer_id, callback = heapq.heappop(self.timers)
+            if timer_id in self.cancelled:
+                continue
+            time.sleep(max(0.0, due - time.monotonic()))
+            callback()
+
+
+class Button:
+    def __init__(self):
+        self.configures = 0
+
+    def configure(self, **kwargs):
+        self.configures += 1
+
+
+def legacy_press(root, button, states, index):
+    """The old start_relay_pulse: a fresh 500 ms chain per press"""
+    def pulse():
+        if not states[index]:
+            return
+        button.configure(fg_color="toggle")
+        root.after(500, pulse)
+    states[index] = True
+    pulse()
+
+
+def animator_press(animator, button, states, index):
+    if button in animator:
+        return
+    def step():
+        if not states[index]:
+            return False
+        button.configure(fg_color="toggle")
+    states[index] = True
+    animator.start(button, step, 0.5, delay=0)
+
+
+def run(design, seconds, rate):
+    root = StandInRoot()
+    animator = Animator(root) if design == "animator" else None
+    buttons = [Button() for _ in range(RELAYS)]
+    states = [False] * RELAYS
+    start = time.monotonic()
+    presses = int(seconds * rate)
+    for n in range(presses):
+        index = n % RELAYS
+        if animator is not None:
+            animator_press(animator, buttons[index], states, index)
+        else:
+            legacy_press(root, buttons[index], states, index)
+        root.run_until(start + (n + 1) / rate)
+    root.run_until(start + seconds)
+    elapsed = time.monotonic() - start
+    configures = sum(b.configures for b in buttons)
+    return root.pending, root.scheduled / elapsed, configures / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--presses-per-second", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'design':<10}{'pending timers':>16}{'timers/s':>10}{'redraws/s':>11}")
+    for design in ("legacy", "animator"):
+        pending, timers, redraws = run(design, args.seconds, args.presses_per_second)
+        print(f"{design:<10}{pending:>16}{timers:>10.1f}{redraws:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
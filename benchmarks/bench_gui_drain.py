@@ -0,0 +1,140 @@
+"""Tick time and frame rate of the data monitor at 1k/10k/100k messages per second
+
+A producer thread appends records to a CaptureFile at each rate, the way
+the receive path does, while the GUI tick runs what update_gui does for
+the data monitor: VirtualLog.refresh() and one screen of rows rendered
+into a text sink, re-rendered only when the tail moved. Each rate is
+run with the plain text view and with a regex filter indexed in the
+background, and reports ticks per second, tick time and how many
+records the view was behind when the producer stopped.
+
+The sink is a real tkinter Text widget when a display is available and
+otherwise a headless Tcl interpreter string, which still pays the
+Python -> Tcl crossing of each update.
+
+    python benchmarks/bench_gui_drain.py [--seconds 2] [--rates 1000,10000,100000] [--rows 50]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+import tkinter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_file import CaptureFile
+from virtual_log import VirtualLog
+
+# The app's update_gui intervals (s): idle, and while an index is catching up
+TICK_INTERVAL = 0.1
+BUSY_INTERVAL = 0.01
+
+
+class TclSink:
+    """Headless stand-in for the monitor's Textbox: replaces a Tcl variable"""
+
+    def __init__(self):
+        self.tcl = tkinter.Tcl()
+        self.tcl.setvar("buf", "")
+
+    def replace(self, text):
+        self.tcl.call("set", "buf", text)
+
+
+class TextSink:
+    """Real Tk text widget, used when a display is available"""
+
+    def __init__(self):
+        self.root = tkinter.Tk()
+        self.root.withdraw()
+        self.text = tkinter.Text(self.root)
+
+    def replace(self, text):
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", text)
+        self.root.update_idletasks()
+
+
+def make_sink():
+    try:
+        return TextSink()
+    except tkinter.TclError:
+        return TclSink()
+
+
+def produce(capture, rate, seconds, stop):
+    """Append telemetry-like records at roughly `rate` per second"""
+    batch = max(1, rate // 1000)
+    interval = batch / rate
+    next_time = time.perf_counter()
+    end = next_time + seconds
+    n = 0
+    while not stop.is_set() and time.perf_counter() < end:
+        for _ in range(batch):
+            capture.append(b"sample %d code=%d with some payload text" % (n, n % 97))
+            n += 1
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def tick(log, sink, rows, drawn):
+    """One update_gui pass over the monitor (VirtualLogView.refresh + redraw)"""
+    log.refresh()
+    top = max(log.first_row, log.row_count - rows)
+    state = (top, log.row_count)
+    if state != drawn[0]:
+        drawn[0] = state
+        sink.replace("\n".join(log.render(top, rows)))
+    return log.pending
+
+
+def run(sink, rate, seconds, rows, predicate, directory):
+    capture = CaptureFile(directory=directory)
+    log = VirtualLog(capture, predicate=predicate, background=True)
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, args=(capture, rate, seconds, stop), daemon=True)
+    drawn = [None]
+
+    tick_times = []
+    start = time.perf_counter()
+    producer.start()
+    while producer.is_alive():
+        t0 = time.perf_counter()
+        pending = tick(log, sink, rows, drawn)
+        tick_times.append(time.perf_counter() - t0)
+        time.sleep(BUSY_INTERVAL if pending else TICK_INTERVAL)
+    elapsed = time.perf_counter() - start
+    behind = capture.end_index - log._scanned if log.indexed else 0
+    stop.set()
+    log.close()
+    capture.close()
+    return len(tick_times) / elapsed, statistics.median(tick_times), max(tick_times), behind
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--rates", default="1000,10000,100000")
+    parser.add_argument("--rows", type=int, default=50, help="visible rows")
+    parser.add_argument("--directory", help="where the capture files go (default: temp dir)")
+    args = parser.parse_args()
+
+    pattern = re.compile(rb"code=(?:1|2)0\b")
+    views = (("text", None), ("filtered", lambda timestamp, data, source: pattern.search(data) is not None))
+
+    sink = make_sink()
+    print(f"sink: {type(sink).__name__}")
+    print(f"{'rate msg/s':>11}  {'view':<10}{'ticks/s':>8}{'tick p50 ms':>13}{'tick max ms':>13}{'behind':>8}")
+    for rate in (int(r) for r in args.rates.split(",")):
+        for name, predicate in views:
+            fps, p50, worst, behind = run(sink, rate, args.seconds, args.rows, predicate, args.directory)
+            print(f"{rate:>11}  {name:<10}{fps:>8.1f}{p50 * 1000:>13.2f}{worst * 1000:>13.2f}{behind:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Throughput benchmark for the hex renderers
+
+Compares the original per-byte f-string join against render.format_hex
+and render.hexdump over several buffer sizes and reports bytes/sec.
+
+    python benchmarks/bench_hex_format.py
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render import format_hex, hexdump
+
+
+def legacy_hex(data):
+    return " ".join([f"{b:02X}" for b in data])
+
+
+def throughput(func, data, min_seconds):
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        func(data)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return runs * len(data) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,4096,1048576")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    renderers = [
+        ("legacy f-string", legacy_hex),
+        ("format_hex", format_hex),
+        ("format_hex g4", lambda data: format_hex(data, 4)),
+        ("hexdump", hexdump),
+    ]
+
+    sample = os.urandom(256)
+    assert format_hex(sample) == legacy_hex(sample)
+
+    print(f"{'size':>9}  {'renderer':<18}{'MB/s':>10}{'speedup':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        data = os.urandom(size)
+        baseline = None
+        for name, func in renderers:
+            rate = throughput(func, data, args.seconds)
+            baseline = baseline or rate
+            print(f"{size:>9}  {name:<18}{rate / 1e6:>10.2f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Many concurrent serial ports: one SerialHub thread vs a SerialReader per port
+
+Opens N pty-backed virtual serial ports (POSIX only), writes to all of
+them at once and reports write-to-callback latency, CPU per MB received
+and the thread count for each reader strategy. Every port feeds a
+CaptureSession sharing one CaptureStore, and the merged store is checked
+to be time-ordered with each port's records in its own order.
+
+    python benchmarks/bench_multi_port.py [--ports 1 4 16] [--rounds 200]
+"""
+import argparse
+import os
+import pty
+import statistics
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_session import CaptureSession
+from capture_store import CaptureStore
+from framing import make_framer
+from serial_hub import SerialHub
+from serial_reader import READER_BLOCKING
+
+
+def open_virtual_port():
+    """Return (master_fd, slave_path) for a raw pty pair"""
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    return master, slave, path
+
+
+def run(strategy, port_count, rounds, payload_size):
+    store = CaptureStore()
+    hub = SerialHub().start() if strategy == "hub" else None
+    pending = threading.Semaphore(0)
+    latencies = []
+    sent_at = {}
+
+    def on_record(data, timestamp):
+        latencies.append(timestamp - sent_at[data[:8]])
+        pending.release()
+
+    ports = []
+    sessions = []
+    for source in range(port_count):
+        master, slave, path = open_virtual_port()
+        session = CaptureSession(make_framer("Line (\\n)"), store=store, on_record=on_record,
+                                 source=source, hub=hub)
+        session.open_serial(path, 115200, reader_mode=READER_BLOCKING)
+        os.close(slave)
+        ports.append(master)
+        sessions.append(session)
+    time.sleep(0.1)
+
+    threads = threading.active_count()
+    filler = b"x" * max(0, payload_size - 13)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        for n in range(rounds):
+            for source, master in enumerate(ports):
+                key = b"%03d%05d" % (source, n)
+                sent_at[key] = time.monotonic()
+                os.write(master, key + filler + b"\n")
+            for _ in ports:
+                if not pending.acquire(timeout=2.0):
+                    raise RuntimeError(f"{strategy}: record lost")
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+    finally:
+        for session in sessions:
+            session.close()
+        if hub:
+            hub.stop()
+        for master in ports:
+            os.close(master)
+
+    check_merge(store, port_count, rounds)
+    megabytes = store.byte_count / 1e6
+    return latencies, cpu / megabytes, wall, threads
+
+
+def check_merge(store, port_count, rounds):
+    """The merged store must hold every record, each source in send order"""
+    records = store.tagged_records()
+    if len(records) != port_count * rounds:
+        raise AssertionError(f"expected {port_count * rounds} records, got {len(records)}")
+    last = {}
+    for timestamp, data, source in records:
+        n = int(data[3:8])
+        if int(data[:3]) != source or n <= last.get(source, -1):
+            raise AssertionError(f"source {source} out of order at record {n}")
+        last[source] = n
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--payload", type=int, default=64, help="bytes per record")
+    args = parser.parse_args()
+
+    if not hasattr(pty, "openpty"):
+        print("needs POSIX ptys")
+        return 1
+
+    print(f"{'ports':>5} {'reader':<8}{'threads':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}{'CPU s/MB':>10}{'wall s':>8}")
+    for port_count in args.ports:
+        for strategy in ("hub", "threads"):
+            latencies, cpu_per_mb, wall, threads = run(strategy, port_count, args.rounds, args.payload)
+            print(f"{port_count:>5} {strategy:<8}{threads:>8}"
+                  f"{statistics.median(latencies) * 1000:>9.3f}"
+                  f"{percentile(latencies, 99) * 1000:>9.3f}"
+                  f"{max(latencies) * 1000:>9.3f}{cpu_per_mb:>10.3f}{wall:>8.2f}")
+    print("\nmerged stream: every source complete and in order")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
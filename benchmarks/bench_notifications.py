@@ -0,0 +1,66 @@
+"""Notification bursts: toasts shown, widgets and timers needed, post() cost
+
+Replays error bursts through NotificationQueue with a simulated clock.
+The old show_notification created a frame, a label and a 3 s timer per
+call (and Relay.py opened a modal dialog per call); the pooled toast
+keeps one widget and coalesces or rate-limits the rest.
+
+    python benchmarks/bench_notifications.py [--messages 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notifications import NotificationQueue
+
+SCENARIOS = {
+    "same error": lambda n: "Serial error: device disconnected",
+    "10 distinct": lambda n: f"Write failed on relay {n % 10}",
+    "all distinct": lambda n: f"Scan result {n}",
+}
+
+
+def replay(message_for, messages, burst_seconds):
+    queue = NotificationQueue()
+    shown = []
+    now = 0.0
+    step = burst_seconds / messages
+    elapsed = 0.0
+    for n in range(messages):
+        start = time.perf_counter()
+        queue.post(message_for(n), "error", now)
+        elapsed += time.perf_counter() - start
+        notification = queue.next(now)
+        if notification is not None:
+            shown.append(notification)
+        now += step
+    # Drain what is left at the rate limit
+    while len(queue):
+        now += queue.retry_in(now) or 0.01
+        notification = queue.next(now)
+        if notification is not None:
+            shown.append(notification)
+    return queue, shown, elapsed / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--burst-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{args.messages} notifications in {args.burst_seconds:.1f} s; "
+          f"old design: {args.messages} frames, {args.messages} timers\n")
+    print(f"{'scenario':<14}{'toasts':>8}{'coalesced':>11}{'dropped':>9}{'max count':>11}{'post us':>9}")
+    for name, message_for in SCENARIOS.items():
+        queue, shown, per_post = replay(message_for, args.messages, args.burst_seconds)
+        print(f"{name:<14}{len(shown):>8}{queue.coalesced:>11}{queue.dropped:>9}"
+              f"{max(n.count for n in shown):>11}{per_post * 1e6:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
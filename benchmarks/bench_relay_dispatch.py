@@ -0,0 +1,80 @@
+"""Throughput and latency of relay command dispatch modes
+
+Drives RelayCommandDispatcher against a simulated ESP32 relay board
+(tests/fake_ble.py relay_peripheral) with a jog-style workload: rapid press /
+release pairs on all four relays, submitted faster than the link can
+take acknowledged writes. Compares one acked write per command against
+coalescing, write-without-response and batched S<states> frames.
+
+    python benchmarks/bench_relay_dispatch.py [--pairs 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ble_service import BleService
+from tests.fake_ble import FakeBackend, relay_peripheral
+from relay_dispatcher import RelayCommandDispatcher
+
+CHAR_UUID = "12345678-1234-1234-1234-123456789abc"
+ADDRESS = "AA:BB:CC:DD:EE:01"
+
+MODES = [
+    ("acked, per command", dict(coalesce=False, batch=False, response=True)),
+    ("acked, coalesced", dict(coalesce=True, batch=False, response=True)),
+    ("no-response, coalesced", dict(coalesce=True, batch=False, response=False)),
+    ("acked, batched frame", dict(coalesce=True, batch=True, response=True)),
+    ("no-response, batched", dict(coalesce=True, batch=True, response=False)),
+]
+
+
+def run(service, client, options, pairs, interval):
+    write = lambda payload, response: client.write_gatt_char(CHAR_UUID, payload, response=response)
+    dispatcher = RelayCommandDispatcher(service.loop, write, max_queue=10 ** 6, **options)
+    submitted = 0
+
+    start = time.monotonic()
+    for i in range(pairs):
+        relay = i % 4
+        dispatcher.submit(relay, 1)
+        dispatcher.submit(relay, 0)
+        submitted += 2
+        time.sleep(interval)
+    while dispatcher.dispatched + dispatcher.coalesced + dispatcher.dropped + dispatcher.rejected < submitted:
+        time.sleep(0.001)
+    elapsed = time.monotonic() - start
+    dispatcher.stop()
+
+    metrics = dispatcher.metrics()
+    return elapsed, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=200, help="press/release pairs to send")
+    parser.add_argument("--interval", type=float, default=0.002, help="seconds between pairs")
+    parser.add_argument("--write-delay", type=float, default=0.015,
+                        help="simulated acknowledged write round trip")
+    parser.add_argument("--write-nr-delay", type=float, default=0.001,
+                        help="simulated write-without-response cost")
+    args = parser.parse_args()
+
+    peripheral = relay_peripheral(ADDRESS, write_delay=args.write_delay, write_nr_delay=args.write_nr_delay)
+    backend = FakeBackend([peripheral])
+    service = BleService(backend.scanner_cls, backend.client_cls).start()
+    client = service.connect(ADDRESS).result(5)
+
+    print(f"{'mode':<24}{'wall s':>8}{'writes':>8}{'cmd/s':>9}{'p50 ms':>9}{'p95 ms':>9}  final states")
+    for name, options in MODES:
+        elapsed, m = run(service, client, options, args.pairs, args.interval)
+        print(f"{name:<24}{elapsed:>8.2f}{m['writes']:>8}{2 * args.pairs / elapsed:>9.0f}"
+              f"{m['p50_ms']:>9.1f}{m['p95_ms']:>9.1f}  {peripheral.relay_states}")
+
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
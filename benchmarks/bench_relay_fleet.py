@@ -0,0 +1,99 @@
+"""Wall time to switch a relay on N boards: sequential vs fleet fan-out
+
+Connects N simulated ESP32 relay boards (tests/fake_ble.py relay_peripheral) via
+RelayFleet, then measures how long it takes until every board has
+acknowledged one relay command. The sequential baseline awaits each
+board's write and ACK in turn, the way an operator working through
+boards one at a time would; the fleet submits to every board's
+dispatcher at once so writes overlap on the shared loop.
+
+    python benchmarks/bench_relay_fleet.py [--sizes 1 2 4 8 16 32]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ble_service import BleService
+from tests.fake_ble import FakeBackend, relay_peripheral
+from relay_fleet import RelayFleet
+
+
+def wait_for_acks(devices, targets, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while any(d.ack_tracker.acked < targets[d.address] for d in devices):
+        if time.monotonic() > deadline:
+            raise TimeoutError("boards did not acknowledge in time")
+        time.sleep(0.0005)
+
+
+async def sequential(devices, relay, state):
+    for device in devices:
+        target = device.ack_tracker.acked + 1
+        device.dispatcher.submit(relay, state)
+        while device.ack_tracker.acked < target:
+            await asyncio.sleep(0.0005)
+
+
+def run(size, args):
+    peripherals = [relay_peripheral(f"AA:BB:CC:00:{i // 256:02X}:{i % 256:02X}",
+                                    connect_delay=args.connect_delay, write_delay=args.write_delay,
+                                    notify_delay=args.notify_delay)
+                   for i in range(size)]
+    backend = FakeBackend(peripherals)
+    service = BleService().start()
+    fleet = RelayFleet(service.loop, backend.client_cls, max_connects=args.max_connects)
+    for peripheral in peripherals:
+        fleet.add(peripheral.address)
+
+    start = time.monotonic()
+    failures = {a: e for a, e in fleet.connect().result(60).items() if e}
+    connect_s = time.monotonic() - start
+    if failures:
+        raise RuntimeError(f"connect failed: {failures}")
+    devices = list(fleet.devices.values())
+
+    sequential_s = []
+    fanout_s = []
+    for round_ in range(args.rounds):
+        state = round_ % 2
+        start = time.monotonic()
+        asyncio.run_coroutine_threadsafe(sequential(devices, 0, state), service.loop).result(60)
+        sequential_s.append(time.monotonic() - start)
+
+        targets = {d.address: d.ack_tracker.acked + 1 for d in devices}
+        start = time.monotonic()
+        fleet.broadcast(1, state)
+        wait_for_acks(devices, targets)
+        fanout_s.append(time.monotonic() - start)
+
+    fleet.shutdown()
+    service.shutdown()
+    return connect_s, min(sequential_s), min(fanout_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-connects", type=int, default=4)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    parser.add_argument("--write-delay", type=float, default=0.015, help="acknowledged write round trip")
+    parser.add_argument("--notify-delay", type=float, default=0.005, help="firmware ACK delay")
+    args = parser.parse_args()
+
+    print(f"{'boards':>6}{'connect s':>11}{'sequential ms':>15}{'fan-out ms':>12}{'speedup':>9}")
+    base = None
+    for size in args.sizes:
+        connect_s, sequential_s, fanout_s = run(size, args)
+        base = base or fanout_s
+        print(f"{size:>6}{connect_s:>11.2f}{sequential_s * 1000:>15.1f}{fanout_s * 1000:>12.1f}"
+              f"{sequential_s / fanout_s:>8.1f}x")
+    print(f"fan-out wall time grows {fanout_s / base:.1f}x for {args.sizes[-1] // args.sizes[0]}x boards")
+
+
+if __name__ == "__main__":
+    main()
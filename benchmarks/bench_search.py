@@ -0,0 +1,101 @@
+"""History search speed and GUI-thread cost of the live filter
+
+Fills a CaptureFile with synthetic telemetry where one record in
+--every is an error line, then reports:
+
+- how long a background search takes to count every match, scanning
+  and through the keyword index (once the index has caught up)
+- the GUI-thread time per tick of a regex-filtered view while it indexes
+  the whole history, with the index built inline (SCAN_BUDGET records a
+  tick) and by the background indexer (refresh() only wakes it)
+
+    python benchmarks/bench_search.py [--records 1000000] [--every 5000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_file import CaptureFile
+from search import compile_pattern, KeywordIndex, RecordSearch
+from virtual_log import VirtualLog
+
+
+def wait_search(capture, pattern, keyword_index=None):
+    start = time.perf_counter()
+    search = RecordSearch(capture, pattern, keyword_index=keyword_index)
+    while not search.caught_up:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    search.cancel()
+    search.thread.join()
+    return elapsed, search.count, search.used_index
+
+
+def tick_times(log, rows=50):
+    """GUI-thread seconds per tick (refresh + render one screen) until the index catches up"""
+    samples = []
+    start = time.perf_counter()
+    while True:
+        tick = time.perf_counter()
+        log.refresh()
+        log.render(max(0, log.row_count - rows), rows)
+        samples.append(time.perf_counter() - tick)
+        if not log.pending:
+            break
+        time.sleep(0.01)  # The Tk loop's busy interval
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--every", type=int, default=5000, help="one error record per N")
+    parser.add_argument("--directory", default=None, help="where the capture file is created")
+    args = parser.parse_args()
+
+    capture = CaptureFile(directory=args.directory)
+    for n in range(args.records):
+        if n % args.every == 0:
+            payload = b"ERR sensor_fault code=%d" % n
+        else:
+            payload = b"T=23.51,H=41.20,P=1013.25,V=3.301,I=0.124,status=OK"
+        capture.append(payload, n * 0.001, n % 4)
+    print(f"{args.records} records, {args.records // args.every} errors")
+
+    index = KeywordIndex(capture)
+    start = time.perf_counter()
+    index.start()
+    while index.indexed < capture.end_index and not index.saturated:
+        time.sleep(0.01)
+    print(f"keyword index built in {time.perf_counter() - start:.2f}s"
+          f"{' (saturated)' if index.saturated else ''}")
+
+    print(f"\n{'search':<28}{'seconds':>9}{'matches':>9}{'via index':>11}")
+    for name, pattern, keyword_index in [
+        ("text 'sensor_fault', scan", compile_pattern("sensor_fault"), None),
+        ("text 'sensor_fault', index", compile_pattern("sensor_fault"), index),
+        ("regex code=\\d+0\\b", compile_pattern(r"code=\d+0\b", "Regex"), index),
+    ]:
+        elapsed, count, used = wait_search(capture, pattern, keyword_index)
+        print(f"{name:<28}{elapsed:>9.3f}{count:>9}{'yes' if used else 'no':>11}")
+    index.stop()
+
+    print(f"\n{'filtered view':<28}{'ticks':>7}{'p50 ms':>9}{'max ms':>9}{'caught up s':>13}")
+    matcher = compile_pattern(r"ERR|status=FAIL", "Regex").matcher()
+    for name, background in (("index on GUI thread", False), ("background indexer", True)):
+        log = VirtualLog(capture, predicate=matcher, background=background)
+        samples, elapsed = tick_times(log)
+        print(f"{name:<28}{len(samples):>7}{statistics.median(samples) * 1000:>9.2f}"
+              f"{max(samples) * 1000:>9.2f}{elapsed:>13.2f}")
+        log.close()
+
+    capture.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
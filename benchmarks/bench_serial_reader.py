@@ -0,0 +1,99 @@
+"""Latency and idle-CPU benchmark for the serial reader modes
+
+Runs each SerialReader mode against a pty-backed virtual serial port
+(POSIX only) and reports write-to-callback latency and the CPU burned
+while the line is idle.
+
+    python benchmarks/bench_serial_reader.py [--messages 500]
+"""
+import argparse
+import os
+import pty
+import statistics
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial
+
+from serial_reader import SerialReader, READER_MODES
+
+
+def open_virtual_port():
+    """Return (master_fd, serial.Serial) connected through a pty pair"""
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    port = serial.Serial(os.ttyname(slave), baudrate=115200, timeout=1)
+    os.close(slave)
+    return master, port
+
+
+def measure_latency(mode, messages, interval):
+    master, port = open_virtual_port()
+    received = threading.Event()
+    arrivals = []
+
+    def on_data(data, timestamp):
+        arrivals.append(timestamp)
+        received.set()
+
+    reader = SerialReader(port, on_data, mode=mode).start()
+    latencies = []
+    try:
+        for _ in range(messages):
+            received.clear()
+            sent = time.monotonic()
+            os.write(master, b"ping\n")
+            if received.wait(1.0):
+                latencies.append(arrivals[-1] - sent)
+            time.sleep(interval)
+    finally:
+        reader.stop()
+        port.close()
+        os.close(master)
+    return latencies
+
+
+def measure_idle_cpu(mode, seconds):
+    master, port = open_virtual_port()
+    reader = SerialReader(port, lambda data, timestamp: None, mode=mode).start()
+    try:
+        start = time.process_time()
+        time.sleep(seconds)
+        return time.process_time() - start
+    finally:
+        reader.stop()
+        port.close()
+        os.close(master)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.003,
+                        help="pause between messages in seconds")
+    parser.add_argument("--idle", type=float, default=2.0,
+                        help="idle window for the CPU measurement in seconds")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'idle CPU %':>12}")
+    for mode in reversed(READER_MODES):
+        latencies = [x * 1000 for x in measure_latency(mode, args.messages, args.interval)]
+        idle_cpu = measure_idle_cpu(mode, args.idle) / args.idle * 100
+        if not latencies:
+            print(f"{mode:<10}{'no data':>40}")
+            continue
+        print(f"{mode:<10}{statistics.median(latencies):>10.3f}{percentile(latencies, 95):>10.3f}"
+              f"{percentile(latencies, 99):>10.3f}{max(latencies):>10.3f}{idle_cpu:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
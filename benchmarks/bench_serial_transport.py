@@ -0,0 +1,139 @@
+"""Context switches and CPU per MB: asyncio serial transport vs reader thread
+
+Streams data from a child process into a pty-backed virtual serial port
+(POSIX only) and receives it either with the threaded SerialReader next
+to an idle BLE service loop (the old design: two concurrency models), or
+as a SerialTransport on that same loop. Both feed a framer and a
+CaptureStore. Reports throughput, process CPU per MB and voluntary /
+involuntary context switches per MB from getrusage, as the median of
+--runs runs with the voluntary range alongside.
+
+What the asyncio design saves is the reader thread, not context
+switches. With 64-byte writes both designs wake about once per write:
+voluntary switches per MB vary from run to run (tens per MB, see the
+range column) by more than the two designs differ, and involuntary
+switches and CPU per MB are the same. From 256-byte writes on, both
+designs are in the single digits per MB and bound by the pty.
+
+    python benchmarks/bench_serial_transport.py [--megabytes 8] [--chunk 64 4096] [--runs 3]
+"""
+import argparse
+import os
+import pty
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial
+
+from ble_service import BleService
+from capture_store import CaptureStore
+from framing import make_framer
+from serial_reader import SerialReader, READER_SELECT
+
+# Child process that writes `total` bytes of newline-terminated records in `chunk`-byte writes
+WRITER = """
+import os, sys
+fd, total, chunk = map(int, sys.argv[1:])
+block = (b"x" * (chunk - 1) + b"\\n") * max(1, 65536 // chunk)
+sent = 0
+while sent < total:
+    data = block[:min(chunk, total - sent)]
+    sent += os.write(fd, data)
+"""
+
+
+def usage():
+    r = resource.getrusage(resource.RUSAGE_SELF)
+    return r.ru_utime + r.ru_stime, r.ru_nvcsw, r.ru_nivcsw
+
+
+def run(design, total, chunk):
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+
+    service = BleService().start()
+    store = CaptureStore()
+    framer = make_framer("Line (\\n)")
+    received = [0]
+    done = threading.Event()
+
+    def on_data(data, timestamp):
+        for frame_time, record in framer.feed(data, timestamp):
+            store.append(record, frame_time)
+        received[0] += len(data)
+        if received[0] >= total:
+            done.set()
+
+    if design == "asyncio":
+        link = service.open_serial(path, on_data, baudrate=115200).result(5)
+        reader = None
+    else:
+        link = serial.Serial(path, baudrate=115200, timeout=1)
+        reader = SerialReader(link, on_data, mode=READER_SELECT).start()
+    os.close(slave)
+    time.sleep(0.1)
+
+    cpu0, vol0, invol0 = usage()
+    start = time.perf_counter()
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, str(master), str(total), str(chunk)],
+                              pass_fds=(master,))
+    if not done.wait(120):
+        raise RuntimeError(f"{design}: received {received[0]} of {total} bytes")
+    elapsed = time.perf_counter() - start
+    cpu1, vol1, invol1 = usage()
+    writer.wait()
+
+    if reader:
+        reader.stop()
+        link.close()
+    else:
+        service.close_serial(link)
+    service.shutdown()
+    os.close(master)
+
+    megabytes = total / 1e6
+    return {
+        "mb_s": megabytes / elapsed,
+        "cpu_mb": (cpu1 - cpu0) / megabytes,
+        "vol_mb": (vol1 - vol0) / megabytes,
+        "invol_mb": (invol1 - invol0) / megabytes,
+        "threads": 2 if reader else 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=8)
+    parser.add_argument("--chunk", type=int, nargs="+", default=[64, 4096],
+                        help="writer chunk sizes in bytes")
+    parser.add_argument("--runs", type=int, default=3, help="runs per design; medians are reported")
+    args = parser.parse_args()
+
+    if not hasattr(pty, "openpty"):
+        print("needs POSIX ptys")
+        return 1
+
+    total = int(args.megabytes * 1e6)
+    print(f"{'chunk':>6} {'design':<9}{'I/O threads':>12}{'MB/s':>8}{'CPU s/MB':>10}"
+          f"{'vol cs/MB':>11}{'(range)':>10}{'invol cs/MB':>13}")
+    for chunk in args.chunk:
+        for design in ("threaded", "asyncio"):
+            runs = [run(design, total, chunk) for _ in range(args.runs)]
+            r = {key: statistics.median(result[key] for result in runs) for key in runs[0]}
+            spread = f"{min(x['vol_mb'] for x in runs):.0f}-{max(x['vol_mb'] for x in runs):.0f}"
+            print(f"{chunk:>6} {design:<9}{r['threads']:>12.0f}{r['mb_s']:>8.1f}{r['cpu_mb']:>10.3f}"
+                  f"{r['vol_mb']:>11.0f}{spread:>10}{r['invol_mb']:>13.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
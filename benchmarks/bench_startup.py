@@ -0,0 +1,126 @@
+"""Import time and time-to-first-frame budget for the apps and the core modules
+
+Every measurement runs in a fresh interpreter. Core modules must import
+without pulling in heavy optional packages (bleak, numpy, PIL, tkinter);
+the GUI apps are timed from process launch until their window is first
+mapped, which needs customtkinter and a display and is skipped otherwise.
+Exits non-zero when a budget is exceeded, so it can gate regressions.
+
+    python benchmarks/bench_startup.py [--runs 5] [--import-budget-ms 300] [--frame-budget-ms 1500]
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = [
+    "serial_reader", "render", "capture_store", "framing", "disk_logger",
+    "exporters", "ble_discovery", "ble_service", "relay_dispatcher", "relay_ack", "relay_fleet",
+    "reconnect", "session_store", "capture_session", "bt_capture", "serial_hub",
+    "serial_transport", "gui_bridge", "animation", "notifications",
+    "capture_file", "virtual_log", "search", "telemetry",
+]
+
+# Packages that must stay out of a core import
+HEAVY = ["bleak", "numpy", "pyarrow", "PIL", "tkinter", "customtkinter"]
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+# Launched as the app's main module; reports wall time once the window maps
+FRAME_PROBE = """
+import sys, time
+sys.argv = [{script!r}]
+import customtkinter as ctk
+_CTk = ctk.CTk
+
+class ProbeCTk(_CTk):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bind("<Map>", self._first_frame, add="+")
+
+    def _first_frame(self, event):
+        if event.widget is self:
+            self.update_idletasks()
+            print(time.time(), flush=True)
+            self.after(0, self.destroy)
+
+ctk.CTk = ProbeCTk
+import runpy
+runpy.run_path({script!r}, run_name="__main__")
+"""
+
+
+def time_import(module, runs):
+    samples = []
+    loaded = ""
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module, heavy=HEAVY)],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        elapsed, _, loaded = result.stdout.strip().partition(" ")
+        samples.append(float(elapsed))
+    return statistics.median(samples), loaded
+
+
+def time_first_frame(script, runs, timeout=30):
+    samples = []
+    for _ in range(runs):
+        start = time.time()
+        result = subprocess.run([sys.executable, "-c", FRAME_PROBE.format(script=os.path.join(ROOT, script))],
+                                cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+        lines = result.stdout.strip().splitlines()
+        if not lines:
+            raise RuntimeError(f"{script} never mapped a window:\n{result.stderr[-2000:]}")
+        samples.append(float(lines[-1]) - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=300.0)
+    parser.add_argument("--frame-budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+    failures = []
+
+    print(f"{'module':<20}{'import ms':>10}  heavy modules loaded")
+    for module in CORE_MODULES:
+        elapsed, loaded = time_import(module, args.runs)
+        print(f"{module:<20}{elapsed * 1000:>10.1f}  {loaded or '-'}")
+        if elapsed * 1000 > args.import_budget_ms:
+            failures.append(f"{module} import {elapsed * 1000:.0f} ms > {args.import_budget_ms:.0f} ms")
+        if loaded:
+            failures.append(f"{module} loads {loaded}")
+
+    print()
+    has_gui = importlib.util.find_spec("customtkinter") is not None
+    has_display = sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+    for script in ("APP.py", "Relay.py"):
+        if not (has_gui and has_display):
+            print(f"{script:<20}{'skipped':>10}  (needs customtkinter and a display)")
+            continue
+        elapsed = time_first_frame(script, args.runs)
+        print(f"{script:<20}{elapsed * 1000:>10.1f}  time to first frame")
+        if elapsed * 1000 > args.frame_budget_ms:
+            failures.append(f"{script} first frame {elapsed * 1000:.0f} ms > {args.frame_budget_ms:.0f} ms")
+
+    if failures:
+        print("\nBudget exceeded:\n  " + "\n  ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Cost of the telemetry plot: record parsing, memory and per-frame decimation
+
+Feeds --seconds of 8-channel records at --rate Hz into a TelemetryBuffer
+(the default is the target load: an hour at 1 kHz), then times one plot
+frame's worth of work, decimating each window to --width pixel columns
+and building the polyline points, against the frame budget at 20 fps.
+Tk itself is not needed.
+
+    python benchmarks/bench_telemetry.py [--seconds 3600] [--rate 1000] [--width 1200]
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import TelemetryBuffer, NUMPY_AVAILABLE
+
+# Time one frame may take at 20 fps before the GUI falls behind (ms)
+FRAME_BUDGET_MS = 50.0
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def frame(buffer, t0, t1, width):
+    """decimate() plus the point arrays TelemetryPlot.draw() hands to the canvas"""
+    np = buffer.np
+    low, high = buffer.decimate(t0, t1, width)
+    columns = np.arange(width, dtype=np.float32)
+    points = 0
+    for channel in range(low.shape[0]):
+        valid = ~np.isnan(low[channel])
+        xy = np.empty((int(valid.sum()) * 2, 2), dtype=np.float32)
+        xy[0::2, 0] = xy[1::2, 0] = columns[valid]
+        xy[0::2, 1] = low[channel][valid]
+        xy[1::2, 1] = high[channel][valid]
+        points += len(xy.ravel().tolist())
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument("--rate", type=int, default=1000, help="records per second")
+    parser.add_argument("--width", type=int, default=1200, help="plot width in pixels")
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+    if not NUMPY_AVAILABLE:
+        print("numpy is not installed")
+        return 1
+
+    count = args.seconds * args.rate
+    baseline = rss_mb()
+    buffer = TelemetryBuffer(capacity=count)
+    start = time.perf_counter()
+    for n in range(count):
+        t = n / args.rate
+        record = ("T=%.2f,H=%.2f,P=%.2f,V=%.3f,I=%.3f,ax=%.3f,ay=%.3f,az=%.3f" % (
+            23 + math.sin(t / 60), 41 + math.cos(t / 90), 1013 + math.sin(t / 600), 3.3 + 0.01 * math.sin(t),
+            0.12 + 0.05 * math.sin(t * 7), math.sin(t * 3), math.cos(t * 3), 9.81 + 0.1 * math.sin(t * 11))).encode()
+        buffer.append(record, t)
+    fill = time.perf_counter() - start
+    end = count / args.rate
+    print(f"{count} records x {buffer.channel_count} channels: {fill / count * 1e6:.1f} us/record "
+          f"including formatting it "
+          f"({fill / args.seconds * 100:.2f}% of one core at {args.rate} Hz), "
+          f"RSS +{rss_mb() - baseline:.0f} MB")
+
+    print(f"\n{'window':<10}{'samples':>10}{'p50 ms':>9}{'max ms':>9}{'budget':>9}")
+    for window in (10, 60, 600, 3600):
+        if window > args.seconds:
+            continue
+        samples = []
+        for _ in range(args.frames):
+            frame_start = time.perf_counter()
+            frame(buffer, end - window, end, args.width)
+            samples.append(time.perf_counter() - frame_start)
+        p50 = statistics.median(samples) * 1000
+        print(f"{window:>6} s  {window * args.rate:>10}{p50:>9.2f}{max(samples) * 1000:>9.2f}"
+              f"{'ok' if max(samples) * 1000 < FRAME_BUDGET_MS else 'OVER':>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Jump latency and resident memory of the virtual log over a large capture file
+
+Fills a CaptureFile with synthetic records, then times rendering one
+screen of rows at random positions (what a scrollbar drag does), the
+hexdump row index build and a filtered index build, and reports process
+RSS next to the capture size. A Text widget holding the same capture
+would need every formatted line in memory.
+
+    python benchmarks/bench_virtual_log.py [--records 2000000] [--rows 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_file import CaptureFile
+from virtual_log import VirtualLog
+
+
+def rss_mb():
+    """Anonymous resident memory (Linux), else peak RSS
+
+    Mapped capture pages are left out on Linux: they are page cache the
+    kernel can drop at any time, not memory the app holds.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def jump_times(log, rows, jumps):
+    samples = []
+    total = log.row_count
+    for _ in range(jumps):
+        top = random.randrange(0, max(1, total - rows))
+        start = time.perf_counter()
+        lines = log.render(top, rows)
+        samples.append(time.perf_counter() - start)
+        assert len(lines) == rows
+    return samples
+
+
+def build_index(log):
+    start = time.perf_counter()
+    while log.pending:
+        log.refresh()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000000)
+    parser.add_argument("--rows", type=int, default=50, help="rows on screen")
+    parser.add_argument("--jumps", type=int, default=200)
+    parser.add_argument("--directory", default=None, help="where the capture file is created")
+    args = parser.parse_args()
+
+    baseline = rss_mb()
+    capture = CaptureFile(directory=args.directory)
+    payload = b"T=23.51,H=41.20,P=1013.25,V=3.301,I=0.124,status=OK"
+    start = time.perf_counter()
+    for n in range(args.records):
+        capture.append(payload, n * 0.001, n % 4)
+    fill = time.perf_counter() - start
+    print(f"{args.records} records, {capture.file_size / 1e6:.0f} MB file, "
+          f"appended at {args.records / fill / 1e3:.0f}k records/s")
+
+    print(f"\n{'view':<22}{'index s':>9}{'p50 ms':>9}{'p99 ms':>9}{'anon +MB':>10}")
+    views = [
+        ("text", VirtualLog(capture, "text")),
+        ("hexdump", VirtualLog(capture, "hexdump")),
+        ("text, source 2 only", VirtualLog(capture, "text", predicate=lambda t, d, s: s == 2)),
+    ]
+    for name, log in views:
+        index_seconds = build_index(log)
+        samples = sorted(jump_times(log, args.rows, args.jumps))
+        print(f"{name:<22}{index_seconds:>9.2f}{statistics.median(samples) * 1000:>9.2f}"
+              f"{samples[int(len(samples) * 0.99) - 1] * 1000:>9.2f}{rss_mb() - baseline:>10.1f}")
+
+    capture.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import asyncio
+import collections
+import threading
+import time
+
+# How long a device stays in the cache after its last advertisement
+DEFAULT_DEVICE_TTL = 600.0
+
+# RSSI samples kept per device
+RSSI_HISTORY = 32
+
+# Base for expanding 16/32-bit Bluetooth SIG UUIDs
+BLUETOOTH_BASE_UUID = "-0000-1000-8000-00805f9b34fb"
+
+
+def normalize_uuid(uuid):
+    """Lower-case a UUID and expand 16/32-bit short forms to 128 bits"""
+    uuid = uuid.strip().lower()
+    if len(uuid) in (4, 8) and all(c in "0123456789abcdef" for c in uuid):
+        uuid = uuid.rjust(8, "0") + BLUETOOTH_BASE_UUID
+    return uuid
+
+
+class CachedDevice:
+    """Last known advertisement data for one address"""
+
+    __slots__ = ("address", "name", "service_uuids", "rssi_history", "first_seen", "last_seen")
+
+    def __init__(self, address, name, timestamp):
+        self.address = address
+        self.name = name or "Unknown Device"
+        self.service_uuids = set()
+        self.rssi_history = collections.deque(maxlen=RSSI_HISTORY)
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+
+    @property
+    def rssi(self):
+        return self.rssi_history[-1][1] if self.rssi_history else None
+
+    @property
+    def mean_rssi(self):
+        if not self.rssi_history:
+            return None
+        return sum(rssi for _, rssi in self.rssi_history) / len(self.rssi_history)
+
+    @property
+    def label(self):
+        """Device combo entry: "name (address)" """
+        return f"{self.name} ({self.address})"
+
+
+def matches_target(device, target):
+    """True if a device's name, address or an advertised service UUID matches target
+
+    Names match case-insensitively as a substring; addresses and UUIDs
+    must match exactly (UUIDs after normalization).
+    """
+    if not target:
+        return False
+    wanted = target.strip().lower()
+    if wanted == device.address.lower() or wanted in device.name.lower():
+        return True
+    wanted_uuid = normalize_uuid(wanted)
+    return any(normalize_uuid(uuid) == wanted_uuid for uuid in device.service_uuids)
+
+
+class DeviceCache:
+    """Address-keyed cache of discovered BLE devices with TTL eviction
+
+    Written from the BLE loop as advertisements arrive and read from the
+    GUI thread, so every access takes a lock. Entries older than ttl are
+    dropped on read, which lets a rescan (or a direct reconnect) start
+    from the devices seen recently instead of from nothing.
+    """
+
+    def __init__(self, ttl=DEFAULT_DEVICE_TTL):
+        self.ttl = ttl
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._devices)
+
+    def update(self, address, name=None, rssi=None, service_uuids=(), timestamp=None):
+        """Record an advertisement; returns (device, changed) where changed
+        is True for new devices or a new name"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._lock:
+            device = self._devices.get(address)
+            changed = device is None
+            if changed:
+                device = self._devices[address] = CachedDevice(address, name, timestamp)
+            elif name and name != device.name:
+                device.name = name
+                changed = True
+            device.last_seen = timestamp
+            if rssi is not None:
+                device.rssi_history.append((timestamp, rssi))
+            device.service_uuids.update(service_uuids or ())
+        return device, changed
+
+    def get(self, address):
+        with self._lock:
+            self._evict(time.monotonic())
+            return self._devices.get(address)
+
+    def devices(self):
+        """Live devices, strongest signal first"""
+        with self._lock:
+            self._evict(time.monotonic())
+            devices = list(self._devices.values())
+        return sorted(devices, key=lambda d: -d.rssi if d.rssi is not None else float("inf"))
+
+    def find(self, target):
+        """First live device matching a name/address/UUID target, or None"""
+        for device in self.devices():
+            if matches_target(device, target):
+                return device
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._devices.clear()
+
+    def _evict(self, now):
+        if self.ttl is None:
+            return
+        expired = [address for address, d in self._devices.items() if now - d.last_seen > self.ttl]
+        for address in expired:
+            del self._devices[address]
+
+
+async def discover_stream(scanner_cls, cache, on_device=None, timeout=10.0, target=None):
+    """Scan with a detection callback, feeding `cache` as advertisements arrive
+
+    on_device(device, changed) runs on the event loop for every
+    advertisement. The scan stops after timeout seconds, or as soon as a
+    device matching target (name, address or service UUID) is seen.
+    Returns the matching CachedDevice, or None when the scan timed out.
+    """
+    found = asyncio.Event()
+    match = []
+
+    def detection_callback(device, advertisement_data):
+        name = getattr(advertisement_data, "local_name", None) or device.name
+        entry, changed = cache.update(device.address, name,
+                                      getattr(advertisement_data, "rssi", None),
+                                      getattr(advertisement_data, "service_uuids", None) or ())
+        if on_device:
+            on_device(entry, changed)
+        if target and not match and matches_target(entry, target):
+            match.append(entry)
+            found.set()
+
+    scanner = scanner_cls(detection_callback=detection_callback)
+    await scanner.start()
+    try:
+        await asyncio.wait_for(found.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await scanner.stop()
+    return match[0] if match else None
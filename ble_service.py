@@ -0,0 +1,270 @@
+import asyncio
+import importlib.util
+import threading
+import time
+
+# Bleak is optional; BLE features are disabled without it. It is only
+# imported when a BLE operation first runs, since loading it takes longer
+# than the rest of the app's startup.
+BLEAK_AVAILABLE = importlib.util.find_spec("bleak") is not None
+
+from ble_discovery import DeviceCache, discover_stream, normalize_uuid
+from serial_transport import SerialProtocol, create_serial_connection
+
+
+class BleServiceError(Exception):
+    """Raised for BLE operations on unknown or disconnected devices"""
+
+
+def select_characteristic(characteristics, uuid=None):
+    """Pick a notifiable characteristic by characteristic or service UUID
+
+    characteristics is [(service_uuid, char_uuid, properties), ...]. With no
+    UUID (or "auto") the first one is used. Returns char_uuid or None.
+    """
+    if not characteristics:
+        return None
+    if not uuid or uuid.strip().lower() == "auto":
+        return characteristics[0][1]
+    wanted = normalize_uuid(uuid)
+    for service_uuid, char_uuid, properties in characteristics:
+        if normalize_uuid(char_uuid) == wanted:
+            return char_uuid
+    for service_uuid, char_uuid, properties in characteristics:
+        if normalize_uuid(service_uuid) == wanted:
+            return char_uuid
+    return None
+
+
+class BleService:
+    """One long-lived asyncio loop that owns every BLE operation
+
+    The loop runs on a single daemon thread and holds the scanner and all
+    BleakClient objects, so connections keep being serviced between
+    calls. Serial ports opened with open_serial run as asyncio transports
+    on the same loop. Public methods are thread-safe and return
+    concurrent.futures.Future objects; GUI code attaches done callbacks
+    and hands results to the Tk thread.
+    """
+
+    def __init__(self, scanner_cls=None, client_cls=None, cache=None):
+        self.scanner_cls = scanner_cls
+        self.client_cls = client_cls
+        self.cache = cache if cache is not None else DeviceCache()
+        self.loop = None
+        self.thread = None
+        self.clients = {}
+        self.transports = set()
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the service thread and its event loop"""
+        if self.thread and self.thread.is_alive():
+            return self
+        self.loop = asyncio.new_event_loop()
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="ble-service")
+        self.thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    @property
+    def running(self):
+        return bool(self.loop and self.loop.is_running())
+
+    def submit(self, coro):
+        """Schedule a coroutine on the service loop; returns a Future"""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Run a plain callable on the service loop"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def _load_bleak(self):
+        if self.scanner_cls is None or self.client_cls is None:
+            from bleak import BleakScanner, BleakClient
+            self.scanner_cls = self.scanner_cls or BleakScanner
+            self.client_cls = self.client_cls or BleakClient
+
+    # Scanning
+
+    def scan(self, timeout=10.0):
+        """Discover devices; Future resolves to [(address, name), ...]"""
+        return self.submit(self._scan(timeout))
+
+    async def _scan(self, timeout):
+        self._load_bleak()
+        devices = await self.scanner_cls.discover(timeout=timeout)
+        for device in devices:
+            self.cache.update(device.address, device.name)
+        return [(device.address, device.name or "Unknown Device") for device in devices]
+
+    def discover(self, on_device=None, timeout=10.0, target=None):
+        """Streaming scan into self.cache; on_device(device, changed) runs on
+        the service loop per advertisement. Stops early once target (name,
+        address or service UUID) is seen. Future resolves to the matching
+        CachedDevice or None."""
+        return self.submit(self._discover(on_device, timeout, target))
+
+    async def _discover(self, on_device, timeout, target):
+        self._load_bleak()
+        return await discover_stream(self.scanner_cls, self.cache, on_device, timeout, target)
+
+    # Connections
+
+    def connect(self, address, disconnected_callback=None, timeout=10.0):
+        """Connect to a device; Future resolves to its BleakClient"""
+        return self.submit(self._connect(address, disconnected_callback, timeout))
+
+    async def _connect(self, address, disconnected_callback, timeout):
+        client = self.clients.get(address)
+        if client is not None and client.is_connected:
+            return client
+        self._load_bleak()
+        client = self.client_cls(address, disconnected_callback=disconnected_callback, timeout=timeout)
+        await client.connect()
+        self.clients[address] = client
+        return client
+
+    def disconnect(self, address=None):
+        """Disconnect one device, or every device when address is None"""
+        return self.submit(self._disconnect(address))
+
+    async def _close_transports(self):
+        for transport in list(self.transports):
+            transport.close()
+        # Let the scheduled connection_lost callbacks run
+        await asyncio.sleep(0)
+
+    async def _disconnect(self, address):
+        addresses = list(self.clients) if address is None else [address]
+        for addr in addresses:
+            client = self.clients.pop(addr, None)
+            if client is not None and client.is_connected:
+                await client.disconnect()
+
+    def is_connected(self, address):
+        client = self.clients.get(address)
+        return bool(client and client.is_connected)
+
+    def _client(self, address):
+        client = self.clients.get(address)
+        if client is None or not client.is_connected:
+            raise BleServiceError(f"{address} is not connected")
+        return client
+
+    # GATT I/O
+
+    def write(self, address, char_uuid, data, response=True):
+        """Write a characteristic value"""
+        return self.submit(self._write(address, char_uuid, data, response))
+
+    async def _write(self, address, char_uuid, data, response):
+        await self._client(address).write_gatt_char(char_uuid, data, response=response)
+
+    def start_notify(self, address, char_uuid, callback):
+        """Subscribe to notifications; callback(sender, data) runs on the service loop"""
+        return self.submit(self._start_notify(address, char_uuid, callback))
+
+    async def _start_notify(self, address, char_uuid, callback):
+        await self._client(address).start_notify(char_uuid, callback)
+
+    def notify_characteristics(self, address):
+        """Future resolving to [(service_uuid, char_uuid, properties), ...]
+        for every characteristic that supports notify or indicate"""
+        return self.submit(self._notify_characteristics(address))
+
+    async def _notify_characteristics(self, address):
+        client = self._client(address)
+        return [(service.uuid, char.uuid, list(char.properties))
+                for service in client.services
+                for char in service.characteristics
+                if "notify" in char.properties or "indicate" in char.properties]
+
+    def subscribe(self, address, on_data, uuid=None):
+        """Discover GATT characteristics and subscribe to one of them
+
+        on_data(data, timestamp) is called on the service loop with the
+        bytearray bleak delivers (no copy) and a monotonic timestamp taken
+        when the notification arrives. uuid selects a characteristic or a
+        service; None picks the first notifiable characteristic. Future
+        resolves to (char_uuid, characteristics).
+        """
+        return self.submit(self._subscribe(address, on_data, uuid))
+
+    async def _subscribe(self, address, on_data, uuid):
+        characteristics = await self._notify_characteristics(address)
+        char_uuid = select_characteristic(characteristics, uuid)
+        if char_uuid is None:
+            raise BleServiceError(f"no notifiable characteristic matches {uuid or 'the device'}")
+
+        def handle_notification(sender, data):
+            on_data(data, time.monotonic())
+
+        await self._client(address).start_notify(char_uuid, handle_notification)
+        return char_uuid, characteristics
+
+    def stop_notify(self, address, char_uuid):
+        return self.submit(self._stop_notify(address, char_uuid))
+
+    async def _stop_notify(self, address, char_uuid):
+        await self._client(address).stop_notify(char_uuid)
+
+    # Serial transports
+
+    def open_serial(self, port, on_data, on_exit=None, start_reading=True, **kwargs):
+        """Open a serial port as an asyncio transport on the service loop
+
+        on_data(data, timestamp) and on_exit(error) run on the loop, like
+        BLE notifications. kwargs go to serial.Serial. Future resolves to
+        the SerialTransport; use close_serial/write_serial from other threads.
+        """
+        return self.submit(self._open_serial(port, on_data, on_exit, start_reading, kwargs))
+
+    async def _open_serial(self, port, on_data, on_exit, start_reading, kwargs):
+        transports = self.transports
+
+        def exit_callback(error):
+            transports.discard(transport)
+            if on_exit:
+                on_exit(error)
+
+        transport, protocol = await create_serial_connection(
+            self.loop, lambda: SerialProtocol(on_data, exit_callback), port,
+            start_reading=start_reading, **kwargs)
+        transports.add(transport)
+        return transport
+
+    def resume_serial(self, transport):
+        self.call_soon(transport.resume_reading)
+
+    def write_serial(self, transport, data):
+        self.call_soon(transport.write, data)
+
+    def close_serial(self, transport):
+        """Close a serial transport; its on_exit(None) follows on the loop"""
+        if self.running:
+            self.call_soon(transport.close)
+
+    # Shutdown
+
+    def shutdown(self, timeout=5.0):
+        """Disconnect everything, stop the loop and join the thread"""
+        if not self.running:
+            return
+        try:
+            self.disconnect().result(timeout)
+            self.submit(self._close_transports()).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,201 @@
+"""Headless serial/BLE capture for gateways without a display
+
+Streams framed records to stdout (or a file) and optionally to rotating
+capture logs, using the same reader, framing and logging modules as the
+GUI. Nothing here imports tkinter, customtkinter or PIL, and bleak is
+only imported for BLE commands.
+
+    python bt_capture.py ports
+    python bt_capture.py serial /dev/ttyUSB0 --baud 115200 --framing line
+    python bt_capture.py ble AA:BB:CC:DD:EE:FF --format hex --log-dir captures
+    python bt_capture.py scan --timeout 5
+"""
+import argparse
+import signal
+import sys
+import threading
+import time
+
+from framing import make_framer, FramingError
+from render import format_record
+
+# Short command-line names for the framing choices offered in the GUI
+FRAMING_ALIASES = {
+    "raw": "Raw chunks",
+    "line": "Line (\\n)",
+    "crlf": "Line (\\r\\n)",
+    "delimiter": "Delimiter",
+    "fixed": "Fixed length",
+    "length": "Length prefix",
+    "cobs": "COBS",
+    "slip": "SLIP",
+}
+
+# Seconds between output flushes
+FLUSH_INTERVAL = 0.2
+
+
+class RecordWriter:
+    """Formats records onto a text stream from any thread; flushed periodically"""
+
+    def __init__(self, stream, display_format):
+        self.stream = stream
+        self.display_format = display_format
+        self.lock = threading.Lock()
+
+    def __call__(self, data, timestamp):
+        line = format_record(timestamp, data, self.display_format) + "\n"
+        with self.lock:
+            self.stream.write(line)
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def list_ports(args):
+    import serial.tools.list_ports
+    for port in serial.tools.list_ports.comports():
+        print(f"{port.device}\t{port.description}")
+    return 0
+
+
+def scan(args):
+    from ble_service import BleService, BLEAK_AVAILABLE
+    if not BLEAK_AVAILABLE:
+        log("BLE not available. Install bleak: pip install bleak")
+        return 2
+    service = BleService().start()
+    try:
+        match = service.discover(timeout=args.timeout, target=args.target).result(args.timeout + 5)
+        for device in service.cache.devices():
+            rssi = "" if device.rssi is None else f"{device.rssi} dBm"
+            print(f"{device.address}\t{device.name}\t{rssi}")
+    finally:
+        service.shutdown()
+    return 0 if match or not args.target else 1
+
+
+def capture(args):
+    from capture_session import CaptureSession, EVENT_LOST, EVENT_RECONNECTING, EVENT_RECONNECTED
+
+    try:
+        framer = make_framer(FRAMING_ALIASES.get(args.framing, args.framing), args.framing_param)
+    except FramingError as e:
+        log(f"Invalid framing: {e}")
+        return 2
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    writer = RecordWriter(output, args.format) if not args.quiet else None
+
+    disk_logger = None
+    if args.log_dir:
+        from disk_logger import DiskLogger
+        disk_logger = DiskLogger(args.log_dir, prefix=args.log_prefix, record_format=args.log_format,
+                                 compression=args.compress,
+                                 on_error=lambda e: log(f"Disk logging stopped: {e}")).start()
+
+    def on_event(event, detail):
+        if event == EVENT_LOST:
+            log(f"Link lost: {detail}")
+        elif event == EVENT_RECONNECTING:
+            log(f"Reconnecting (attempt {detail})...")
+        elif event == EVENT_RECONNECTED:
+            log(f"Reconnected after {detail.recovered_s:.2f} s")
+
+    session = CaptureSession(framer, disk_logger=disk_logger, on_record=writer,
+                             on_event=on_event, reconnect=args.reconnect)
+    try:
+        if args.command == "serial":
+            session.open_serial(args.port, args.baud, args.databits, args.reader_mode)
+            log(f"Capturing from {args.port} at {args.baud} baud")
+        else:
+            char_uuid = session.open_ble(args.address, args.uuid, timeout=args.timeout)
+            log(f"Capturing notifications from {args.address} ({char_uuid})")
+    except Exception as e:
+        log(f"Connection failed: {e}")
+        session.close()
+        if disk_logger:
+            disk_logger.stop()
+        return 1
+
+    # Ctrl+C / SIGTERM end the capture cleanly
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while not stop.is_set() and not session.closed.is_set():
+            if deadline and time.monotonic() >= deadline:
+                break
+            stop.wait(FLUSH_INTERVAL)
+            if writer:
+                writer.flush()
+    finally:
+        session.close()
+        if disk_logger:
+            disk_logger.stop()
+        if writer:
+            writer.flush()
+        if output is not sys.stdout:
+            output.close()
+    log(f"{session.records} records, {session.bytes} bytes")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless serial/BLE capture")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("ports", help="list serial ports")
+
+    scan_parser = commands.add_parser("scan", help="scan for BLE devices")
+    scan_parser.add_argument("--timeout", type=float, default=10.0)
+    scan_parser.add_argument("--target", help="stop as soon as this name/address/UUID is seen")
+
+    serial_parser = commands.add_parser("serial", help="capture from a serial port")
+    serial_parser.add_argument("port")
+    serial_parser.add_argument("--baud", type=int, default=9600)
+    serial_parser.add_argument("--databits", type=int, choices=[7, 8], default=8)
+    serial_parser.add_argument("--reader-mode", choices=["select", "blocking", "poll"])
+
+    ble_parser = commands.add_parser("ble", help="capture BLE notifications")
+    ble_parser.add_argument("address")
+    ble_parser.add_argument("--uuid", help="characteristic or service UUID (default: first notifiable)")
+    ble_parser.add_argument("--timeout", type=float, default=15.0, help="connect timeout")
+
+    for sub in (serial_parser, ble_parser):
+        sub.add_argument("--framing", default="line",
+                         help=f"one of {', '.join(FRAMING_ALIASES)} (default: line)")
+        sub.add_argument("--framing-param", default="",
+                         help="delimiter (text with escapes like \\r\\n, or hex as 0x0D0A), fixed length or prefix size")
+        sub.add_argument("--format", choices=["text", "hex", "hexdump"], default="text")
+        sub.add_argument("--output", default="-", help="output file (default: stdout)")
+        sub.add_argument("--quiet", action="store_true", help="don't print records")
+        sub.add_argument("--log-dir", help="also write rotating capture logs here")
+        sub.add_argument("--log-prefix", default="capture")
+        sub.add_argument("--log-format", choices=["text", "binary"], default="text")
+        sub.add_argument("--compress", choices=["gzip", "zstd"], help="compress rotated segments")
+        sub.add_argument("--duration", type=float, help="stop after this many seconds")
+        sub.add_argument("--no-reconnect", dest="reconnect", action="store_false",
+                         help="exit when the link drops instead of reconnecting")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "ports":
+        return list_ports(args)
+    if args.command == "scan":
+        return scan(args)
+    return capture(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
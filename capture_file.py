@@ -0,0 +1,397 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+
+# Record header: monotonic timestamp (float64), source id (uint16), payload length (uint32)
+RECORD_HEADER = struct.Struct("<dHI")
+
+# Records per sparse index entry; a lookup walks at most this many headers
+INDEX_STRIDE = 64
+
+# How often the writer thread moves the in-memory tail to disk (s)
+FLUSH_INTERVAL = 0.05
+
+# Tail size that wakes the writer before its interval is up
+FLUSH_BYTES = 1024 * 1024
+
+# Segments a size or age limit is split into; the oldest is dropped whole when the limit is reached
+SEGMENTS_PER_LIMIT = 8
+
+# Capture size choices offered in the UI (label -> max_bytes)
+SCROLLBACK_CHOICES = {
+    "100 MB": 100 * 1024 * 1024,
+    "1 GB": 1024 * 1024 * 1024,
+    "10 GB": 10 * 1024 * 1024 * 1024,
+    "Unlimited": None,
+}
+
+
+class _Segment:
+    """One file of a capture, holding records first .. first + count - 1"""
+
+    def __init__(self, first):
+        self.first = first
+        self.path = None
+        self.file = None
+        self.map = None
+        self.tail = bytearray()
+        self.tail_start = 0
+        self.size = 0
+        self.count = 0
+        self.payload_bytes = 0
+        self.block_offsets = array("Q")
+        self.first_time = None
+        self.last_time = None
+
+    def snapshot(self):
+        """What a reader needs, taken under the capture's lock and read without it"""
+        return self.first, self.count, self.map, self.tail, self.tail_start, self.block_offsets
+
+
+class CaptureFile:
+    """Append-only capture on disk, read back through a memory map
+
+    Drop-in for CaptureStore where history must not live in RAM: records
+    are appended as header + payload to a file and read with mmap, so
+    the page cache holds what was recently viewed and resident memory
+    stays small however long the session runs. Only every INDEX_STRIDE-th
+    record offset is kept (8 bytes per 64 records); finding a record
+    walks at most that many headers.
+
+    append() only adds to an in-memory tail, so the receive path never
+    waits on disk or on readers. A writer thread moves the tail to the
+    file and remaps it; readers see the mapped, flushed region followed
+    by whatever is still in the tail.
+
+    Records live in segments, one file each. A file is never truncated
+    while it may be mapped: clear() starts a new segment and retires the
+    old ones, whose maps stay valid for readers still holding them
+    (POSIX keeps an unlinked file's pages; where a mapped file cannot be
+    deleted, removal is retried until its readers let go).
+
+    max_bytes and max_age (seconds before the newest record) bound what
+    is kept: each limit is split into SEGMENTS_PER_LIMIT segments and the
+    oldest segment is dropped whole once the limit would be exceeded, so
+    disk use stays within max_bytes and old records go in bulk, never
+    one by one.
+
+    Indexes are absolute like CaptureStore's: they keep counting up when
+    records are dropped by clear() or the limits, and dropped records
+    simply stop being returned. Without a path, temporary files are used
+    and removed by close(); with one, segments after the first are
+    written next to it as path.1, path.2, ...
+    """
+
+    def __init__(self, path=None, directory=None, stride=INDEX_STRIDE, max_bytes=None, max_age=None):
+        self.stride = stride
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.path = path
+        self.directory = directory
+        self._temporary = path is None
+        self._created = 0
+        # Segments dropped by the limits, retired by the writer
+        self._dropped = []
+        # Paths of dropped segments still to be removed
+        self._retired = []
+        # _lock guards the in-memory state only; _io_lock serialises file writes, clear and close
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        first = _Segment(0)
+        # The first file is opened here so a bad path fails in the caller, not in the writer
+        first.path, first.file = self._open_segment()
+        self._segments = [first]
+        self._count = 0
+        self._first_index = 0
+        self._size = 0
+        self._payload_bytes = 0
+        self._closed = False
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._run, daemon=True, name="capture-writer")
+        self._writer.start()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def first_index(self):
+        return self._first_index
+
+    @property
+    def end_index(self):
+        return self._first_index + self._count
+
+    @property
+    def byte_count(self):
+        """Payload bytes held (headers excluded)"""
+        return self._payload_bytes
+
+    @property
+    def file_size(self):
+        """Bytes held on disk and in the unwritten tail"""
+        return self._size
+
+    def append(self, data, timestamp=None, source=0):
+        """Store one record; returns its absolute index"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        record_size = RECORD_HEADER.size + len(data)
+        with self._lock:
+            segment = self._segments[-1]
+            if segment.count % self.stride == 0:
+                segment.block_offsets.append(segment.size)
+                if not segment.count:
+                    segment.first_time = timestamp
+            segment.tail += RECORD_HEADER.pack(timestamp, source, len(data))
+            segment.tail += data
+            segment.size += record_size
+            segment.payload_bytes += len(data)
+            segment.count += 1
+            segment.last_time = timestamp
+            self._size += record_size
+            self._payload_bytes += len(data)
+            self._count += 1
+            index = self._first_index + self._count - 1
+            backlog = len(segment.tail)
+            rolled = self._segment_full(segment, timestamp)
+            if rolled:
+                self._roll(timestamp)
+        if rolled or backlog >= FLUSH_BYTES:
+            self._wake.set()
+        return index
+
+    def set_limits(self, max_bytes=None, max_age=None):
+        """Change the size / age limits (None: unlimited); applied as new records arrive"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.max_age = max_age
+
+    def _segment_full(self, segment, timestamp):
+        if self.max_bytes is not None and segment.size >= self.max_bytes / SEGMENTS_PER_LIMIT:
+            return True
+        return self.max_age is not None and timestamp - segment.first_time >= self.max_age / SEGMENTS_PER_LIMIT
+
+    def _roll(self, timestamp):
+        """Start a new segment and drop the oldest ones the limits no longer allow (under _lock)"""
+        self._segments.append(_Segment(self.end_index))
+        while len(self._segments) > 1:
+            oldest = self._segments[0]
+            # Room is kept for the new segment to fill, so the total never passes max_bytes
+            over_size = (self.max_bytes is not None and
+                         self._size + self.max_bytes / SEGMENTS_PER_LIMIT > self.max_bytes)
+            over_age = self.max_age is not None and oldest.last_time < timestamp - self.max_age
+            if not (over_size or over_age):
+                break
+            self._segments.pop(0)
+            self._first_index += oldest.count
+            self._count -= oldest.count
+            self._size -= oldest.size
+            self._payload_bytes -= oldest.payload_bytes
+            self._dropped.append(oldest)
+
+    def clear(self):
+        """Drop every record (indexes keep counting up)"""
+        with self._io_lock:
+            with self._lock:
+                dropped = self._dropped + self._segments
+                self._dropped = []
+                self._first_index += self._count
+                self._segments = [_Segment(self._first_index)]
+                self._count = 0
+                self._size = 0
+                self._payload_bytes = 0
+            for segment in dropped:
+                self._retire(segment)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self._flush()
+        with self._io_lock:
+            for segment in self._segments:
+                if segment.file is not None:
+                    segment.file.close()
+                    if self._temporary:
+                        self._retired.append(segment.path)
+            self._remove_retired()
+
+    # Writer
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self._flush()
+
+    def _open_segment(self):
+        if self._temporary:
+            fd, path = tempfile.mkstemp(prefix="capture-", suffix=".bin", dir=self.directory)
+            return path, os.fdopen(fd, "w+b")
+        path = f"{self.path}.{self._created}" if self._created else self.path
+        self._created += 1
+        return path, open(path, "w+b")
+
+    def _flush(self):
+        with self._io_lock:
+            with self._lock:
+                # Copies: the tails keep growing (and being read) while they are written
+                pending = [(segment, bytes(segment.tail), segment.tail_start)
+                           for segment in self._segments if segment.tail]
+            for segment, data, start in pending:
+                if segment.file is None:
+                    segment.path, segment.file = self._open_segment()
+                elif segment.file.closed:
+                    return
+                segment.file.seek(start)
+                segment.file.write(data)
+                segment.file.flush()
+                view = mmap.mmap(segment.file.fileno(), start + len(data), access=mmap.ACCESS_READ)
+                with self._lock:
+                    # Readers holding the old map or tail keep valid offsets; neither changes after this
+                    segment.map = view
+                    segment.tail = segment.tail[len(data):]
+                    segment.tail_start = start + len(data)
+            with self._lock:
+                dropped, self._dropped = self._dropped, []
+            for segment in dropped:
+                self._retire(segment)
+            if self._retired:
+                self._remove_retired()
+
+    def _retire(self, segment):
+        """Close a dropped segment's file; readers holding its map keep reading it"""
+        if segment.file is None:
+            return
+        segment.file.close()
+        self._retired.append(segment.path)
+        self._remove_retired()
+
+    def _remove_retired(self):
+        for path in list(self._retired):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Still mapped by a reader (Windows); tried again on the next flush
+                continue
+            self._retired.remove(path)
+
+    # Reading
+
+    def _clamp(self, start, stop):
+        first = self._first_index
+        end = first + self._count
+        lo = first if start is None else min(end, max(first, start))
+        hi = end if stop is None else max(lo, min(end, stop))
+        return lo, hi
+
+    def _snapshot(self, lo, hi):
+        # Taken under _lock together with the counts; read from without it
+        return [segment.snapshot() for segment in self._segments
+                if segment.first < hi and segment.first + segment.count > lo]
+
+    def _range(self, start, stop, limit=None):
+        """Clamped absolute range plus the storage to read it from"""
+        with self._lock:
+            lo, hi = self._clamp(start, stop)
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            return lo, hi, self._snapshot(lo, hi)
+
+    def _offset(self, source, i):
+        """File offset of segment-local record i"""
+        offset = source[5][i // self.stride]
+        for _ in range(i % self.stride):
+            offset += RECORD_HEADER.size + self._header(source, offset)[2]
+        return offset
+
+    @staticmethod
+    def _header(source, offset):
+        first, count, view, tail, tail_start, block_offsets = source
+        if offset >= tail_start:
+            return RECORD_HEADER.unpack_from(tail, offset - tail_start)
+        return RECORD_HEADER.unpack_from(view, offset)
+
+    def _read(self, lo, hi, snapshot, payloads=True):
+        """[(timestamp, payload or length, source), ...] for absolute records lo..hi"""
+        out = []
+        for source in snapshot:
+            first, count = source[0], source[1]
+            start = max(lo, first) - first
+            stop = min(hi, first + count) - first
+            if stop > start:
+                self._read_segment(source, start, stop, payloads, out)
+        return out
+
+    def _read_segment(self, source, lo, hi, payloads, out):
+        first, count, view, tail, tail_start, block_offsets = source
+        offset = self._offset(source, lo)
+        header_size = RECORD_HEADER.size
+        unpack = RECORD_HEADER.unpack_from
+        for _ in range(hi - lo):
+            if offset >= tail_start:
+                local = offset - tail_start
+                timestamp, record_source, length = unpack(tail, local)
+                local += header_size
+                data = bytes(tail[local:local + length]) if payloads else length
+            else:
+                timestamp, record_source, length = unpack(view, offset)
+                data = view[offset + header_size:offset + header_size + length] if payloads else length
+            out.append((timestamp, data, record_source))
+            offset += header_size + length
+
+    def span(self, start=None, stop=None):
+        """Return (first_index, end_index, payload_bytes) for a clamped index range"""
+        with self._lock:
+            lo, hi = self._clamp(start, stop)
+            if hi == lo:
+                return lo, hi, 0
+            if lo == self._first_index and hi == self.end_index:
+                return lo, hi, self._payload_bytes
+            snapshot = self._snapshot(lo, hi)
+        payload = sum(length for _, length, _ in self._read(lo, hi, snapshot, payloads=False))
+        return lo, hi, payload
+
+    def get(self, index):
+        """Return (timestamp, bytes) for an absolute record index"""
+        with self._lock:
+            if index < self._first_index or index >= self.end_index:
+                raise IndexError("record index out of range")
+            snapshot = self._snapshot(index, index + 1)
+        timestamp, data, record_source = self._read(index, index + 1, snapshot)[0]
+        return timestamp, data
+
+    def records(self, start=None, stop=None):
+        """Return [(timestamp, bytes), ...] for an absolute index range"""
+        return [(timestamp, data) for timestamp, data, source in self.tagged_records(start, stop)]
+
+    def tagged_records(self, start=None, stop=None):
+        """Return [(timestamp, bytes, source), ...] for an absolute index range"""
+        lo, hi, snapshot = self._range(start, stop)
+        return self._read(lo, hi, snapshot)
+
+    def headers(self, start=None, stop=None):
+        """Return [(timestamp, payload_length, source), ...] without reading payloads"""
+        lo, hi, snapshot = self._range(start, stop)
+        return self._read(lo, hi, snapshot, payloads=False)
+
+    def iter_records(self, start=None, stop=None, chunk_size=4096):
+        """Yield (timestamp, bytes) in chunks"""
+        index = start
+        while True:
+            lo, hi, snapshot = self._range(index, stop, chunk_size)
+            if lo >= hi:
+                return
+            chunk = [(timestamp, data) for timestamp, data, source in self._read(lo, hi, snapshot)]
+            index = hi
+            yield from chunk
+
+    def tail(self, count):
+        """Return the newest `count` records"""
+        return self.records(max(self.first_index, self.end_index - count))
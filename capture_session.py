@@ -0,0 +1,217 @@
+import threading
+
+import serial
+
+from reconnect import ReconnectSupervisor
+from serial_reader import SerialReader
+from serial_transport import READER_ASYNCIO
+
+# Session events passed to on_event(event, detail)
+EVENT_CONNECTED = "connected"
+EVENT_LOST = "lost"
+EVENT_RECONNECTING = "reconnecting"
+EVENT_RECONNECTED = "reconnected"
+EVENT_CLOSED = "closed"
+
+
+class CaptureSession:
+    """One serial or BLE capture: link, reader, framing and record fan-out
+
+    Received chunks go through `framer`; every record is appended to
+    `store` (if any), written to `disk_logger` (if any) and passed to
+    on_record(data, timestamp). None of this touches a GUI toolkit, so
+    the same session drives the headless CLI.
+
+    source tags every record in the store so several sessions can share
+    one store. With a SerialHub, serial ports are read by the hub's
+    selector thread instead of a SerialReader per port, and a BleService
+    passed to open_ble is shared rather than shut down on close. The
+    asyncio reader mode runs the port as a transport on the loop of the
+    BleService passed to open_serial.
+
+    With reconnect=True a lost link is reopened by a ReconnectSupervisor
+    while the store, framer and logger carry on. on_event(event, detail)
+    reports connected / lost / reconnecting / reconnected / closed from
+    whichever thread noticed the change.
+    """
+
+    def __init__(self, framer, store=None, disk_logger=None, on_record=None,
+                 on_event=None, reconnect=False, source=0, hub=None):
+        self.framer = framer
+        self.source = source
+        self.hub = hub
+        self.store = store
+        self.disk_logger = disk_logger
+        self.on_record = on_record
+        self.on_event = on_event
+        self.reconnect = reconnect
+
+        self.records = 0
+        self.bytes = 0
+        self.connection = None
+        self.reader = None
+        self.transport_service = None
+        self.ble_service = None
+        self.ble_address = None
+        self.char_uuid = None
+        self.characteristics = []
+        self._own_ble_service = False
+        self.closed = threading.Event()
+
+        self._open_link = None
+        self._lock = threading.Lock()
+        self.supervisor = ReconnectSupervisor(
+            lambda attempt: self._reopen_link(),
+            on_attempt=lambda attempt, delay: self._emit(EVENT_RECONNECTING, attempt),
+            on_recovered=lambda incident: self._emit(EVENT_RECONNECTED, incident))
+
+    # Receive pipeline
+
+    def receive_chunk(self, data, timestamp):
+        """Split a received chunk into records with the framer"""
+        with self._lock:
+            for frame_time, record in self.framer.feed(data, timestamp):
+                self._dispatch(record, frame_time)
+
+    def flush(self):
+        with self._lock:
+            for frame_time, record in self.framer.flush():
+                self._dispatch(record, frame_time)
+
+    def _dispatch(self, data, timestamp):
+        self.records += 1
+        self.bytes += len(data)
+        if self.store is not None:
+            self.store.append(data, timestamp, self.source)
+        if self.disk_logger is not None:
+            self.disk_logger.write(data, timestamp)
+        if self.on_record is not None:
+            self.on_record(data, timestamp)
+
+    def _emit(self, event, detail=None):
+        if self.on_event:
+            self.on_event(event, detail)
+
+    # Serial
+
+    def open_serial(self, port, baudrate=9600, bytesize=8, reader_mode=None, service=None, timeout=15.0):
+        """Open a serial port and start reading; raises serial.SerialException on failure"""
+        def open_link():
+            if reader_mode == READER_ASYNCIO:
+                self.connection = service.open_serial(port, self.receive_chunk, self._on_serial_exit,
+                                                      baudrate=baudrate, bytesize=bytesize,
+                                                      stopbits=1).result(timeout)
+                return
+            self.connection = serial.Serial(port=port, baudrate=baudrate, bytesize=bytesize,
+                                            stopbits=1, timeout=1)
+            if self.hub is not None:
+                self.hub.add(self.connection, self.receive_chunk, self._on_serial_exit)
+            else:
+                self.reader = SerialReader(self.connection, self.receive_chunk, self._on_serial_exit,
+                                           mode=reader_mode).start()
+
+        if reader_mode == READER_ASYNCIO:
+            self.transport_service = service.start()
+        self._open_link = open_link
+        open_link()
+        self._emit(EVENT_CONNECTED, port)
+        return self
+
+    def _on_serial_exit(self, error):
+        self.flush()
+        if self.closed.is_set():
+            return
+        if error is None:
+            threading.Thread(target=self.close, daemon=True).start()
+            return
+        self._close_serial(self.connection)
+        self._link_lost(error)
+
+    def _close_serial(self, connection):
+        try:
+            if self.transport_service is not None:
+                self.transport_service.close_serial(connection)
+            else:
+                connection.close()
+        except Exception:
+            pass
+
+    # BLE
+
+    def open_ble(self, address, uuid=None, service=None, timeout=15.0):
+        """Connect to a BLE device and subscribe to notifications
+
+        Imports the BLE service on first use so serial-only runs never
+        load bleak. Returns the subscribed characteristic UUID.
+        """
+        if service is None:
+            from ble_service import BleService
+            service = BleService()
+            self._own_ble_service = True
+        self.ble_service = service.start()
+        self.ble_address = address
+
+        def open_link():
+            self.ble_service.connect(address, disconnected_callback=self._on_ble_disconnected).result(timeout)
+            self.char_uuid, self.characteristics = self.ble_service.subscribe(
+                address, self.receive_chunk, uuid).result(timeout)
+
+        self._open_link = open_link
+        open_link()
+        self.connection = address
+        self._emit(EVENT_CONNECTED, address)
+        return self.char_uuid
+
+    def _on_ble_disconnected(self, client):
+        if not self.closed.is_set():
+            self.flush()
+            self._link_lost("BLE device disconnected")
+
+    # Link loss and shutdown
+
+    def _reopen_link(self):
+        """Supervisor attempt: reopen the link unless close() ran meanwhile"""
+        self._open_link()
+        if self.closed.is_set():
+            # close() ran while this attempt was in flight and may have missed the new link
+            if self.ble_address is not None:
+                self.ble_service.disconnect(self.ble_address)
+            else:
+                if self.reader:
+                    self.reader.stop(join_timeout=0)
+                elif self.hub is not None:
+                    self.hub.remove(self.connection)
+                self._close_serial(self.connection)
+            raise ConnectionAbortedError("session closed")
+
+    def _link_lost(self, reason):
+        self._emit(EVENT_LOST, reason)
+        if self.reconnect:
+            self.supervisor.link_lost(reason)
+        else:
+            # Not inline: this may be the reader thread or the BLE loop
+            threading.Thread(target=self.close, daemon=True).start()
+
+    def close(self):
+        """Stop reading and release the link; safe to call more than once"""
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        self.supervisor.cancel()
+        if self.reader:
+            self.reader.stop()
+        elif self.hub is not None and self.connection is not None and self.ble_address is None:
+            self.hub.remove(self.connection)
+        if self.ble_service is not None:
+            if self._own_ble_service:
+                self.ble_service.shutdown()
+            else:
+                self.ble_service.disconnect(self.ble_address)
+        elif self.connection is not None:
+            self._close_serial(self.connection)
+        self.flush()
+        self._emit(EVENT_CLOSED)
+
+    def wait(self, timeout=None):
+        """Block until the session is closed (or timeout); returns True if closed"""
+        return self.closed.wait(timeout)
@@ -0,0 +1,169 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# Offset that turns time.monotonic() readings into epoch seconds
+_WALL_OFFSET = time.time() - time.monotonic()
+
+
+def wall_time(timestamp):
+    """Convert a monotonic capture timestamp to epoch seconds"""
+    return timestamp + _WALL_OFFSET
+
+
+class CaptureStore:
+    """Append-only store of received records as raw bytes
+
+    Payloads are packed back to back in one bytearray, with record end
+    offsets and monotonic timestamps in parallel arrays. Nothing is
+    formatted here; callers render only the rows they display or export.
+
+    Each record also carries a small source id (0 by default) so several
+    ports can share one time-ordered store and be told apart on display.
+
+    Record indexes are absolute: they keep counting up when old records
+    are evicted by the optional max_bytes limit, so a cursor held by a
+    reader stays valid. Evicted records simply stop being returned.
+    """
+
+    def __init__(self, max_bytes=None, trim_fraction=0.1):
+        self.max_bytes = max_bytes
+        self.trim_fraction = trim_fraction
+        self._lock = threading.Lock()
+        self._data = bytearray()
+        self._ends = array("Q")
+        self._times = array("d")
+        self._sources = array("H")
+        self._first_index = 0
+        self._byte_base = 0
+
+    def __len__(self):
+        return len(self._ends)
+
+    @property
+    def first_index(self):
+        """Absolute index of the oldest retained record"""
+        return self._first_index
+
+    @property
+    def end_index(self):
+        """Absolute index one past the newest record"""
+        return self._first_index + len(self._ends)
+
+    @property
+    def byte_count(self):
+        return len(self._data)
+
+    def append(self, data, timestamp=None, source=0):
+        """Store one record; returns its absolute index"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            self._data += data
+            self._ends.append(self._byte_base + len(self._data))
+            self._times.append(timestamp)
+            self._sources.append(source)
+            index = self._first_index + len(self._ends) - 1
+            if self.max_bytes is not None and len(self._data) > self.max_bytes:
+                self._evict()
+        return index
+
+    def clear(self):
+        """Drop every record (indexes keep counting up)"""
+        with self._lock:
+            self._first_index += len(self._ends)
+            self._byte_base += len(self._data)
+            self._data = bytearray()
+            self._ends = array("Q")
+            self._times = array("d")
+            self._sources = array("H")
+
+    def span(self, start=None, stop=None):
+        """Return (first_index, end_index, payload_bytes) for a clamped index range"""
+        with self._lock:
+            first = self._first_index
+            count = len(self._ends)
+            lo = 0 if start is None else min(count, max(0, start - first))
+            hi = count if stop is None else max(lo, min(count, stop - first))
+            if hi == lo:
+                return first + lo, first + hi, 0
+            begin = self._ends[lo - 1] if lo else self._byte_base
+            return first + lo, first + hi, self._ends[hi - 1] - begin
+
+    def get(self, index):
+        """Return (timestamp, bytes) for an absolute record index"""
+        with self._lock:
+            i = index - self._first_index
+            if i < 0 or i >= len(self._ends):
+                raise IndexError("record index out of range")
+            return self._times[i], self._payload(i)
+
+    def records(self, start=None, stop=None):
+        """Return [(timestamp, bytes), ...] for an absolute index range"""
+        with self._lock:
+            first = self._first_index
+            lo = 0 if start is None else max(0, start - first)
+            hi = len(self._ends) if stop is None else max(lo, min(len(self._ends), stop - first))
+            return [(self._times[i], self._payload(i)) for i in range(lo, hi)]
+
+    def tagged_records(self, start=None, stop=None):
+        """Return [(timestamp, bytes, source), ...] for an absolute index range"""
+        with self._lock:
+            first = self._first_index
+            lo = 0 if start is None else max(0, start - first)
+            hi = len(self._ends) if stop is None else max(lo, min(len(self._ends), stop - first))
+            return [(self._times[i], self._payload(i), self._sources[i]) for i in range(lo, hi)]
+
+    def headers(self, start=None, stop=None):
+        """Return [(timestamp, payload_length, source), ...] for an absolute index range"""
+        with self._lock:
+            first = self._first_index
+            lo = 0 if start is None else max(0, start - first)
+            hi = len(self._ends) if stop is None else max(lo, min(len(self._ends), stop - first))
+            base = self._byte_base
+            ends = self._ends
+            return [(self._times[i], ends[i] - (ends[i - 1] if i else base), self._sources[i])
+                    for i in range(lo, hi)]
+
+    def iter_records(self, start=None, stop=None, chunk_size=4096):
+        """Yield (timestamp, bytes) in chunks, holding the lock per chunk only"""
+        index = start or 0
+        while True:
+            with self._lock:
+                first = self._first_index
+                # Records evicted underneath the iterator are skipped
+                index = max(index, first)
+                end = first + len(self._ends)
+                if stop is not None:
+                    end = min(stop, end)
+                if index >= end:
+                    return
+                hi = min(end, index + chunk_size)
+                chunk = [(self._times[i - first], self._payload(i - first)) for i in range(index, hi)]
+            yield from chunk
+            index = hi
+
+    def tail(self, count):
+        """Return the newest `count` records"""
+        return self.records(max(self.first_index, self.end_index - count))
+
+    def _payload(self, i):
+        start = (self._ends[i - 1] if i else self._byte_base) - self._byte_base
+        return bytes(self._data[start:self._ends[i] - self._byte_base])
+
+    def _evict(self):
+        # Drop the oldest records in one step until trim_fraction of the budget
+        # is free, always keeping the newest record
+        target = int(self.max_bytes * (1.0 - self.trim_fraction))
+        cut_to = self._byte_base + len(self._data) - target
+        count = min(bisect_left(self._ends, cut_to) + 1, len(self._ends) - 1)
+        if count <= 0:
+            return
+        cut = self._ends[count - 1] - self._byte_base
+        del self._data[:cut]
+        del self._ends[:count]
+        del self._times[:count]
+        del self._sources[:count]
+        self._byte_base += cut
+        self._first_index += count
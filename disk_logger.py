@@ -0,0 +1,233 @@
+import collections
+import gzip
+import os
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+
+from capture_store import wall_time
+
+# Optional zstd compression of closed segments
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Record formats
+LOG_TEXT = "text"      # One "[timestamp] payload" line per record
+LOG_BINARY = "binary"  # Lossless: header + raw payload per record
+
+# Binary record header: epoch timestamp (float64) and payload length (uint32)
+RECORD_HEADER = struct.Struct("<dI")
+
+# Durability policies
+SYNC_NONE = "none"    # Leave flushing to the buffered writer
+SYNC_FLUSH = "flush"  # Flush to the OS every flush_interval
+SYNC_FSYNC = "fsync"  # Flush and fsync every flush_interval
+
+COMPRESSIONS = [None, "gzip"] + (["zstd"] if ZSTD_AVAILABLE else [])
+
+
+def encode_text_record(timestamp, data):
+    stamp = datetime.fromtimestamp(wall_time(timestamp)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    text = data.decode("utf-8", errors="replace").rstrip("\r\n").replace("\n", "\\n")
+    return f"[{stamp}] {text}\n".encode("utf-8")
+
+
+def encode_binary_record(timestamp, data):
+    return RECORD_HEADER.pack(wall_time(timestamp), len(data)) + data
+
+
+def read_binary_records(f):
+    """Yield (epoch_timestamp, bytes) from a binary capture segment"""
+    header_size = RECORD_HEADER.size
+    while True:
+        header = f.read(header_size)
+        if len(header) < header_size:
+            return
+        timestamp, length = RECORD_HEADER.unpack(header)
+        data = f.read(length)
+        if len(data) < length:
+            return
+        yield timestamp, data
+
+
+def compress_segment(path, method):
+    """Compress a closed segment next to itself and remove the original"""
+    if method == "gzip":
+        target = path + ".gz"
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    elif method == "zstd" and ZSTD_AVAILABLE:
+        target = path + ".zst"
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            zstandard.ZstdCompressor().copy_stream(src, dst)
+    else:
+        return path
+    os.remove(path)
+    return target
+
+
+class DiskLogger:
+    """Background writer that streams every received record to disk
+
+    write() only appends to an in-memory deque, so the receive path never
+    waits on disk I/O. A writer thread drains it through a buffered file,
+    applies the flush/fsync policy, rotates segments by size or age and
+    hands closed segments to a compression thread.
+
+    If the writer falls more than max_pending_records behind, new records
+    are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, directory, prefix="capture", record_format=LOG_TEXT,
+                 max_segment_bytes=64 * 1024 * 1024, max_segment_seconds=3600,
+                 sync_policy=SYNC_FLUSH, flush_interval=1.0, compression=None,
+                 buffer_size=1024 * 1024, max_pending_records=1000000,
+                 on_error=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.record_format = record_format
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.sync_policy = sync_policy
+        self.flush_interval = flush_interval
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.max_pending_records = max_pending_records
+        self.on_error = on_error
+
+        self.encode = encode_binary_record if record_format == LOG_BINARY else encode_text_record
+        self.extension = ".bin" if record_format == LOG_BINARY else ".log"
+
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        self.segments = []
+
+        self._pending = collections.deque()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._file = None
+        self._segment_path = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._segment_index = 0
+
+    @property
+    def current_segment(self):
+        return self._segment_path
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Write out everything queued, close the segment and stop"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def write(self, data, timestamp=None):
+        """Queue one record for writing; never blocks"""
+        if not self._running:
+            return False
+        if len(self._pending) >= self.max_pending_records:
+            self.dropped += 1
+            return False
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._pending.append((timestamp, data))
+        if len(self._pending) == 1:
+            self._wakeup.set()
+        return True
+
+    def _run(self):
+        error = None
+        try:
+            while self._running or self._pending:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._drain()
+                self._sync()
+                if self._file and time.monotonic() - self._segment_opened >= self.max_segment_seconds:
+                    self._rotate()
+        except OSError as e:
+            error = e
+        finally:
+            try:
+                self._close_segment()
+            except OSError as e:
+                # The handle that just failed usually fails again; the first error is the one to report
+                error = error or e
+        if error is not None:
+            self._running = False
+            if self.on_error:
+                self.on_error(error)
+
+    def _drain(self):
+        pending = self._pending
+        while pending:
+            timestamp, data = pending.popleft()
+            encoded = self.encode(timestamp, data)
+            if self._file is None or self._segment_bytes + len(encoded) > self.max_segment_bytes:
+                self._rotate()
+            self._file.write(encoded)
+            self._segment_bytes += len(encoded)
+            self.bytes_written += len(encoded)
+            self.records_written += 1
+
+    def _sync(self):
+        if self._file is None or self.sync_policy == SYNC_NONE:
+            return
+        self._file.flush()
+        if self.sync_policy == SYNC_FSYNC:
+            os.fsync(self._file.fileno())
+
+    def _rotate(self):
+        self._close_segment()
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._segment_index += 1
+        name = f"{self.prefix}_{stamp}_{self._segment_index:04d}{self.extension}"
+        self._segment_path = os.path.join(self.directory, name)
+        self._file = open(self._segment_path, "ab", buffering=self.buffer_size)
+        self._segment_bytes = 0
+        self._segment_opened = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        try:
+            file.flush()
+            if self.sync_policy == SYNC_FSYNC:
+                os.fsync(file.fileno())
+        except OSError:
+            # Release the handle anyway, so nothing retries it
+            try:
+                file.close()
+            except OSError:
+                pass
+            raise
+        file.close()
+        path = self._segment_path
+        if self.compression:
+            threading.Thread(target=self._compress, args=(path,), daemon=False).start()
+        else:
+            self.segments.append(path)
+
+    def _compress(self, path):
+        try:
+            self.segments.append(compress_segment(path, self.compression))
+        except OSError as e:
+            self.segments.append(path)
+            if self.on_error:
+                self.on_error(e)
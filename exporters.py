@@ -0,0 +1,281 @@
+import csv
+import importlib.util
+import json
+import os
+import threading
+import zipfile
+from datetime import datetime
+
+from capture_store import wall_time
+from render import format_payload, format_record
+
+# Optional columnar backends; only probed here and imported by the
+# exporter that needs them, which keeps them out of app startup
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Records pulled from the store per chunk
+EXPORT_CHUNK = 4096
+
+
+class ExportError(Exception):
+    """Raised when an export cannot be completed"""
+
+
+class ExportCancelled(ExportError):
+    """Raised when an export is cancelled part way through"""
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(wall_time(timestamp)).isoformat(timespec="microseconds")
+
+
+class _Exporter:
+    """Streams records from a CaptureStore into one output file"""
+
+    extension = ""
+
+    def __init__(self, path, display_format):
+        self.path = path
+        self.display_format = display_format
+
+    def open(self, count, payload_bytes):
+        pass
+
+    def write_chunk(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        self.close()
+
+
+class TextExporter(_Exporter):
+    """Data monitor lines, as shown in the Textbox"""
+
+    extension = ".txt"
+
+    def open(self, count, payload_bytes):
+        self.file = open(self.path, "w", encoding="utf-8")
+
+    def write_chunk(self, records):
+        display_format = self.display_format
+        self.file.writelines(format_record(t, d, display_format) + "\n" for t, d in records)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvExporter(_Exporter):
+    """Timestamp, rendered data and raw hex per record"""
+
+    extension = ".csv"
+
+    def open(self, count, payload_bytes):
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Timestamp", "Data", "Raw"])
+
+    def write_chunk(self, records):
+        display_format = self.display_format
+        self.writer.writerows([_iso(t), format_payload(d, display_format), d.hex()] for t, d in records)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesExporter(_Exporter):
+    """One JSON object per record"""
+
+    extension = ".jsonl"
+
+    def open(self, count, payload_bytes):
+        self.file = open(self.path, "w", encoding="utf-8")
+
+    def write_chunk(self, records):
+        display_format = self.display_format
+        self.file.writelines(
+            json.dumps({"timestamp": wall_time(t), "time": _iso(t),
+                        "data": format_payload(d, display_format), "hex": d.hex()}) + "\n"
+            for t, d in records)
+
+    def close(self):
+        self.file.close()
+
+
+class NpzExporter(_Exporter):
+    """Columnar NumPy archive: timestamps, record end offsets, payload bytes
+
+    The payload member is streamed into the zip chunk by chunk; the
+    timestamp and offset columns (16 bytes per record) are collected and
+    written at the end.
+    """
+
+    extension = ".npz"
+
+    def open(self, count, payload_bytes):
+        import numpy as np
+        self.np = np
+        self.count = count
+        self.payload_bytes = payload_bytes
+        self.written = 0
+        self.timestamps = np.empty(count, dtype="<f8")
+        self.ends = np.empty(count, dtype="<u8")
+        self.row = 0
+        self.zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+        self.member = self.zip.open("payload.npy", "w", force_zip64=True)
+        np.lib.format.write_array_header_2_0(
+            self.member, {"descr": "|u1", "fortran_order": False, "shape": (payload_bytes,)})
+
+    def write_chunk(self, records):
+        row = self.row
+        for timestamp, data in records:
+            self.member.write(data)
+            self.written += len(data)
+            self.timestamps[row] = wall_time(timestamp)
+            self.ends[row] = self.written
+            row += 1
+        self.row = row
+
+    def close(self):
+        self.member.close()
+        if self.row != self.count or self.written != self.payload_bytes:
+            self.zip.close()
+            raise ExportError("capture history was evicted during export")
+        for name, array in (("timestamps.npy", self.timestamps), ("ends.npy", self.ends)):
+            with self.zip.open(name, "w", force_zip64=True) as member:
+                self.np.lib.format.write_array(member, array)
+        self.zip.close()
+
+    def abort(self):
+        self.member.close()
+        self.zip.close()
+
+
+class ParquetExporter(_Exporter):
+    """Parquet table with timestamp and binary payload columns"""
+
+    extension = ".parquet"
+
+    def open(self, count, payload_bytes):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([("timestamp", pa.timestamp("us")), ("data", pa.binary())])
+        self.writer = pq.ParquetWriter(self.path, self.schema)
+
+    def write_chunk(self, records):
+        pa = self.pa
+        timestamps = [int(wall_time(t) * 1e6) for t, _ in records]
+        batch = pa.record_batch([pa.array(timestamps, pa.timestamp("us")),
+                                 pa.array([d for _, d in records], pa.binary())], schema=self.schema)
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+
+
+# Export formats offered in the UI (label -> exporter class)
+EXPORT_FORMATS = {
+    "CSV": CsvExporter,
+    "JSON Lines": JsonLinesExporter,
+    "Text": TextExporter,
+}
+if NUMPY_AVAILABLE:
+    EXPORT_FORMATS["NumPy archive"] = NpzExporter
+if PYARROW_AVAILABLE:
+    EXPORT_FORMATS["Parquet"] = ParquetExporter
+
+
+def exporter_for_path(path, default="CSV"):
+    """Pick an export format label from a file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    for label, exporter in EXPORT_FORMATS.items():
+        if exporter.extension == extension:
+            return label
+    return default
+
+
+def export_records(store, path, export_format, display_format="text",
+                   progress=None, cancel=None, chunk_size=EXPORT_CHUNK):
+    """Stream every record currently in `store` to `path`
+
+    progress(done, total) is called after each chunk; cancel is an
+    optional threading.Event checked between chunks. Returns the number
+    of records written.
+    """
+    start, stop, payload_bytes = store.span()
+    total = stop - start
+    exporter = EXPORT_FORMATS[export_format](path, display_format)
+    exporter.open(total, payload_bytes)
+
+    done = 0
+    chunk = []
+    try:
+        for record in store.iter_records(start, stop, chunk_size):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                exporter.write_chunk(chunk)
+                done += len(chunk)
+                chunk = []
+                if progress:
+                    progress(done, total)
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelled("export cancelled")
+        if chunk:
+            exporter.write_chunk(chunk)
+            done += len(chunk)
+    except BaseException:
+        exporter.abort()
+        raise
+    exporter.close()
+    if progress:
+        progress(done, total)
+    return done
+
+
+class ExportJob:
+    """Runs export_records on a background thread
+
+    The GUI polls done/total/finished from its update tick instead of
+    receiving callbacks from the worker thread.
+    """
+
+    def __init__(self, store, path, export_format, display_format="text"):
+        self.store = store
+        self.path = path
+        self.export_format = export_format
+        self.display_format = display_format
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.finished = False
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 1.0
+
+    def _progress(self, done, total):
+        self.done = done
+        self.total = total
+
+    def _run(self):
+        try:
+            export_records(self.store, self.path, self.export_format, self.display_format,
+                           progress=self._progress, cancel=self.cancel_event)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
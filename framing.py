@@ -0,0 +1,285 @@
+import time
+
+# Upper bound on a buffered partial frame before it is forced out / dropped
+DEFAULT_MAX_FRAME = 64 * 1024
+
+# SLIP special bytes (RFC 1055)
+SLIP_END = 0xC0
+SLIP_ESC = 0xDB
+SLIP_ESC_END = 0xDC
+SLIP_ESC_ESC = 0xDD
+
+
+class FramingError(ValueError):
+    """Raised when a framer is configured with invalid options"""
+
+
+class Framer:
+    """Incremental splitter that turns a byte stream into records
+
+    feed() appends a chunk to one reusable bytearray, cuts out every
+    frame it completes and drops the consumed prefix once per chunk, so
+    a partial frame is never copied on every read. Each completed frame
+    is stamped with the timestamp of the chunk that completed it.
+    """
+
+    name = "raw"
+
+    def __init__(self, max_length=DEFAULT_MAX_FRAME):
+        self.max_length = max_length
+        self.errors = 0
+        self._buffer = bytearray()
+
+    def feed(self, data, timestamp=None):
+        """Add received bytes; returns [(timestamp, frame_bytes), ...]"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        consumed = self._extract(buffer, frames)
+        if consumed:
+            del buffer[:consumed]
+        if self.max_length and len(buffer) > self.max_length:
+            self._overflow(buffer, frames)
+        return [(timestamp, frame) for frame in frames]
+
+    def flush(self, timestamp=None):
+        """Return whatever partial frame is buffered and reset"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        frame = bytes(self._buffer)
+        self._buffer.clear()
+        return [(timestamp, frame)] if frame else []
+
+    def reset(self):
+        self._buffer.clear()
+
+    @property
+    def pending(self):
+        """Number of buffered bytes that don't form a full frame yet"""
+        return len(self._buffer)
+
+    def _extract(self, buffer, frames):
+        """Append complete frames to `frames`; return bytes consumed"""
+        frames.append(bytes(buffer))
+        return len(buffer)
+
+    def _overflow(self, buffer, frames):
+        # Default: give up on the oversized partial frame
+        self.errors += 1
+        buffer.clear()
+
+
+class RawFramer(Framer):
+    """Pass-through: every received chunk is one record
+
+    The chunk object itself is handed on (no copy); BLE notification
+    bytearrays are fresh per notification, so this is safe.
+    """
+
+    name = "raw"
+
+    def feed(self, data, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        return [(timestamp, data)] if data else []
+
+
+class DelimiterFramer(Framer):
+    """Split on a delimiter such as b"\\n" or b"\\r\\n" """
+
+    name = "delimiter"
+
+    def __init__(self, delimiter=b"\n", keep_delimiter=False, max_length=DEFAULT_MAX_FRAME):
+        super().__init__(max_length)
+        if not delimiter:
+            raise FramingError("delimiter must not be empty")
+        self.delimiter = bytes(delimiter)
+        self.keep_delimiter = keep_delimiter
+
+    def _extract(self, buffer, frames):
+        delimiter = self.delimiter
+        size = len(delimiter)
+        tail = size if self.keep_delimiter else 0
+        start = 0
+        while True:
+            end = buffer.find(delimiter, start)
+            if end < 0:
+                return start
+            frames.append(bytes(buffer[start:end + tail]))
+            start = end + size
+
+    def _overflow(self, buffer, frames):
+        # An over-long line is emitted as-is rather than lost
+        self.errors += 1
+        frames.append(bytes(buffer))
+        buffer.clear()
+
+
+class FixedLengthFramer(Framer):
+    """Cut the stream into records of exactly `length` bytes"""
+
+    name = "fixed"
+
+    def __init__(self, length, max_length=DEFAULT_MAX_FRAME):
+        super().__init__(max_length)
+        if length <= 0:
+            raise FramingError("frame length must be positive")
+        self.length = length
+
+    def _extract(self, buffer, frames):
+        length = self.length
+        whole = len(buffer) - len(buffer) % length
+        frames.extend(bytes(buffer[i:i + length]) for i in range(0, whole, length))
+        return whole
+
+
+class LengthPrefixFramer(Framer):
+    """Records preceded by a 1, 2 or 4 byte unsigned length header"""
+
+    name = "length"
+
+    def __init__(self, header_size=2, byteorder="big", include_header=False,
+                 max_length=DEFAULT_MAX_FRAME):
+        super().__init__(max_length)
+        if header_size not in (1, 2, 4):
+            raise FramingError("header size must be 1, 2 or 4 bytes")
+        self.header_size = header_size
+        self.byteorder = byteorder
+        self.include_header = include_header
+
+    def _extract(self, buffer, frames):
+        header_size = self.header_size
+        start = 0
+        while len(buffer) - start >= header_size:
+            length = int.from_bytes(buffer[start:start + header_size], self.byteorder)
+            # max_length bounds the buffered frame, header included (see Framer.feed)
+            if self.max_length and header_size + length > self.max_length:
+                # Corrupt header; drop one byte and try to resynchronise
+                self.errors += 1
+                start += 1
+                continue
+            end = start + header_size + length
+            if end > len(buffer):
+                break
+            frames.append(bytes(buffer[start if self.include_header else start + header_size:end]))
+            start = end
+        return start
+
+
+class CobsFramer(Framer):
+    """Consistent Overhead Byte Stuffing frames terminated by 0x00"""
+
+    name = "cobs"
+
+    def _extract(self, buffer, frames):
+        start = 0
+        while True:
+            end = buffer.find(0, start)
+            if end < 0:
+                return start
+            if end > start:
+                frame = cobs_decode(buffer[start:end])
+                if frame is None:
+                    self.errors += 1
+                else:
+                    frames.append(frame)
+            start = end + 1
+
+
+class SlipFramer(Framer):
+    """SLIP (RFC 1055) frames delimited by 0xC0"""
+
+    name = "slip"
+
+    def _extract(self, buffer, frames):
+        start = 0
+        while True:
+            end = buffer.find(SLIP_END, start)
+            if end < 0:
+                return start
+            if end > start:
+                frames.append(slip_decode(buffer[start:end]))
+            start = end + 1
+
+
+def cobs_decode(encoded):
+    """Decode one COBS block (without the trailing zero); None if malformed"""
+    out = bytearray()
+    i = 0
+    size = len(encoded)
+    while i < size:
+        code = encoded[i]
+        if code == 0 or i + code > size:
+            return None
+        out += encoded[i + 1:i + code]
+        i += code
+        if code < 0xFF and i < size:
+            out.append(0)
+    return bytes(out)
+
+
+def cobs_encode(data):
+    """Encode bytes with COBS and append the 0x00 frame delimiter"""
+    out = bytearray()
+    for block in bytes(data).split(b"\x00"):
+        while len(block) >= 0xFE:
+            out.append(0xFF)
+            out += block[:0xFE]
+            block = block[0xFE:]
+        out.append(len(block) + 1)
+        out += block
+    out.append(0)
+    return bytes(out)
+
+
+def slip_decode(encoded):
+    """Undo SLIP escaping for one frame"""
+    return bytes(encoded).replace(b"\xdb\xdc", b"\xc0").replace(b"\xdb\xdd", b"\xdb")
+
+
+def slip_encode(data):
+    """Escape bytes for SLIP and wrap them in END markers"""
+    return b"\xc0" + bytes(data).replace(b"\xdb", b"\xdb\xdd").replace(b"\xc0", b"\xdb\xdc") + b"\xc0"
+
+
+# Framing choices offered in the UI (label -> factory taking the parameter text)
+FRAMER_CHOICES = {
+    "Raw chunks": lambda param: RawFramer(),
+    "Line (\\n)": lambda param: DelimiterFramer(b"\n"),
+    "Line (\\r\\n)": lambda param: DelimiterFramer(b"\r\n"),
+    "Delimiter": lambda param: DelimiterFramer(parse_delimiter(param)),
+    "Fixed length": lambda param: FixedLengthFramer(int(param)),
+    "Length prefix": lambda param: LengthPrefixFramer(int(param or 2)),
+    "COBS": lambda param: CobsFramer(),
+    "SLIP": lambda param: SlipFramer(),
+}
+
+
+def parse_delimiter(text):
+    """Parse a delimiter typed by the user: 0x hex (0x0D0A, 0x0D 0x0A) or text with escapes (\\r\\n, \\x00)"""
+    text = (text or "").strip()
+    if not text:
+        raise FramingError("delimiter must not be empty")
+    tokens = text.split()
+    if tokens[0][:2].lower() == "0x":
+        # Every group needs its own prefix, so "0x0D 0A" is rejected rather than guessed at
+        digits = [token[2:] for token in tokens if token[:2].lower() == "0x"]
+        try:
+            if len(digits) == len(tokens) and all(digits):
+                return bytes.fromhex("".join(digits))
+        except ValueError:
+            pass
+        raise FramingError(f"invalid hex delimiter {text!r}: write bytes as 0x0D0A or 0x0D 0x0A")
+    return text.encode("latin-1", "backslashreplace").decode("unicode_escape").encode("latin-1")
+
+
+def make_framer(choice, param=""):
+    """Build a framer from a FRAMER_CHOICES label and its parameter text"""
+    try:
+        return FRAMER_CHOICES[choice](param)
+    except KeyError:
+        raise FramingError(f"unknown framing: {choice}")
+    except ValueError as e:
+        raise FramingError(f"invalid {choice} parameter {param!r}: {e}")
@@ -0,0 +1,48 @@
+import collections
+import time
+import traceback
+
+# Longest a single drain may run before leaving the rest for the next tick (seconds)
+MAX_DRAIN_SECONDS = 0.02
+
+
+class GuiBridge:
+    """Thread-safe hand-off of callbacks to the Tk thread, run in batches
+
+    Worker threads and event loops call post(callback, *args) instead of
+    root.after(0, ...): posting only appends to a deque, never touches Tk,
+    and wakes nothing. The Tk thread calls drain() from its existing
+    refresh tick and runs everything queued since the last tick in one
+    batch, so a burst of events costs one timer instead of one each.
+    """
+
+    def __init__(self, max_seconds=MAX_DRAIN_SECONDS):
+        self.max_seconds = max_seconds
+        self._queue = collections.deque()
+        self.posted = 0
+        self.batches = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def post(self, callback, *args):
+        """Queue callback(*args) for the Tk thread; safe from any thread"""
+        self._queue.append((callback, args))
+        self.posted += 1
+
+    def drain(self):
+        """Run queued callbacks on the Tk thread; returns True if some are left"""
+        queue = self._queue
+        if not queue:
+            return False
+        self.batches += 1
+        deadline = time.perf_counter() + self.max_seconds
+        while queue:
+            callback, args = queue.popleft()
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+            if time.perf_counter() >= deadline:
+                break
+        return bool(queue)
@@ -0,0 +1,128 @@
+import customtkinter as ctk
+
+
+class VirtualLogView(ctk.CTkFrame):
+    """Data monitor that draws only the rows on screen
+
+    The text widget holds exactly one screenful, re-rendered from a
+    VirtualLog whenever the view scrolls, resizes or (while following the
+    tail) new records arrive. The scrollbar is driven by row numbers,
+    not by the widget's content, so a capture of any size scrolls and
+    jumps in constant time.
+    """
+
+    def __init__(self, master, log, font=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.log = log
+        self.top = 0
+        self.follow = True
+        self.visible_rows = 1
+        self.marked_row = None
+        self._drawn = None
+        self._font = font or ctk.CTkFont(family="Consolas", size=12)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.textbox = ctk.CTkTextbox(self, font=self._font, wrap="none", activate_scrollbars=False)
+        self.textbox.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.textbox.tag_config("mark", background="#1f538d", foreground="white")
+
+        self.textbox.bind("<Configure>", self._on_resize)
+        self.textbox.bind("<MouseWheel>", self._on_wheel)
+        self.textbox.bind("<Button-4>", lambda e: self._scroll_event(-3))
+        self.textbox.bind("<Button-5>", lambda e: self._scroll_event(3))
+        for key, rows in (("<Prior>", "-page"), ("<Next>", "page"), ("<Up>", -1), ("<Down>", 1)):
+            self.textbox.bind(key, lambda e, rows=rows: self._scroll_event(rows))
+        self.textbox.bind("<Home>", lambda e: self._jump(0))
+        self.textbox.bind("<End>", lambda e: self._jump(None))
+
+    # Updates
+
+    def refresh(self, auto_scroll=True):
+        """Catch up with new records; call from the GUI tick. Returns True if indexing is behind"""
+        self.log.refresh()
+        if self.follow and auto_scroll:
+            self.top = self._last_top()
+        self.redraw()
+        return self.log.pending
+
+    def redraw(self, force=False):
+        total = self.log.row_count
+        first = self.log.first_row
+        self.top = max(first, min(self.top, self._last_top()))
+        state = (self.top, self.visible_rows, total, first, self.log.display_format, self.marked_row)
+        if state == self._drawn and not force:
+            return
+        self._drawn = state
+
+        lines = self.log.render(self.top, self.visible_rows)
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        if lines:
+            self.textbox.insert("1.0", "\n".join(lines))
+            if self.marked_row is not None and 0 <= self.marked_row - self.top < len(lines):
+                line = self.marked_row - self.top + 1
+                self.textbox.tag_add("mark", f"{line}.0", f"{line}.end")
+        self.textbox.configure(state="disabled")
+
+        span = max(1, total - first)
+        self.scrollbar.set((self.top - first) / span, min(1.0, (self.top - first + self.visible_rows) / span))
+
+    def reset(self):
+        self.log.reset()
+        self.top = 0
+        self.follow = True
+        self.marked_row = None
+        self.redraw(force=True)
+
+    def show_row(self, row):
+        """Scroll a row to the middle of the view and highlight it (None clears the mark)"""
+        self.marked_row = row
+        if row is not None:
+            self.top = max(self.log.first_row, row - self.visible_rows // 2)
+            self.follow = False
+        self.redraw()
+
+    # Scrolling
+
+    def _last_top(self):
+        return max(self.log.first_row, self.log.row_count - self.visible_rows)
+
+    def _jump(self, top):
+        self.top = self._last_top() if top is None else top
+        self.follow = top is None
+        self.redraw()
+        return "break"
+
+    def _scroll_event(self, rows):
+        if rows in ("page", "-page"):
+            rows = self.visible_rows * (1 if rows == "page" else -1)
+        return self._jump_rows(rows)
+
+    def _jump_rows(self, rows):
+        self.top = max(self.log.first_row, min(self.top + rows, self._last_top()))
+        self.follow = self.top >= self._last_top()
+        self.redraw()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._jump_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            first = self.log.first_row
+            self.top = first + int(float(value) * max(0, self.log.row_count - first))
+            self.follow = self.top >= self._last_top()
+            self.redraw()
+        elif action == "scroll":
+            self._scroll_event("page" if unit == "pages" and int(value) > 0 else
+                               "-page" if unit == "pages" else int(value))
+
+    def _on_resize(self, event):
+        line_height = self._font.metrics("linespace") or 16
+        self.visible_rows = max(1, event.height // line_height)
+        if self.follow:
+            self.top = self._last_top()
+        self.redraw()
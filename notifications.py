@@ -0,0 +1,114 @@
+import collections
+import threading
+import time
+
+# Notification levels, least to most severe
+LEVELS = ["info", "success", "warning", "error"]
+
+# New notifications shown per second, and how many may be shown back to back
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 3
+
+# Waiting notifications kept beyond the one on screen; older ones are dropped
+DEFAULT_MAX_PENDING = 16
+
+
+class Notification:
+    __slots__ = ("message", "level", "count", "first", "last")
+
+    def __init__(self, message, level, now):
+        self.message = message
+        self.level = level
+        self.count = 1
+        self.first = now
+        self.last = now
+
+    @property
+    def text(self):
+        """Message with a repeat counter once it has been coalesced"""
+        if self.count > 1:
+            return f"{self.message}  x{self.count}"
+        return self.message
+
+
+class NotificationQueue:
+    """Coalescing, rate-limited queue behind a single toast widget
+
+    A message that repeats the one on screen, or one still waiting, only
+    bumps its counter ("x42") instead of queueing another toast. New
+    toasts are released by a token bucket (rate per second, up to burst
+    back to back), and at most max_pending wait; beyond that the oldest
+    least severe one is dropped and counted. post() is thread-safe and
+    never blocks on the display.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_pending=DEFAULT_MAX_PENDING):
+        self.rate = rate
+        self.burst = burst
+        self.max_pending = max_pending
+        self.current = None
+        self.pending = collections.deque()
+        self.posted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def post(self, message, level="info", now=None):
+        """Queue a message; returns its Notification (possibly an existing one)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.posted += 1
+            for notification in [self.current, *self.pending]:
+                if notification and notification.message == message and notification.level == level:
+                    notification.count += 1
+                    notification.last = now
+                    self.coalesced += 1
+                    return notification
+            notification = Notification(message, level, now)
+            self.pending.append(notification)
+            if len(self.pending) > self.max_pending:
+                self._drop_one()
+            return notification
+
+    def _drop_one(self):
+        # The oldest of the least severe waiting notifications goes first
+        victim = min(self.pending, key=lambda n: LEVELS.index(n.level) if n.level in LEVELS else 0)
+        self.pending.remove(victim)
+        self.dropped += 1
+
+    def next(self, now=None):
+        """Make the next waiting notification current, if the rate allows
+
+        Returns it, or None when nothing waits or the bucket is empty.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.pending:
+                return None
+            self._refill(now)
+            if self._tokens < 1.0:
+                return None
+            self._tokens -= 1.0
+            self.current = self.pending.popleft()
+            return self.current
+
+    def retry_in(self, now=None):
+        """Seconds until next() can release a waiting notification"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            return max(0.0, (1.0 - self._tokens) / self.rate)
+
+    def dismiss(self):
+        """The current notification left the screen"""
+        with self._lock:
+            self.current = None
+
+    def _refill(self, now):
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
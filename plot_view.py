@@ -0,0 +1,115 @@
+import time
+import tkinter as tk
+
+import customtkinter as ctk
+
+# Time spans the plot can show, in seconds
+PLOT_WINDOWS = {"10 s": 10, "1 min": 60, "10 min": 600, "1 h": 3600}
+
+# Line colour per channel lane
+CHANNEL_COLORS = ["#3b8ed0", "#e0a030", "#4caf50", "#e05050", "#a070d0", "#40c0c0", "#d070a0", "#b0b040"]
+
+# Empty pixels above and below the trace in each lane
+LANE_PADDING = 6
+
+
+class TelemetryPlot(ctk.CTkFrame):
+    """Live plot of a TelemetryBuffer, one stacked lane per channel
+
+    draw() is stepped by the app's frame clock. Each frame decimates the
+    visible window to one min/max pair per pixel column and moves one
+    pooled polyline and label per lane, so a frame costs the same for
+    ten seconds or an hour of samples. Each lane is scaled to its own
+    range, so channels of very different magnitude stay readable.
+    """
+
+    def __init__(self, master, buffer=None, height=240, **kwargs):
+        super().__init__(master, **kwargs)
+        self.buffer = buffer
+        self.window = PLOT_WINDOWS["10 s"]
+        self.draw_seconds = 0.0
+        self._lanes = []
+
+        self.grid_columnconfigure(2, weight=1)
+        self.window_label = ctk.CTkLabel(self, text="Window:")
+        self.window_label.grid(row=0, column=0, padx=(10, 5), pady=(5, 0))
+        self.window_combo = ctk.CTkComboBox(self, values=list(PLOT_WINDOWS), width=90,
+                                           command=self.on_window_change, state="readonly")
+        self.window_combo.set("10 s")
+        self.window_combo.grid(row=0, column=1, padx=5, pady=(5, 0))
+        self.status_label = ctk.CTkLabel(self, text="", anchor="e")
+        self.status_label.grid(row=0, column=2, sticky="ew", padx=10, pady=(5, 0))
+
+        self.canvas = tk.Canvas(self, height=height, bg="#1a1a1a", highlightthickness=0)
+        self.canvas.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10, pady=10)
+
+    def on_window_change(self, choice):
+        self.window = PLOT_WINDOWS[choice]
+
+    # Drawing
+
+    def _ensure_lanes(self, count):
+        # Items are created once per lane and hidden, never deleted
+        while len(self._lanes) < count:
+            color = CHANNEL_COLORS[len(self._lanes) % len(CHANNEL_COLORS)]
+            self._lanes.append((
+                self.canvas.create_line(0, 0, 0, 0, fill=color),
+                self.canvas.create_text(4, 0, anchor="nw", fill=color, font=("Consolas", 9)),
+                self.canvas.create_line(0, 0, 0, 0, fill="#333333"),
+            ))
+        for i, items in enumerate(self._lanes):
+            for item in items:
+                self.canvas.itemconfigure(item, state="normal" if i < count else "hidden")
+
+    def draw(self):
+        """Render one frame; always returns True so the frame clock keeps stepping it"""
+        buffer = self.buffer
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if buffer is None or width < 2 or height < 2:
+            return True
+        start = time.perf_counter()
+        now = time.monotonic()
+        result = buffer.decimate(now - self.window, now, width)
+        if result is None:
+            self._ensure_lanes(0)
+            self.status_label.configure(text="Waiting for numeric data")
+            return True
+
+        np = buffer.np
+        low, high = result
+        channels = low.shape[0]
+        self._ensure_lanes(channels)
+        lane_height = height / channels
+        usable = max(1.0, lane_height - 2 * LANE_PADDING)
+        columns = np.arange(width, dtype=np.float32)
+        for channel in range(channels):
+            line, label, separator = self._lanes[channel]
+            top = channel * lane_height
+            name = buffer.channel_name(channel)
+            self.canvas.coords(separator, 0, top, width, top)
+            self.canvas.coords(label, 4, top + 2)
+            valid = ~np.isnan(low[channel])
+            if not valid.any():
+                self.canvas.coords(line, 0, 0, 0, 0)
+                self.canvas.itemconfigure(label, text=name)
+                continue
+            lows, highs = low[channel][valid], high[channel][valid]
+            vmin, vmax = float(lows.min()), float(highs.max())
+            latest = buffer.latest[channel]
+            text = name if latest is None else f"{name} {latest:g}  [{vmin:g} .. {vmax:g}]"
+            self.canvas.itemconfigure(label, text=text)
+            if vmax == vmin:
+                vmin, vmax = vmin - 0.5, vmax + 0.5
+            scale = usable / (vmax - vmin)
+            # One zig-zag polyline through each column's min and max
+            points = np.empty((lows.size * 2, 2), dtype=np.float32)
+            points[0::2, 0] = points[1::2, 0] = columns[valid]
+            points[0::2, 1] = top + LANE_PADDING + (vmax - lows) * scale
+            points[1::2, 1] = top + LANE_PADDING + (vmax - highs) * scale
+            self.canvas.coords(line, points.ravel().tolist())
+
+        self.draw_seconds = time.perf_counter() - start
+        self.status_label.configure(text=f"{len(buffer)} samples, {channels} channels, "
+                                         f"{self.draw_seconds * 1000:.1f} ms/frame")
+        return True
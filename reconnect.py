@@ -0,0 +1,153 @@
+import collections
+import csv
+import random
+import threading
+import time
+from datetime import datetime
+
+# Backoff defaults (seconds)
+DEFAULT_INITIAL_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+# Incidents kept for metrics and export
+INCIDENT_HISTORY = 1000
+
+
+class Backoff:
+    """Jittered exponential backoff
+
+    Delay n is initial * factor**n capped at maximum, reduced by a random
+    fraction of up to `jitter` so many clients that lost the same link
+    don't retry in lockstep.
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_DELAY, maximum=DEFAULT_MAX_DELAY, factor=2.0, jitter=0.5):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempt = 0
+
+    def next(self):
+        base = min(self.maximum, self.initial * self.factor ** self.attempt)
+        self.attempt += 1
+        return base * (1.0 - self.jitter * random.random())
+
+    def reset(self):
+        self.attempt = 0
+
+
+class Incident:
+    """One link loss: when it happened, how many attempts, how long until recovered"""
+
+    __slots__ = ("started", "lost_at", "reason", "attempts", "recovered_s", "outcome")
+
+    def __init__(self, reason):
+        self.started = datetime.now()
+        self.lost_at = time.monotonic()
+        self.reason = reason
+        self.attempts = 0
+        self.recovered_s = None
+        self.outcome = "reconnecting"
+
+
+class ReconnectSupervisor:
+    """Re-establishes a lost link on a worker thread
+
+    connect(attempt) is a blocking callable that raises on failure. The
+    first attempt is made immediately, later ones after Backoff delays.
+    Callbacks run on the worker thread: on_attempt(attempt, delay)
+    before each wait, on_recovered(incident) after a successful connect,
+    on_give_up(incident) once max_attempts is exhausted.
+
+    A cancelled loop may still be inside connect(); link_lost() does not
+    wait for it but starts a new loop, and the old one exits without
+    reporting once its attempt returns. connect() can compare `current`
+    with the incident it started under to drop a link opened that late.
+    """
+
+    def __init__(self, connect, on_recovered=None, on_attempt=None, on_give_up=None,
+                 backoff=None, max_attempts=None):
+        self.connect = connect
+        self.on_recovered = on_recovered
+        self.on_attempt = on_attempt
+        self.on_give_up = on_give_up
+        self.backoff = backoff or Backoff()
+        self.max_attempts = max_attempts
+        self.incidents = collections.deque(maxlen=INCIDENT_HISTORY)
+        self.current = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def active(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def link_lost(self, reason=None):
+        """Start reconnecting (no-op while an attempt loop is already running)"""
+        if self.active and not self._cancel.is_set():
+            return
+        # Each loop has its own cancel event, so a superseded one stays cancelled
+        self._cancel = threading.Event()
+        self.current = Incident(str(reason) if reason else None)
+        self.incidents.append(self.current)
+        self._thread = threading.Thread(target=self._run, args=(self.current, self._cancel), daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop retrying (e.g. the user disconnected or closed the app)"""
+        self._cancel.set()
+        if self.current and self.current.outcome == "reconnecting":
+            self.current.outcome = "cancelled"
+
+    def _run(self, incident, cancel):
+        self.backoff.reset()
+        delay = 0.0
+        while not cancel.is_set():
+            if self.max_attempts is not None and incident.attempts >= self.max_attempts:
+                incident.outcome = "gave up"
+                if self.on_give_up:
+                    self.on_give_up(incident)
+                return
+            if self.on_attempt:
+                self.on_attempt(incident.attempts + 1, delay)
+            if delay and cancel.wait(delay):
+                break
+            incident.attempts += 1
+            try:
+                self.connect(incident.attempts)
+            except Exception:
+                delay = self.backoff.next()
+                continue
+            if cancel.is_set():
+                break
+            incident.recovered_s = time.monotonic() - incident.lost_at
+            incident.outcome = "recovered"
+            if self.on_recovered:
+                self.on_recovered(incident)
+            return
+        incident.outcome = "cancelled"
+
+    def metrics(self):
+        """Incident counts and time-to-recover statistics (seconds)"""
+        incidents = list(self.incidents)
+        recovered = sorted(i.recovered_s for i in incidents if i.recovered_s is not None)
+        return {
+            "incidents": len(incidents),
+            "recovered": len(recovered),
+            "failed": sum(1 for i in incidents if i.outcome in ("gave up", "cancelled")),
+            "last_s": incidents[-1].recovered_s if incidents else None,
+            "mean_s": sum(recovered) / len(recovered) if recovered else None,
+            "p95_s": recovered[min(len(recovered) - 1, int(len(recovered) * 0.95))] if recovered else None,
+            "max_s": recovered[-1] if recovered else None,
+        }
+
+    def export(self, path):
+        """Write one CSV row per incident"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Started", "Reason", "Attempts", "Outcome", "Time to recover (s)"])
+            for incident in list(self.incidents):
+                recovered = "" if incident.recovered_s is None else f"{incident.recovered_s:.3f}"
+                writer.writerow([incident.started.isoformat(timespec="seconds"), incident.reason or "",
+                                 incident.attempts, incident.outcome, recovered])
@@ -0,0 +1,249 @@
+import bisect
+import collections
+import csv
+import json
+import time
+
+# ACK timeout and retry policy
+DEFAULT_ACK_TIMEOUT = 1.0
+DEFAULT_MAX_RETRIES = 2
+
+
+def _bucket_edges(lowest=0.0001, highest=60.0, factor=1.2):
+    edges = [lowest]
+    while edges[-1] < highest:
+        edges.append(edges[-1] * factor)
+    return edges
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with percentile estimates
+
+    Buckets grow by 20% from 0.1 ms to 60 s, so any percentile is exact
+    to within one bucket (about 20%) while memory stays constant.
+    """
+
+    EDGES = _bucket_edges()
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Upper edge of the bucket holding the pct-th sample (seconds)"""
+        if not self.count:
+            return None
+        rank = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                edge = self.EDGES[i] if i < len(self.EDGES) else self.max
+                return min(edge, self.max)
+        return self.max
+
+    def summary(self):
+        """Count, mean, min/max and p50/p95/p99 in milliseconds"""
+        as_ms = lambda value: None if value is None else value * 1000
+        return {
+            "count": self.count,
+            "mean_ms": as_ms(self.total / self.count if self.count else None),
+            "min_ms": as_ms(self.min),
+            "p50_ms": as_ms(self.percentile(50)),
+            "p95_ms": as_ms(self.percentile(95)),
+            "p99_ms": as_ms(self.percentile(99)),
+            "max_ms": as_ms(self.max),
+        }
+
+    def buckets(self):
+        """[(lower_ms, upper_ms, count), ...] for non-empty buckets"""
+        rows = []
+        for i, count in enumerate(self.counts):
+            if count:
+                lower = self.EDGES[i - 1] * 1000 if i else 0.0
+                upper = self.EDGES[i] * 1000 if i < len(self.EDGES) else float("inf")
+                rows.append((lower, upper, count))
+        return rows
+
+
+def parse_ack(data):
+    """Parse an ACK_R<n><s> notification into (relay_index, state) or None"""
+    text = bytes(data).decode("ascii", errors="ignore").strip()
+    if len(text) >= 7 and text.startswith("ACK_R") and text[5].isdigit() and text[6] in "01":
+        return int(text[5]) - 1, int(text[6])
+    return None
+
+
+class _InFlight:
+    __slots__ = ("relay", "state", "enqueued", "sent", "attempts", "timer")
+
+    def __init__(self, relay, state, enqueued, sent):
+        self.relay = relay
+        self.state = state
+        self.enqueued = enqueued
+        self.sent = sent
+        self.attempts = 1
+        self.timer = None
+
+
+class AckTracker:
+    """Matches ACK_R<n><s> notifications to dispatched relay commands
+
+    Runs entirely on the BLE event loop: on_dispatched is wired to the
+    dispatcher and on_notification to start_notify. Each dispatched
+    command gets a loop timer; if no matching ACK arrives within
+    ack_timeout it is resent up to max_retries times and then flagged via
+    on_timeout. Every resend re-arms the deadline, so a retry that never
+    goes out (the write failed, or a newer command was already queued)
+    still ends in another retry or a timeout. Commands already superseded
+    by a newer one for the same relay are dropped instead of retried.
+
+    Two histograms are kept: link round trip (write sent -> ACK) and end
+    to end (button event -> ACK). confirmed_states reflects what the
+    board has acknowledged rather than what the UI assumes.
+    """
+
+    def __init__(self, loop, resend, relay_count=4, ack_timeout=DEFAULT_ACK_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, on_ack=None, on_timeout=None):
+        self.loop = loop
+        self.resend = resend
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.on_ack = on_ack
+        self.on_timeout = on_timeout
+
+        self.round_trip = LatencyHistogram()
+        self.end_to_end = LatencyHistogram()
+        self.confirmed_states = [0] * relay_count
+        self.wanted_states = [0] * relay_count
+        self.acked = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.superseded = 0
+        self.unmatched = 0
+
+        self._in_flight = collections.defaultdict(collections.deque)
+
+    @property
+    def in_flight(self):
+        return sum(len(pending) for pending in list(self._in_flight.values()))
+
+    def reset(self):
+        """Forget in-flight commands (e.g. after a disconnect)"""
+        for pending in self._in_flight.values():
+            for entry in pending:
+                if entry.timer:
+                    entry.timer.cancel()
+        self._in_flight.clear()
+        self.confirmed_states = [0] * len(self.confirmed_states)
+        self.wanted_states = [0] * len(self.wanted_states)
+
+    def on_dispatched(self, commands, sent):
+        """Dispatcher hook: the given commands were written at `sent`"""
+        for command in commands:
+            self.wanted_states[command.relay] = command.state
+            pending = self._in_flight[command.relay]
+            if command.retry:
+                entry = next((e for e in pending if e.state == command.state and e.sent is None), None)
+            else:
+                # A new command replaces entries still waiting for their retry to go out
+                entry = None
+                for stale in [e for e in pending if e.sent is None]:
+                    pending.remove(stale)
+                    stale.timer.cancel()
+                    self.superseded += 1
+            if entry is None:
+                entry = _InFlight(command.relay, command.state, command.enqueued, sent)
+                pending.append(entry)
+            else:
+                # This is a retry of an entry we were already tracking
+                entry.sent = sent
+                entry.timer.cancel()
+            entry.timer = self.loop.call_later(self.ack_timeout, self._expire, entry)
+
+    def on_notification(self, sender, data):
+        """start_notify callback: match an ACK to the oldest in-flight command"""
+        ack = parse_ack(data)
+        if ack is None:
+            return
+        now = time.monotonic()
+        relay, state = ack
+        if 0 <= relay < len(self.confirmed_states):
+            self.confirmed_states[relay] = state
+
+        pending = self._in_flight.get(relay)
+        entry = next((e for e in pending if e.state == state), None) if pending else None
+        if entry is None:
+            self.unmatched += 1
+            return
+        pending.remove(entry)
+        if entry.timer:
+            entry.timer.cancel()
+        self.acked += 1
+        if entry.sent is not None:
+            self.round_trip.add(now - entry.sent)
+        self.end_to_end.add(now - entry.enqueued)
+        if self.on_ack:
+            self.on_ack(relay, state)
+
+    def _expire(self, entry):
+        pending = self._in_flight.get(entry.relay)
+        if not pending or entry not in pending:
+            return
+        if self.wanted_states[entry.relay] != entry.state:
+            # A newer command for this relay went out; its ACK is what matters
+            pending.remove(entry)
+            self.superseded += 1
+            return
+        if entry.attempts <= self.max_retries:
+            entry.attempts += 1
+            entry.sent = None
+            self.retries += 1
+            # Armed before resending so a retry that is never written still expires
+            entry.timer = self.loop.call_later(self.ack_timeout, self._expire, entry)
+            self.resend(entry.relay, entry.state)
+            return
+        pending.remove(entry)
+        self.timeouts += 1
+        if self.on_timeout:
+            self.on_timeout(entry.relay, entry.state)
+
+    def metrics(self):
+        summary = self.round_trip.summary()
+        summary.update({
+            "acked": self.acked,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "superseded": self.superseded,
+            "unmatched": self.unmatched,
+            "in_flight": self.in_flight,
+            "end_to_end": self.end_to_end.summary(),
+        })
+        return summary
+
+    def export(self, path):
+        """Write histograms to CSV (bucket rows) or JSON (summaries + buckets)"""
+        if path.lower().endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "round_trip": dict(self.round_trip.summary(), buckets=self.round_trip.buckets()),
+                    "end_to_end": dict(self.end_to_end.summary(), buckets=self.end_to_end.buckets()),
+                    "acked": self.acked, "retries": self.retries, "timeouts": self.timeouts,
+                }, f, indent=2)
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Histogram", "Lower ms", "Upper ms", "Count"])
+            for name, histogram in (("round_trip", self.round_trip), ("end_to_end", self.end_to_end)):
+                for lower, upper, count in histogram.buckets():
+                    writer.writerow([name, f"{lower:.3f}", f"{upper:.3f}", count])
@@ -0,0 +1,197 @@
+import asyncio
+import collections
+import time
+
+# Default bound on queued relay commands
+DEFAULT_MAX_QUEUE = 64
+
+# Number of recent dispatch latencies kept for percentiles
+LATENCY_WINDOW = 1024
+
+# Relays on the ESP32 board
+RELAY_COUNT = 4
+
+
+def encode_command(relay, state):
+    """Single relay command: R<relay_number><state> (R11 = relay 1 ON)"""
+    return f"R{relay + 1}{state}".encode()
+
+
+def encode_frame(states):
+    """Batched frame with every relay state: S<s1><s2>... (S1010 = relays 1 and 3 ON)"""
+    return ("S" + "".join(str(state) for state in states)).encode()
+
+
+class RelayCommand:
+    __slots__ = ("relay", "state", "enqueued", "retry")
+
+    def __init__(self, relay, state, enqueued, retry=False):
+        self.relay = relay
+        self.state = state
+        self.enqueued = enqueued
+        self.retry = retry
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class RelayCommandDispatcher:
+    """Ordered, bounded relay command queue served on an existing event loop
+
+    submit() is safe to call from the Tk thread: it only schedules an
+    append on the loop with call_soon_threadsafe, no thread is spawned.
+    A single consumer task awaits write(payload, response) in FIFO order,
+    so a release can never overtake its press.
+
+    With coalesce, a command for a relay that already has one waiting
+    replaces that command's state in place, so a press and release queued
+    in the same tick collapse to the final state. With batch, everything
+    queued is folded into one S<states> frame per write. response=False
+    uses write-without-response.
+
+    on_dispatched(commands, sent) runs on the loop after each successful
+    write, with sent taken just before the write began (used for ACK
+    tracking); commands queued by resubmit() have retry set.
+
+    When the queue is full, the oldest queued command for the same relay
+    is dropped (the new one supersedes it); if there is none the new
+    command is rejected and counted.
+    """
+
+    def __init__(self, loop, write, max_queue=DEFAULT_MAX_QUEUE, on_error=None,
+                 coalesce=True, batch=False, response=True, relay_count=RELAY_COUNT,
+                 on_dispatched=None):
+        self.loop = loop
+        self.write = write
+        self.max_queue = max_queue
+        self.on_error = on_error
+        self.on_dispatched = on_dispatched
+        self.coalesce = coalesce
+        self.batch = batch
+        self.response = response
+        self.states = [0] * relay_count
+
+        self.dispatched = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+        self._queue = collections.deque()
+        self._wakeup = None
+        self._task = None
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def submit(self, relay, state):
+        """Queue a relay command from any thread"""
+        command = RelayCommand(relay, state, time.monotonic())
+        self.loop.call_soon_threadsafe(self._enqueue, command)
+
+    def resubmit(self, relay, state):
+        """Queue a retry from the loop thread unless a newer command for the relay is waiting"""
+        if any(queued.relay == relay for queued in self._queue):
+            return
+        self._enqueue(RelayCommand(relay, state, time.monotonic(), retry=True))
+
+    def clear(self):
+        """Drop every queued command (e.g. after a disconnect)"""
+        self.loop.call_soon_threadsafe(self._queue.clear)
+
+    def stop(self):
+        if self._task:
+            self.loop.call_soon_threadsafe(self._task.cancel)
+
+    def metrics(self):
+        """Snapshot of queue depth and dispatch latency (milliseconds)"""
+        latencies = list(self.latencies)
+        as_ms = lambda value: None if value is None else value * 1000
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "dispatched": self.dispatched,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "p50_ms": as_ms(percentile(latencies, 50)),
+            "p95_ms": as_ms(percentile(latencies, 95)),
+            "max_ms": as_ms(max(latencies) if latencies else None),
+        }
+
+    def _enqueue(self, command):
+        queue = self._queue
+        if self.coalesce:
+            for queued in queue:
+                if queued.relay == command.relay:
+                    queued.state = command.state
+                    if queued.retry:
+                        # A new press replaces a queued retry: it is timed from now, not the old press
+                        queued.retry = False
+                        queued.enqueued = command.enqueued
+                    self.coalesced += 1
+                    return
+        if len(queue) >= self.max_queue:
+            for queued in queue:
+                if queued.relay == command.relay:
+                    queue.remove(queued)
+                    self.dropped += 1
+                    break
+            else:
+                self.rejected += 1
+                return
+        queue.append(command)
+        self.max_depth = max(self.max_depth, len(queue))
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = self.loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            if not queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self.batch:
+                # Fold everything queued into one frame of all relay states
+                commands = list(queue)
+                queue.clear()
+                states = list(self.states)
+                for command in commands:
+                    states[command.relay] = command.state
+                payload = encode_frame(states)
+            else:
+                commands = [queue.popleft()]
+                payload = encode_command(commands[0].relay, commands[0].state)
+
+            sent = time.monotonic()
+            try:
+                await self.write(payload, self.response)
+            except Exception as e:
+                self.errors += 1
+                if self.on_error:
+                    self.on_error(commands, e)
+                continue
+
+            done = time.monotonic()
+            if self.on_dispatched:
+                self.on_dispatched(commands, sent)
+            self.writes += 1
+            self.dispatched += len(commands)
+            for command in commands:
+                self.states[command.relay] = command.state
+                self.latencies.append(done - command.enqueued)
@@ -0,0 +1,217 @@
+import asyncio
+import time
+
+from relay_ack import AckTracker
+from relay_dispatcher import RelayCommandDispatcher, RELAY_COUNT
+
+# Relay characteristic exposed by the ESP32 firmware
+RELAY_CHAR_UUID = "12345678-1234-1234-1234-123456789abc"
+
+# Connection attempts allowed in flight at once; BLE controllers handle
+# only a few simultaneous connection setups reliably
+DEFAULT_MAX_CONNECTS = 4
+
+# Device status values
+STATUS_IDLE = "idle"
+STATUS_CONNECTING = "connecting"
+STATUS_CONNECTED = "connected"
+STATUS_FAILED = "failed"
+STATUS_DISCONNECTED = "disconnected"
+
+
+class FleetDevice:
+    """One relay board in the fleet: its client, command queue and ACK tracker"""
+
+    def __init__(self, fleet, address, name=None, group=None):
+        self.address = address
+        self.name = name or address
+        self.group = group
+        self.client = None
+        self.status = STATUS_IDLE
+        self.error = None
+        self.connect_seconds = None
+        self.ack_tracker = AckTracker(fleet.loop, self._resend)
+        self.dispatcher = RelayCommandDispatcher(
+            fleet.loop, self._write, on_error=self._on_write_error,
+            on_dispatched=self.ack_tracker.on_dispatched)
+        self._char_uuid = fleet.char_uuid
+
+    @property
+    def connected(self):
+        return bool(self.client and self.client.is_connected)
+
+    async def _write(self, payload, response):
+        if not self.connected:
+            raise ConnectionError(f"{self.address} is not connected")
+        await self.client.write_gatt_char(self._char_uuid, payload, response=response)
+
+    def _resend(self, relay, state):
+        self.dispatcher.resubmit(relay, state)
+
+    def _on_write_error(self, commands, error):
+        self.error = str(error)
+
+
+class RelayFleet:
+    """Many relay boards connected at once on a shared event loop
+
+    Every device keeps its own BleakClient, RelayCommandDispatcher and
+    AckTracker on `loop`, so a broadcast is just one submit per device:
+    each dispatcher's consumer task writes independently and the writes
+    overlap on the radio instead of running back to back. Connects go
+    through a semaphore of max_connects.
+
+    Public methods are thread-safe. connect() and disconnect() return
+    concurrent.futures.Future objects; on_change(device) is called on the
+    loop whenever a device's status changes.
+    """
+
+    def __init__(self, loop, client_cls=None, char_uuid=RELAY_CHAR_UUID,
+                 max_connects=DEFAULT_MAX_CONNECTS, connect_timeout=10.0, on_change=None):
+        self.loop = loop
+        self.client_cls = client_cls
+        self.char_uuid = char_uuid
+        self.max_connects = max_connects
+        self.connect_timeout = connect_timeout
+        self.on_change = on_change
+        self.devices = {}
+        self._connect_slots = None
+
+    def add(self, address, name=None, group=None):
+        """Register a device (no connection yet); returns its FleetDevice"""
+        device = self.devices.get(address)
+        if device is None:
+            device = self.devices[address] = FleetDevice(self, address, name, group)
+        else:
+            if name:
+                device.name = name
+            if group is not None:
+                device.group = group
+        return device
+
+    def set_group(self, address, group):
+        self.devices[address].group = group or None
+
+    @property
+    def groups(self):
+        return sorted({d.group for d in list(self.devices.values()) if d.group})
+
+    def select(self, group=None, addresses=None):
+        """Devices matching a group and/or an address list (all when both are None)"""
+        devices = list(self.devices.values())
+        if addresses is not None:
+            wanted = set(addresses)
+            devices = [d for d in devices if d.address in wanted]
+        if group is not None:
+            devices = [d for d in devices if d.group == group]
+        return devices
+
+    # Connections
+
+    def connect(self, addresses=None):
+        """Connect devices in parallel; Future resolves to {address: error or None}"""
+        devices = self.select(addresses=addresses)
+        return asyncio.run_coroutine_threadsafe(self._connect_many(devices), self.loop)
+
+    async def _connect_many(self, devices):
+        if self._connect_slots is None:
+            self._connect_slots = asyncio.Semaphore(self.max_connects)
+        results = await asyncio.gather(*(self._connect_one(d) for d in devices), return_exceptions=True)
+        return {d.address: (None if r is None else str(r)) for d, r in zip(devices, results)}
+
+    async def _connect_one(self, device):
+        if device.connected:
+            return None
+        async with self._connect_slots:
+            self._set_status(device, STATUS_CONNECTING)
+            start = time.monotonic()
+            try:
+                if self.client_cls is None:
+                    # Deferred so the fleet costs nothing until it is used
+                    from bleak import BleakClient
+                    self.client_cls = BleakClient
+                client = self.client_cls(
+                    device.address, timeout=self.connect_timeout,
+                    disconnected_callback=lambda c, device=device: self._on_disconnected(device))
+                await client.connect()
+                device.client = client
+                device.ack_tracker.reset()
+                await client.start_notify(self.char_uuid, device.ack_tracker.on_notification)
+            except Exception as e:
+                device.error = str(e)
+                self._set_status(device, STATUS_FAILED)
+                raise
+            device.connect_seconds = time.monotonic() - start
+            device.error = None
+            self._set_status(device, STATUS_CONNECTED)
+
+    def disconnect(self, addresses=None):
+        """Disconnect devices in parallel (all of them when addresses is None)"""
+        devices = self.select(addresses=addresses)
+        return asyncio.run_coroutine_threadsafe(self._disconnect_many(devices), self.loop)
+
+    async def _disconnect_many(self, devices):
+        await asyncio.gather(*(self._disconnect_one(d) for d in devices), return_exceptions=True)
+
+    async def _disconnect_one(self, device):
+        device.dispatcher.clear()
+        if device.connected:
+            await device.client.disconnect()
+        self._on_disconnected(device)
+
+    def _on_disconnected(self, device):
+        if device.status == STATUS_DISCONNECTED:
+            return
+        device.ack_tracker.reset()
+        self._set_status(device, STATUS_DISCONNECTED)
+
+    def _set_status(self, device, status):
+        device.status = status
+        if self.on_change:
+            self.on_change(device)
+
+    # Commands
+
+    def send(self, relay, state, group=None, addresses=None):
+        """Fan a relay command out to every connected device in the selection
+
+        Returns the number of devices the command was queued for.
+        """
+        devices = [d for d in self.select(group, addresses) if d.connected]
+        for device in devices:
+            device.dispatcher.submit(relay, state)
+        return len(devices)
+
+    def broadcast(self, relay, state):
+        return self.send(relay, state)
+
+    # Reporting
+
+    def snapshot(self):
+        """Per-device rows for display: status, confirmed states and ACK latency"""
+        rows = []
+        for device in list(self.devices.values()):
+            ack = device.ack_tracker.metrics()
+            rows.append({
+                "address": device.address,
+                "name": device.name,
+                "group": device.group,
+                "status": device.status,
+                "states": list(device.ack_tracker.confirmed_states[:RELAY_COUNT]),
+                "p50_ms": ack["p50_ms"],
+                "p95_ms": ack["p95_ms"],
+                "acked": ack["acked"],
+                "timeouts": ack["timeouts"],
+                "queued": device.dispatcher.depth,
+                "error": device.error,
+            })
+        return rows
+
+    def shutdown(self, timeout=5.0):
+        """Disconnect every device and stop the dispatchers"""
+        try:
+            self.disconnect().result(timeout)
+        except Exception:
+            pass
+        for device in list(self.devices.values()):
+            device.dispatcher.stop()
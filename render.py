@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from capture_store import wall_time
+
+# Hex rendering defaults
+HEX_GROUP_BYTES = 1
+HEXDUMP_WIDTH = 16
+
+# Byte -> ASCII column translation table for hexdump
+_PRINTABLE = bytes(b if 0x20 <= b < 0x7F else 0x2E for b in range(256))
+
+
+def format_timestamp(timestamp):
+    """Render a monotonic capture timestamp as wall-clock HH:MM:SS.mmm"""
+    return datetime.fromtimestamp(wall_time(timestamp)).strftime("%H:%M:%S.%f")[:-3]
+
+
+def format_hex(data, group=HEX_GROUP_BYTES, sep=" "):
+    """Render bytes as upper-case hex, `group` bytes per separated group"""
+    if not group:
+        return data.hex().upper()
+    return data.hex(sep, -group).upper()
+
+
+def hexdump(data, width=HEXDUMP_WIDTH, group=HEX_GROUP_BYTES, offset=0, show_ascii=True):
+    """Render bytes as classic hexdump rows: offset, hex columns, ASCII"""
+    hex_width = width * 2 + (width - 1) // group if group else width * 2
+    if group and width % group:
+        # Rows don't line up with groups; render each row on its own
+        hex_rows = [format_hex(data[i:i + width], group) for i in range(0, len(data), width)]
+    else:
+        # Render the whole buffer once and slice fixed-width rows out of it
+        hex_text = format_hex(data, group)
+        stride = hex_width + 1 if group else hex_width
+        hex_rows = [hex_text[i:i + hex_width] for i in range(0, len(hex_text), stride)]
+
+    if show_ascii:
+        ascii_text = data.translate(_PRINTABLE).decode("ascii")
+        rows = [f"{offset + i * width:08X}  {hex_row:<{hex_width}}  |{ascii_text[i * width:(i + 1) * width]}|"
+                for i, hex_row in enumerate(hex_rows)]
+    else:
+        rows = [f"{offset + i * width:08X}  {hex_row}" for i, hex_row in enumerate(hex_rows)]
+    return "\n".join(rows)
+
+
+def format_payload(data, display_format):
+    """Render raw record bytes as text, hex or hexdump"""
+    if display_format == "hex":
+        return format_hex(data)
+    if display_format == "hexdump":
+        return "\n" + hexdump(data)
+    return data.decode('utf-8', errors='ignore').strip()
+
+
+def format_record(timestamp, data, display_format, label=None):
+    """Render one record as a data monitor line, optionally tagged with its source"""
+    if label is not None:
+        return f"[{format_timestamp(timestamp)}] [{label}] {format_payload(data, display_format)}"
+    return f"[{format_timestamp(timestamp)}] {format_payload(data, display_format)}"
+
+
+def record_line_count(length, display_format):
+    """Lines format_record yields for a `length`-byte payload (one unless hexdump)"""
+    if display_format == "hexdump":
+        return 1 + max(1, -(-length // HEXDUMP_WIDTH))
+    return 1
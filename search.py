@@ -0,0 +1,254 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Pattern kinds offered by the filter bar
+SEARCH_MODES = ["Text", "Regex", "Hex"]
+
+# Records read per capture lock hold by the search and index workers
+SEARCH_CHUNK = 4096
+
+# How often a caught-up worker looks for new records (s)
+FOLLOW_INTERVAL = 0.2
+
+# Keywords are runs of at least three letters, digits or underscores
+KEYWORD_PATTERN = re.compile(rb"\w{3,}")
+
+# Size limits after which the keyword index stops growing and searches scan
+MAX_KEYWORDS = 200000
+MAX_POSTINGS = 16000000
+
+# An index lookup is only used when it leaves fewer than 1/N of the records to read
+CANDIDATE_RATIO = 8
+
+
+class SearchError(ValueError):
+    pass
+
+
+class SearchPattern:
+    """A compiled filter bar pattern, matched against raw record bytes"""
+
+    def __init__(self, regex, literal=None):
+        self.regex = regex
+        self.literal = literal
+        self.search = regex.search
+
+    @property
+    def word(self):
+        """Longest keyword inside a literal pattern, for index lookups"""
+        if self.literal is None:
+            return None
+        words = KEYWORD_PATTERN.findall(self.literal)
+        return max(words, key=len) if words else None
+
+    def matcher(self, source=None):
+        """predicate(timestamp, data, source) for records that match, optionally from one source"""
+        search = self.search
+        if source is None:
+            return lambda timestamp, data, s: search(data) is not None
+        return lambda timestamp, data, s: s == source and search(data) is not None
+
+
+def compile_pattern(text, mode="Text", ignore_case=False):
+    """Compile filter bar input; raises SearchError when it is not valid for the mode"""
+    flags = re.IGNORECASE if ignore_case else 0
+    try:
+        if mode == "Hex":
+            literal = bytes.fromhex(text.replace(" ", "").replace(":", ""))
+        elif mode == "Regex":
+            return SearchPattern(re.compile(text.encode("utf-8"), flags))
+        else:
+            literal = text.encode("utf-8")
+    except re.error as e:
+        raise SearchError(f"Invalid regex: {e}")
+    except ValueError:
+        raise SearchError("Invalid hex bytes")
+    if not literal:
+        raise SearchError("Empty pattern")
+    return SearchPattern(re.compile(re.escape(literal), flags), literal)
+
+
+class KeywordIndex:
+    """Inverted index of the words in captured records, built in the background
+
+    Every keyword (KEYWORD_PATTERN, lowercased) maps to the absolute
+    indexes of the records containing it. A literal search looks up the
+    keywords containing its longest word and reads only those records
+    instead of scanning the whole capture. Past MAX_KEYWORDS distinct
+    keywords or MAX_POSTINGS entries the index stops growing and
+    candidates() returns None, so searches fall back to scanning.
+    """
+
+    def __init__(self, capture, max_keywords=MAX_KEYWORDS, max_postings=MAX_POSTINGS):
+        self.capture = capture
+        self.max_keywords = max_keywords
+        self.max_postings = max_postings
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.clear()
+
+    def clear(self):
+        """Forget everything indexed (after the capture was cleared)"""
+        with self._lock:
+            self._postings = {}
+            self._posting_count = 0
+            self.saturated = False
+            self.indexed = self.capture.first_index
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="keyword-index")
+            self._thread.start()
+
+    def stop(self, join_timeout=1.0):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(join_timeout)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self.saturated or not self._extend(SEARCH_CHUNK):
+                self._stopped.wait(FOLLOW_INTERVAL)
+
+    def _extend(self, count):
+        start = max(self.indexed, self.capture.first_index)
+        records = self.capture.tagged_records(start, start + count)
+        if not records:
+            return False
+        found = {}
+        findall = KEYWORD_PATTERN.findall
+        for index, (timestamp, data, source) in enumerate(records, start):
+            for word in set(findall(bytes(data).lower())):
+                found.setdefault(word, []).append(index)
+
+        with self._lock:
+            if self.indexed > start:
+                return True  # Cleared meanwhile; this chunk is stale
+            postings = self._postings
+            for word, indexes in found.items():
+                entry = postings.get(word)
+                if entry is None:
+                    if len(postings) >= self.max_keywords:
+                        self.saturated = True
+                        break
+                    entry = postings[word] = array("Q")
+                entry.extend(indexes)
+                self._posting_count += len(indexes)
+            if self._posting_count >= self.max_postings:
+                self.saturated = True
+            if self.saturated:
+                self._postings = {}
+                return False
+            self.indexed = start + len(records)
+        return True
+
+    def candidates(self, word):
+        """(records that may contain a bytes word, end of the indexed range); None once saturated"""
+        word = word.lower()
+        with self._lock:
+            if self.saturated:
+                return None
+            found = set()
+            for keyword, indexes in self._postings.items():
+                if word in keyword:
+                    found.update(indexes)
+            return sorted(found), self.indexed
+
+
+class RecordSearch:
+    """Background search of a capture for one pattern
+
+    A worker thread finds matching records oldest first, through the
+    keyword index where that is cheaper and by scanning otherwise, then
+    keeps following new records until cancel(). matches only grows, so
+    the GUI reads count and progress each tick without waiting on it.
+    """
+
+    def __init__(self, capture, pattern, source=None, keyword_index=None):
+        self.capture = capture
+        self.pattern = pattern
+        self.keyword_index = keyword_index
+        self.matcher = pattern.matcher(source)
+        self.matches = array("Q")
+        self.start = capture.first_index
+        self.scanned = self.start
+        self.used_index = False
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="record-search")
+        self.thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def count(self):
+        return len(self.matches)
+
+    @property
+    def caught_up(self):
+        return self.scanned >= self.capture.end_index
+
+    @property
+    def progress(self):
+        """Fraction of the capture searched so far"""
+        first = self.capture.first_index
+        total = self.capture.end_index - first
+        return 1.0 if total <= 0 else max(0.0, min(1.0, (self.scanned - first) / total))
+
+    def next_after(self, index):
+        """First match after a record index, or None"""
+        with self._lock:
+            position = bisect_right(self.matches, index)
+            return self.matches[position] if position < len(self.matches) else None
+
+    def previous_before(self, index):
+        """Last match before a record index, or None"""
+        with self._lock:
+            position = bisect_left(self.matches, index)
+            return self.matches[position - 1] if position else None
+
+    # Worker
+
+    def _run(self):
+        if self.keyword_index is not None and self.pattern.word:
+            self._search_index()
+        while not self._cancelled.is_set():
+            if not self._scan(SEARCH_CHUNK):
+                self._cancelled.wait(FOLLOW_INTERVAL)
+
+    def _search_index(self):
+        found = self.keyword_index.candidates(self.pattern.word)
+        if found is None:
+            return
+        candidates, end = found
+        if (end - self.scanned) < len(candidates) * CANDIDATE_RATIO:
+            return  # Too common a word; a scan reads less
+        matcher = self.matcher
+        for index in candidates:
+            if self._cancelled.is_set():
+                return
+            if index < self.scanned:
+                continue
+            records = self.capture.tagged_records(index, index + 1)
+            if records and matcher(*records[0]):
+                with self._lock:
+                    self.matches.append(index)
+            self.scanned = index + 1
+        self.scanned = max(self.scanned, end)
+        self.used_index = True
+
+    def _scan(self, count):
+        start = max(self.scanned, self.capture.first_index)
+        records = self.capture.tagged_records(start, start + count)
+        if not records:
+            return False
+        matcher = self.matcher
+        found = [index for index, record in enumerate(records, start) if matcher(*record)]
+        with self._lock:
+            self.matches.extend(found)
+        self.scanned = start + len(records)
+        return True
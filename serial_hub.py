@@ -0,0 +1,155 @@
+import collections
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+
+from serial_reader import SerialReader, READER_BLOCKING
+
+# Largest read per wakeup and port
+MAX_CHUNK = 65536
+
+
+class _Port:
+    __slots__ = ("connection", "fd", "on_data", "on_exit")
+
+    def __init__(self, connection, on_data, on_exit):
+        self.connection = connection
+        self.fd = connection.fileno()
+        self.on_data = on_data
+        self.on_exit = on_exit
+
+
+class SerialHub:
+    """One selector thread reading any number of serial ports
+
+    Each port's file descriptor is registered with a selector; the thread
+    sleeps in the kernel until one or more ports are readable and calls
+    on_data(data, timestamp) for each, so 16 ports cost one thread rather
+    than 16. on_exit(error) is called once when a port fails or is
+    removed (error is None for a normal remove).
+
+    add() and remove() are thread-safe: changes are queued and applied by
+    the hub thread, woken through a socket pair. Where ports have no
+    selectable descriptor (Windows), each port falls back to its own
+    blocking SerialReader behind the same interface.
+    """
+
+    def __init__(self, max_chunk=MAX_CHUNK):
+        self.max_chunk = max_chunk
+        self.selectable = sys.platform != "win32"
+        self.running = False
+        self.thread = None
+        self._ports = {}
+        self._readers = {}
+        self._pending = collections.deque()
+        self._selector = None
+        self._wake_r = self._wake_w = None
+
+    def __len__(self):
+        return len(self._ports) + len(self._readers)
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        if self.selectable:
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._wake_r.setblocking(False)
+            self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+            self.thread = threading.Thread(target=self._run, daemon=True, name="serial-hub")
+            self.thread.start()
+        return self
+
+    def add(self, connection, on_data, on_exit=None):
+        """Start reading an open serial port"""
+        if not self.running:
+            self.start()
+        if not self.selectable or not hasattr(connection, "fileno"):
+            self._readers[connection] = SerialReader(connection, on_data, on_exit, mode=READER_BLOCKING).start()
+            return
+        self._pending.append(("add", _Port(connection, on_data, on_exit)))
+        self._wake()
+
+    def remove(self, connection):
+        """Stop reading a port (it is not closed)"""
+        reader = self._readers.pop(connection, None)
+        if reader is not None:
+            reader.stop()
+            return
+        self._pending.append(("remove", connection))
+        self._wake()
+
+    def stop(self, join_timeout=1.0):
+        self.running = False
+        for reader in list(self._readers.values()):
+            reader.stop(join_timeout=0)
+        self._readers.clear()
+        if self.thread:
+            self._wake()
+            if self.thread is not threading.current_thread():
+                self.thread.join(join_timeout)
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (OSError, AttributeError):
+            pass
+
+    def _apply_pending(self):
+        while self._pending:
+            action, item = self._pending.popleft()
+            if action == "add":
+                try:
+                    self._selector.register(item.fd, selectors.EVENT_READ, item)
+                    self._ports[item.fd] = item
+                except (OSError, ValueError) as e:
+                    if item.on_exit:
+                        item.on_exit(e)
+            else:
+                for fd, port in list(self._ports.items()):
+                    if port.connection is item:
+                        self._drop(port, None)
+
+    def _drop(self, port, error):
+        self._ports.pop(port.fd, None)
+        try:
+            self._selector.unregister(port.fd)
+        except (KeyError, ValueError, OSError):
+            pass
+        if port.on_exit:
+            port.on_exit(error)
+
+    def _run(self):
+        selector = self._selector
+        max_chunk = self.max_chunk
+        try:
+            while self.running:
+                self._apply_pending()
+                for key, events in selector.select():
+                    port = key.data
+                    if port is None:
+                        try:
+                            self._wake_r.recv(4096)
+                        except BlockingIOError:
+                            pass
+                        continue
+                    try:
+                        data = os.read(port.fd, max_chunk)
+                    except OSError as e:
+                        self._drop(port, e)
+                        continue
+                    if not data:
+                        # Readable but empty: the device went away
+                        self._drop(port, OSError("serial port disconnected"))
+                        continue
+                    port.on_data(data, time.monotonic())
+        finally:
+            for port in list(self._ports.values()):
+                self._drop(port, None)
+            selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
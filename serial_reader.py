@@ -0,0 +1,115 @@
+import os
+import select
+import sys
+import threading
+import time
+
+import serial
+
+# Reader modes
+READER_POLL = "poll"          # Legacy in_waiting / sleep loop
+READER_BLOCKING = "blocking"  # Blocking read with a timeout
+READER_SELECT = "select"      # select() on the port fd (POSIX only)
+
+READER_MODES = [READER_SELECT, READER_BLOCKING, READER_POLL]
+
+
+def default_reader_mode():
+    """Pick the lowest-latency reader mode available on this platform"""
+    if sys.platform != "win32":
+        return READER_SELECT
+    return READER_BLOCKING
+
+
+class SerialReader:
+    """Background reader that hands received chunks to a callback
+
+    The blocking and select modes sleep in the kernel until bytes arrive
+    instead of waking every 10 ms to check in_waiting.
+    """
+
+    def __init__(self, connection, on_data, on_exit=None, mode=None,
+                 timeout=0.2, poll_interval=0.01, max_chunk=65536):
+        self.connection = connection
+        self.on_data = on_data
+        self.on_exit = on_exit
+        self.mode = mode or default_reader_mode()
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_chunk = max_chunk
+        self.running = False
+        self.thread = None
+
+        if self.mode == READER_SELECT and not hasattr(connection, "fileno"):
+            self.mode = READER_BLOCKING
+
+    def start(self):
+        """Start the reader thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, join_timeout=1.0):
+        """Ask the reader thread to exit and wait for it"""
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(join_timeout)
+
+    def is_alive(self):
+        return bool(self.thread and self.thread.is_alive())
+
+    def _run(self):
+        read_chunk = {
+            READER_POLL: self._read_poll,
+            READER_BLOCKING: self._read_blocking,
+            READER_SELECT: self._read_select,
+        }[self.mode]
+
+        if self.mode == READER_BLOCKING:
+            self.connection.timeout = self.timeout
+
+        error = None
+        try:
+            while self.running and self.connection and self.connection.is_open:
+                data = read_chunk()
+                if data:
+                    self.on_data(data, time.monotonic())
+        except (serial.SerialException, OSError, ValueError, TypeError) as e:
+            # Closing the port from another thread surfaces as one of these
+            if self.running:
+                error = e
+        finally:
+            self.running = False
+            if self.on_exit:
+                self.on_exit(error)
+
+    def _read_poll(self):
+        """Original in_waiting / sleep(0.01) loop"""
+        waiting = self.connection.in_waiting
+        if waiting > 0:
+            return self.connection.read(min(waiting, self.max_chunk))
+        time.sleep(self.poll_interval)
+        return b""
+
+    def _read_blocking(self):
+        """Block for the first byte, then drain whatever else is buffered"""
+        data = self.connection.read(1)
+        if not data:
+            return b""
+        waiting = self.connection.in_waiting
+        if waiting:
+            data += self.connection.read(min(waiting, self.max_chunk))
+        return data
+
+    def _read_select(self):
+        """Wait on the file descriptor and read everything available"""
+        fd = self.connection.fileno()
+        ready, _, _ = select.select([fd], [], [], self.timeout)
+        if not ready:
+            return b""
+        data = os.read(fd, self.max_chunk)
+        if not data:
+            # Readable but empty means the device went away
+            raise serial.SerialException("device reports readiness to read but returned no data")
+        return data
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import sys
+import time
+
+import serial
+
+from serial_reader import SerialReader, READER_BLOCKING, default_reader_mode
+
+# Reader mode that runs the port as an asyncio transport on the I/O loop
+READER_ASYNCIO = "asyncio"
+
+# Largest read per readiness callback
+MAX_CHUNK = 65536
+
+
+def default_serial_mode():
+    """asyncio where the loop can watch the port's descriptor, else a reader thread"""
+    if sys.platform != "win32":
+        return READER_ASYNCIO
+    return default_reader_mode()
+
+
+class SerialProtocol(asyncio.Protocol):
+    """Protocol that timestamps chunks and forwards them to plain callbacks
+
+    on_data(data, timestamp) runs on the loop for every chunk;
+    on_exit(error) runs once when the transport goes away (error is None
+    after a normal close).
+    """
+
+    def __init__(self, on_data, on_exit=None):
+        self.on_data = on_data
+        self.on_exit = on_exit
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.on_data(data, time.monotonic())
+
+    def connection_lost(self, exc):
+        if self.on_exit:
+            self.on_exit(exc)
+
+
+class SerialTransport(asyncio.Transport):
+    """asyncio transport over an open pyserial port
+
+    On POSIX the port's descriptor is watched with loop.add_reader and
+    add_writer, so reading and writing cost no thread of their own and
+    share the loop with BLE. Where the loop cannot watch serial handles
+    (Windows) a blocking SerialReader feeds the loop instead. Like every
+    asyncio transport, methods must be called on the loop thread.
+    """
+
+    def __init__(self, loop, protocol, serial_instance, start_reading=True, max_chunk=MAX_CHUNK):
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self.serial = serial_instance
+        self.max_chunk = max_chunk
+        self._fd = serial_instance.fileno() if sys.platform != "win32" else None
+        self._reader = None
+        self._reading = False
+        self._write_buffer = bytearray()
+        self._closing = False
+        self._lost = False
+
+        if self._fd is not None:
+            os.set_blocking(self._fd, False)
+        loop.call_soon(protocol.connection_made, self)
+        if start_reading:
+            loop.call_soon(self.resume_reading)
+
+    def get_extra_info(self, name, default=None):
+        return {"serial": self.serial}.get(name, default)
+
+    def get_protocol(self):
+        return self._protocol
+
+    def set_protocol(self, protocol):
+        self._protocol = protocol
+
+    def is_closing(self):
+        return self._closing
+
+    # Reading
+
+    def is_reading(self):
+        return self._reading
+
+    def pause_reading(self):
+        if not self._reading:
+            return
+        self._reading = False
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+        elif self._reader:
+            self._reader.stop(join_timeout=0)
+            self._reader = None
+
+    def resume_reading(self):
+        if self._reading or self._closing:
+            return
+        self._reading = True
+        if self._fd is not None:
+            self._loop.add_reader(self._fd, self._read_ready)
+        else:
+            self._reader = SerialReader(self.serial, self._thread_data, self._thread_exit,
+                                        mode=READER_BLOCKING).start()
+
+    def _read_ready(self):
+        try:
+            data = os.read(self._fd, self.max_chunk)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._fatal_error(e)
+            return
+        if not data:
+            # Readable but empty: the device went away
+            self._fatal_error(serial.SerialException("device reports readiness to read but returned no data"))
+            return
+        self._protocol.data_received(data)
+
+    def _thread_data(self, data, timestamp):
+        self._loop.call_soon_threadsafe(self._protocol.data_received, data)
+
+    def _thread_exit(self, error):
+        if error is not None:
+            self._loop.call_soon_threadsafe(self._fatal_error, error)
+
+    # Writing
+
+    def write(self, data):
+        if self._closing or not data:
+            return
+        if self._fd is None:
+            self.serial.write(data)
+            return
+        if not self._write_buffer:
+            try:
+                sent = os.write(self._fd, data)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError as e:
+                self._fatal_error(e)
+                return
+            data = data[sent:]
+            if not data:
+                return
+            self._loop.add_writer(self._fd, self._write_ready)
+        self._write_buffer += data
+
+    def _write_ready(self):
+        try:
+            sent = os.write(self._fd, self._write_buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._fatal_error(e)
+            return
+        del self._write_buffer[:sent]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+            if self._closing:
+                self._loop.call_soon(self._call_connection_lost, None)
+
+    def can_write_eof(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return len(self._write_buffer)
+
+    # Closing
+
+    def close(self):
+        """Close once pending writes are flushed"""
+        if self._closing:
+            return
+        self._closing = True
+        self.pause_reading()
+        if not self._write_buffer:
+            self._loop.call_soon(self._call_connection_lost, None)
+
+    def abort(self):
+        self._abort(None)
+
+    def _fatal_error(self, exc):
+        self._abort(exc)
+
+    def _abort(self, exc):
+        self._closing = True
+        self.pause_reading()
+        if self._write_buffer and self._fd is not None:
+            self._loop.remove_writer(self._fd)
+        self._write_buffer.clear()
+        self._loop.call_soon(self._call_connection_lost, exc)
+
+    def _call_connection_lost(self, exc):
+        if self._lost:
+            return
+        self._lost = True
+        try:
+            self.serial.close()
+        except Exception:
+            pass
+        self._protocol.connection_lost(exc)
+
+
+async def create_serial_connection(loop, protocol_factory, port, start_reading=True, **kwargs):
+    """Open a serial port as an asyncio transport; returns (transport, protocol)
+
+    kwargs go to serial.Serial (baudrate, bytesize, ...).
+    """
+    serial_instance = serial.Serial(port=port, timeout=0, **kwargs)
+    protocol = protocol_factory()
+    transport = SerialTransport(loop, protocol, serial_instance, start_reading=start_reading)
+    return transport, protocol
@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+
+# Per-user folder for remembered devices and settings
+SESSION_DIR = os.path.join(os.path.expanduser("~"), ".bt_serial_app")
+
+
+def session_path(name):
+    return os.path.join(SESSION_DIR, f"{name}.json")
+
+
+def load_session(name):
+    """Return the saved settings dict for `name` ({} if missing or unreadable)"""
+    try:
+        with open(session_path(name), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_session(name, data):
+    """Atomically replace the saved settings for `name`; returns False on failure"""
+    try:
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=SESSION_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, session_path(name))
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,221 @@
+import importlib.util
+import re
+import threading
+import time
+
+# Plotting needs numpy; it is imported only when a buffer is created
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# Numeric fields kept per record; further fields are ignored
+MAX_CHANNELS = 8
+
+# Samples kept per channel: an hour at 1 kHz
+DEFAULT_CAPACITY = 3600 * 1000
+
+# Samples summarised by one precomputed min/max entry; used once a pixel spans a block
+DECIMATION_BLOCK = 64
+
+# A number, optionally named ("T=23.5", "temp: -1.2e3") and with a unit ("3.3V"), that is a
+# whole comma/semicolon/space separated field: digits in "ch1" or "[12:34:56]" are not values
+FIELD_PATTERN = re.compile(
+    rb"(?<![^\s,;])(?:([A-Za-z_]\w*)\s*[=:]\s*)?"
+    rb"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)[A-Za-z%]*(?![^\s,;])")
+
+
+def parse_fields(data, limit=MAX_CHANNELS):
+    """[(name or None, value), ...] for the numeric fields of a record"""
+    fields = []
+    for name, number in FIELD_PATTERN.findall(data):
+        fields.append((name.decode("ascii") if name else None, float(number)))
+        if len(fields) == limit:
+            break
+    return fields
+
+
+class TelemetryBuffer:
+    """Per-channel ring buffers of numeric samples parsed from records
+
+    Each record's numeric fields become one sample per channel (by
+    position), stored as float32 next to one float64 timestamp, so an
+    hour of 8 channels at 1 kHz takes a fixed ~145 MB allocated up
+    front. Every DECIMATION_BLOCK samples a min/max summary is stored as
+    well; once a pixel spans a block or more, decimate() reads the
+    summaries of blocks that fall inside one pixel column, and raw
+    samples only at the window edges and for blocks that cross a column
+    boundary (at most one per column), so drawing an hour costs about
+    the same as drawing a few seconds.
+
+    append() is thread-safe and meant for the receive path; timestamps
+    must not go backwards (they are clamped if they do).
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, channels=MAX_CHANNELS, block=DECIMATION_BLOCK):
+        import numpy as np
+        self.np = np
+        self.block = block
+        self.capacity = -(-capacity // block) * block
+        self.channels = channels
+        self.names = [None] * channels
+        self.channel_count = 0
+        self.times = np.empty(self.capacity, dtype=np.float64)
+        self.values = np.empty((channels, self.capacity), dtype=np.float32)
+        blocks = self.capacity // block
+        self.block_times = np.empty(blocks, dtype=np.float64)
+        self.block_min = np.empty((channels, blocks), dtype=np.float32)
+        self.block_max = np.empty((channels, blocks), dtype=np.float32)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self.count = 0
+            self.last_time = None
+            self.latest = [None] * self.channels
+
+    def append(self, data, timestamp=None):
+        """Parse a record and store its numeric fields; returns the number of channels found"""
+        fields = parse_fields(data, self.channels)
+        if fields:
+            self.append_values(timestamp, fields)
+        return len(fields)
+
+    def append_values(self, timestamp, fields):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        values = [value for name, value in fields]
+        count = len(values)
+        with self._lock:
+            if self.last_time is not None and timestamp < self.last_time:
+                timestamp = self.last_time
+            self.last_time = timestamp
+            self.latest[:count] = values
+            if count > self.channel_count or None in self.names[:count]:
+                for channel, (name, value) in enumerate(fields):
+                    if name and self.names[channel] is None:
+                        self.names[channel] = name
+                self.channel_count = max(self.channel_count, count)
+
+            i = self.count % self.capacity
+            self.times[i] = timestamp
+            self.values[:count, i] = values
+            if count < self.channels:
+                self.values[count:, i] = self.np.nan
+            self.count += 1
+            if self.count % self.block == 0:
+                # Summarise the block just completed
+                b = i // self.block
+                start = b * self.block
+                self.block_times[b] = self.times[start]
+                segment = self.values[:, start:start + self.block]
+                self.block_min[:, b] = self.np.fmin.reduce(segment, axis=1)
+                self.block_max[:, b] = self.np.fmax.reduce(segment, axis=1)
+
+    def channel_name(self, channel):
+        return self.names[channel] or f"ch{channel + 1}"
+
+    # Decimation
+
+    def decimate(self, t0, t1, width):
+        """Per-pixel (min, max) of each channel between t0 and t1
+
+        Returns two float32 arrays of shape (channel_count, width), NaN
+        where a column holds no samples, or None before any sample.
+        """
+        np = self.np
+        with self._lock:
+            channels = self.channel_count
+            if not channels or not self.count or width < 1 or t1 <= t0:
+                return None
+            out_min = np.full((channels, width), np.nan, dtype=np.float32)
+            out_max = np.full((channels, width), np.nan, dtype=np.float32)
+            scale = width / (t1 - t0)
+            head = self.count % self.capacity
+            # Oldest first: the wrapped tail of the ring, then its start
+            if self.count > self.capacity:
+                segments = [(head, self.capacity), (0, head)]
+            else:
+                segments = [(0, head or self.capacity)]
+            for lo, hi in segments:
+                if hi <= lo:
+                    continue
+                times = self.times[lo:hi]
+                start = lo + int(np.searchsorted(times, t0, "left"))
+                stop = lo + int(np.searchsorted(times, t1, "right"))
+                if stop > start:
+                    self._reduce_range(start, stop, channels, t0, scale, width, out_min, out_max)
+        return out_min, out_max
+
+    def _reduce_range(self, start, stop, channels, t0, scale, width, out_min, out_max):
+        block = self.block
+        first_block = -(-start // block)
+        end_block = stop // block
+        if (stop - start) < block * width or end_block <= first_block:
+            self._reduce(self.times[start:stop], self.values[:channels, start:stop],
+                         self.values[:channels, start:stop], t0, scale, width, out_min, out_max)
+            return
+        # Raw samples at the ragged edges, block summaries in between
+        for lo, hi in ((start, first_block * block), (end_block * block, stop)):
+            if hi > lo:
+                self._reduce(self.times[lo:hi], self.values[:channels, lo:hi],
+                             self.values[:channels, lo:hi], t0, scale, width, out_min, out_max)
+        self._reduce_blocks(first_block, end_block, channels, t0, scale, width, out_min, out_max)
+
+    def _reduce_blocks(self, first_block, end_block, channels, t0, scale, width, out_min, out_max):
+        np = self.np
+        block = self.block
+        columns = self._columns(self.block_times[first_block:end_block], t0, scale, width)
+        last_columns = self._columns(self.times[first_block * block + block - 1:end_block * block:block],
+                                     t0, scale, width)
+        crossing = columns != last_columns
+        # One segment per run of blocks inside a column, and one per block crossing a column
+        # boundary; the summaries of the crossing ones are dropped and their samples split instead
+        edges = crossing.copy()
+        edges[1:] |= crossing[:-1]
+        starts = np.flatnonzero((np.diff(columns, prepend=-1) != 0) | edges)
+        inside = ~crossing[starts]
+        used = columns[starts[inside]]
+        low = np.fmin.reduceat(self.block_min[:channels, first_block:end_block], starts, axis=1)
+        high = np.fmax.reduceat(self.block_max[:channels, first_block:end_block], starts, axis=1)
+        out_min[:, used] = np.fmin(out_min[:, used], low[:, inside])
+        out_max[:, used] = np.fmax(out_max[:, used], high[:, inside])
+        if crossing.any():
+            self._split_blocks(first_block + np.flatnonzero(crossing), channels, t0, scale, width,
+                               out_min, out_max)
+
+    def _split_blocks(self, blocks, channels, t0, scale, width, out_min, out_max):
+        """Reduce blocks that cross a column boundary from their samples, each side to its own column"""
+        np = self.np
+        block = self.block
+        columns = self._columns(self.times.reshape(-1, block)[blocks], t0, scale, width)
+        split = np.argmax(columns != columns[:, :1], axis=1)
+        two = columns[:, -1] == columns[np.arange(len(blocks)), split]
+        values = self.values[:channels].reshape(channels, -1, block)
+        # Grouped by split point so each side is a plain slice; two blocks never share a
+        # column on the same side, so `used` has no repeats
+        for point in np.unique(split[two]):
+            group = two & (split == point)
+            part = values[:, blocks[group]]
+            for side, used in ((part[:, :, :point], columns[group, 0]), (part[:, :, point:], columns[group, -1])):
+                out_min[:, used] = np.fmin(out_min[:, used], np.fmin.reduce(side, axis=2))
+                out_max[:, used] = np.fmax(out_max[:, used], np.fmax.reduce(side, axis=2))
+        # Sparse samples can leave a block across three or more columns; those go in raw
+        for b in blocks[~two]:
+            lo = b * block
+            self._reduce(self.times[lo:lo + block], self.values[:channels, lo:lo + block],
+                         self.values[:channels, lo:lo + block], t0, scale, width, out_min, out_max)
+
+    def _columns(self, times, t0, scale, width):
+        np = self.np
+        return np.clip(((times - t0) * scale).astype(np.intp), 0, width - 1)
+
+    def _reduce(self, times, low, high, t0, scale, width, out_min, out_max):
+        np = self.np
+        columns = self._columns(times, t0, scale, width)
+        # Times are sorted, so each column's samples are one contiguous run
+        starts = np.flatnonzero(np.diff(columns, prepend=-1))
+        used = columns[starts]
+        out_min[:, used] = np.fmin(out_min[:, used], np.fmin.reduceat(low, starts, axis=1))
+        out_max[:, used] = np.fmax(out_max[:, used], np.fmax.reduceat(high, starts, axis=1))
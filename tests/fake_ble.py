@@ -0,0 +1,188 @@
+"""In-process stand-in for bleak, used to exercise BLE code without a radio
+
+FakeBackend(peripherals) exposes scanner_cls and client_cls that can be
+passed to BleService (tests) or RelayFleet (benchmarks). Each
+FakePeripheral simulates link latency, GATT services and notifications,
+and can run a write handler (for example the ESP32 relay firmware's
+ACK_R<n><s> reply).
+"""
+import asyncio
+
+
+class FakeCharacteristic:
+    def __init__(self, uuid, properties=("read", "write", "notify")):
+        self.uuid = uuid
+        self.properties = list(properties)
+
+
+class FakeService:
+    def __init__(self, uuid, characteristics):
+        self.uuid = uuid
+        self.characteristics = list(characteristics)
+
+
+class FakeDevice:
+    def __init__(self, address, name):
+        self.address = address
+        self.name = name
+
+
+class FakePeripheral:
+    """Simulated BLE device
+
+    on_write(peripheral, char_uuid, data) may return bytes (or a list of
+    bytes) to send back as notifications on the written characteristic.
+    """
+
+    def __init__(self, address, name="Fake Device", services=None,
+                 connect_delay=0.0, write_delay=0.0, write_nr_delay=0.0, notify_delay=0.0,
+                 on_write=None):
+        self.address = address
+        self.name = name
+        self.services = services or []
+        self.connect_delay = connect_delay
+        self.write_delay = write_delay
+        self.write_nr_delay = write_nr_delay
+        self.notify_delay = notify_delay
+        self.on_write = on_write
+        self.writes = []
+        self.client = None
+
+    async def push(self, char_uuid, data):
+        """Deliver a notification to the connected client, if subscribed"""
+        if self.client is not None:
+            await self.client._deliver(char_uuid, bytearray(data))
+
+
+class FakeBackend:
+    """Bundle of fake scanner/client classes bound to a set of peripherals"""
+
+    def __init__(self, peripherals, scan_delay=0.0, advertise_interval=0.0):
+        self.peripherals = {p.address: p for p in peripherals}
+        backend = self
+
+        class FakeBleakScanner:
+            def __init__(self, detection_callback=None, **kwargs):
+                self.detection_callback = detection_callback
+                self._task = None
+
+            @staticmethod
+            async def discover(timeout=10.0, **kwargs):
+                await asyncio.sleep(min(timeout, scan_delay))
+                return [FakeDevice(p.address, p.name) for p in backend.peripherals.values()]
+
+            async def start(self):
+                self._task = asyncio.ensure_future(self._advertise())
+
+            async def stop(self):
+                if self._task:
+                    self._task.cancel()
+
+            async def _advertise(self):
+                for p in list(backend.peripherals.values()):
+                    await asyncio.sleep(advertise_interval)
+                    if self.detection_callback:
+                        self.detection_callback(FakeDevice(p.address, p.name), FakeAdvertisement(p))
+
+        class FakeBleakClient:
+            def __init__(self, address, disconnected_callback=None, timeout=10.0, **kwargs):
+                self.address = address
+                self.disconnected_callback = disconnected_callback
+                self.is_connected = False
+                self._handlers = {}
+
+            @property
+            def peripheral(self):
+                return backend.peripherals[self.address]
+
+            @property
+            def services(self):
+                return self.peripheral.services
+
+            async def connect(self, **kwargs):
+                if self.address not in backend.peripherals:
+                    raise OSError(f"device {self.address} not found")
+                await asyncio.sleep(self.peripheral.connect_delay)
+                self.peripheral.client = self
+                self.is_connected = True
+                return True
+
+            async def disconnect(self):
+                if self.is_connected:
+                    self.is_connected = False
+                    self.peripheral.client = None
+                    if self.disconnected_callback:
+                        self.disconnected_callback(self)
+                return True
+
+            async def write_gatt_char(self, char_uuid, data, response=None):
+                if not self.is_connected:
+                    raise OSError("not connected")
+                peripheral = self.peripheral
+                # Acknowledged writes wait for the peer; write-without-response doesn't
+                await asyncio.sleep(peripheral.write_nr_delay if response is False else peripheral.write_delay)
+                peripheral.writes.append((char_uuid, bytes(data), response))
+                if peripheral.on_write:
+                    replies = peripheral.on_write(peripheral, char_uuid, bytes(data))
+                    if isinstance(replies, (bytes, bytearray)):
+                        replies = [replies]
+                    for reply in replies or []:
+                        asyncio.get_running_loop().call_later(
+                            peripheral.notify_delay, asyncio.ensure_future, peripheral.push(char_uuid, reply))
+
+            async def start_notify(self, char_uuid, callback, **kwargs):
+                self._handlers[char_uuid] = callback
+
+            async def stop_notify(self, char_uuid):
+                self._handlers.pop(char_uuid, None)
+
+            async def _deliver(self, char_uuid, data):
+                handler = self._handlers.get(char_uuid)
+                if handler is not None:
+                    result = handler(char_uuid, data)
+                    if asyncio.iscoroutine(result):
+                        await result
+
+            def simulate_drop(self):
+                """Pretend the link was lost"""
+                self.is_connected = False
+                self.peripheral.client = None
+                if self.disconnected_callback:
+                    self.disconnected_callback(self)
+
+        self.scanner_cls = FakeBleakScanner
+        self.client_cls = FakeBleakClient
+
+
+class FakeAdvertisement:
+    def __init__(self, peripheral, rssi=-60):
+        self.local_name = peripheral.name
+        self.rssi = rssi
+        self.service_uuids = [service.uuid for service in peripheral.services]
+
+
+
+def relay_peripheral(address, name="ESP32-Relay-Controller", **kwargs):
+    """Fake ESP32 relay board: applies R<n><s> commands and S<s1..s4> frames
+    and answers with one ACK_R<n><s> notification per relay change"""
+    uuid = "12345678-1234-1234-1234-123456789abc"
+
+    def on_write(peripheral, char_uuid, data):
+        command = data.decode("ascii", errors="ignore")
+        if len(command) >= 3 and command[0] == "R":
+            changes = [(int(command[1]), int(command[2]))]
+        elif len(command) >= 5 and command[0] == "S":
+            # Like the firmware: a frame with any bad digit is rejected whole
+            if any(state not in "01" for state in command[1:5]):
+                return []
+            changes = [(i + 1, int(command[i + 1])) for i in range(4)]
+        else:
+            return []
+        for relay, state in changes:
+            peripheral.relay_states[relay - 1] = state
+        return [f"ACK_R{relay}{state}".encode() for relay, state in changes]
+
+    service = FakeService(uuid, [FakeCharacteristic(uuid, ("read", "write", "write-without-response", "notify"))])
+    peripheral = FakePeripheral(address, name, [service], on_write=on_write, **kwargs)
+    peripheral.relay_states = [0, 0, 0, 0]
+    return peripheral
@@ -0,0 +1,119 @@
+"""BleService receive pipeline against the in-process fake bleak backend"""
+import os
+import sys
+import threading
+
+import pytest
+
+from ble_service import BleService, BleServiceError
+from tests.fake_ble import FakeBackend, FakeCharacteristic, FakePeripheral, FakeService
+
+SERVICE_UUID = "0000ffe0-0000-1000-8000-00805f9b34fb"
+DATA_UUID = "0000ffe1-0000-1000-8000-00805f9b34fb"
+ADDRESS = "AA:BB:CC:DD:EE:01"
+
+# Seconds any single service call may take before the test fails
+TIMEOUT = 5.0
+
+
+@pytest.fixture
+def peripheral():
+    service = FakeService(SERVICE_UUID, [FakeCharacteristic(DATA_UUID, ("read", "notify"))])
+    return FakePeripheral(ADDRESS, "Sensor Node", [service])
+
+
+@pytest.fixture
+def service(peripheral):
+    other = FakePeripheral("AA:BB:CC:DD:EE:02", "Headphones")
+    backend = FakeBackend([other, peripheral])
+    service = BleService(backend.scanner_cls, backend.client_cls).start()
+    yield service
+    service.shutdown()
+
+
+def connect(service, address=ADDRESS, disconnected_callback=None):
+    return service.connect(address, disconnected_callback).result(TIMEOUT)
+
+
+def test_discover_stops_at_service_uuid(service):
+    device = service.discover(target="ffe0").result(TIMEOUT)
+    assert device is not None
+    assert device.address == ADDRESS
+    assert device.name == "Sensor Node"
+    assert len(service.cache) == 2
+
+
+def test_subscribe_delivers_notifications(service, peripheral):
+    connect(service)
+    received = []
+    arrived = threading.Event()
+
+    def on_data(data, timestamp):
+        received.append((bytes(data), timestamp))
+        arrived.set()
+
+    char_uuid, characteristics = service.subscribe(ADDRESS, on_data).result(TIMEOUT)
+    assert char_uuid == DATA_UUID
+    assert characteristics == [(SERVICE_UUID, DATA_UUID, ["read", "notify"])]
+
+    service.submit(peripheral.push(DATA_UUID, b"T=23.5\n")).result(TIMEOUT)
+    assert arrived.wait(TIMEOUT)
+    data, timestamp = received[0]
+    assert data == b"T=23.5\n"
+    assert timestamp > 0
+
+
+def test_subscribe_by_service_uuid(service):
+    connect(service)
+    char_uuid, characteristics = service.subscribe(ADDRESS, lambda data, timestamp: None,
+                                                   uuid="FFE0").result(TIMEOUT)
+    assert char_uuid == DATA_UUID
+
+
+def test_subscribe_unknown_uuid_fails(service):
+    connect(service)
+    with pytest.raises(BleServiceError):
+        service.subscribe(ADDRESS, lambda data, timestamp: None,
+                          uuid="12345678-1234-1234-1234-123456789abc").result(TIMEOUT)
+
+
+def test_disconnect(service, peripheral):
+    dropped = threading.Event()
+    connect(service, disconnected_callback=lambda client: dropped.set())
+    assert service.is_connected(ADDRESS)
+
+    service.disconnect(ADDRESS).result(TIMEOUT)
+    assert dropped.wait(TIMEOUT)
+    assert not service.is_connected(ADDRESS)
+    assert peripheral.client is None
+    with pytest.raises(BleServiceError):
+        service.write(ADDRESS, DATA_UUID, b"x").result(TIMEOUT)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a pty")
+def test_open_serial_reads_and_closes(service):
+    import pty
+    master, slave = pty.openpty()
+    received = []
+    arrived = threading.Event()
+    exited = threading.Event()
+
+    def on_data(data, timestamp):
+        received.append(bytes(data))
+        if b"".join(received).endswith(b"\n"):
+            arrived.set()
+
+    try:
+        transport = service.open_serial(os.ttyname(slave), on_data, lambda error: exited.set(),
+                                        baudrate=115200).result(TIMEOUT)
+        os.write(master, b"hello\n")
+        assert arrived.wait(TIMEOUT)
+        assert b"".join(received) == b"hello\n"
+        assert transport in service.transports
+
+        service.close_serial(transport)
+        assert exited.wait(TIMEOUT)
+        assert transport not in service.transports
+    finally:
+        os.close(master)
+        os.close(slave)
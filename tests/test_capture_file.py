@@ -0,0 +1,154 @@
+"""CaptureFile storage, reads across the writer's flushes, and clear() under readers"""
+import os
+import threading
+
+import pytest
+
+from capture_file import CaptureFile, SEGMENTS_PER_LIMIT
+from virtual_log import VirtualLog
+
+
+@pytest.fixture
+def capture(tmp_path):
+    capture = CaptureFile(directory=tmp_path)
+    yield capture
+    capture.close()
+
+
+def fill(capture, count, start=0):
+    for n in range(start, start + count):
+        capture.append(b"record %d" % n, float(n), source=n % 3)
+
+
+def test_reads_span_flushed_and_pending_records(capture):
+    fill(capture, 1000)
+    capture._flush()
+    fill(capture, 500, 1000)
+
+    assert len(capture) == 1500
+    assert capture.get(999) == (999.0, b"record 999")
+    assert capture.get(1000) == (1000.0, b"record 1000")
+    assert capture.tagged_records(998, 1002) == [(float(n), b"record %d" % n, n % 3) for n in range(998, 1002)]
+    assert capture.headers(1499, 1500) == [(1499.0, len(b"record 1499"), 1499 % 3)]
+    assert [data for _, data in capture.iter_records(chunk_size=64)] == [b"record %d" % n for n in range(1500)]
+    assert capture.span(10, 12) == (10, 12, len(b"record 10") + len(b"record 11"))
+    with pytest.raises(IndexError):
+        capture.get(1500)
+
+
+def test_clear_keeps_counting_and_drops_files(capture, tmp_path):
+    fill(capture, 100)
+    capture._flush()
+    capture.clear()
+    assert len(capture) == 0
+    assert capture.first_index == capture.end_index == 100
+    assert capture.records() == []
+    assert os.listdir(tmp_path) == []
+
+    fill(capture, 10, 100)
+    capture._flush()
+    assert capture.first_index == 100
+    assert capture.get(105) == (105.0, b"record 105")
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_clear_while_reader_holds_snapshot(capture):
+    fill(capture, 200000)
+    capture._flush()
+    # What a background reader holds between taking its range and reading it
+    lo, hi, snapshot = capture._range(None, None)
+    capture.clear()
+    fill(capture, 10, 200000)
+    capture._flush()
+
+    records = capture._read(lo, hi, snapshot)
+    assert len(records) == 200000
+    assert records[-1] == (199999.0, b"record 199999", 199999 % 3)
+    assert capture.records() == [(float(n), b"record %d" % n) for n in range(200000, 200010)]
+
+
+def test_clear_under_concurrent_readers(capture):
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            while not stop.is_set():
+                for timestamp, data, source in capture.tagged_records(max(0, capture.end_index - 5000)):
+                    assert data == b"record %d" % timestamp
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    try:
+        for round_ in range(20):
+            fill(capture, 5000, round_ * 5000)
+            capture._flush()
+            capture.clear()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert errors == []
+
+
+def test_size_limit_drops_oldest_segments(tmp_path):
+    capture = CaptureFile(directory=tmp_path, max_bytes=64 * 1024)
+    try:
+        fill(capture, 20000)
+        capture._flush()
+        assert capture.file_size <= 64 * 1024
+        assert sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)) <= 64 * 1024
+        assert len(os.listdir(tmp_path)) <= SEGMENTS_PER_LIMIT
+        assert capture.end_index == 20000
+        assert capture.first_index > 0
+        first = capture.first_index
+        assert capture.records() == [(float(n), b"record %d" % n) for n in range(first, 20000)]
+        assert capture.records(0, first) == []
+    finally:
+        capture.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_age_limit(capture):
+    capture.set_limits(max_age=10.0)
+    for n in range(10000):
+        capture.append(b"x", n / 100)
+    oldest = capture.get(capture.first_index)[0]
+    assert 99.99 - 10.0 - 10.0 / SEGMENTS_PER_LIMIT <= oldest <= 99.99 - 10.0
+
+
+@pytest.mark.parametrize("display_format, predicate", [
+    ("text", None),
+    ("hexdump", None),
+    ("text", lambda timestamp, data, source: source == 1),
+    ("hexdump", lambda timestamp, data, source: source == 1),
+])
+def test_virtual_log_follows_dropped_records(tmp_path, display_format, predicate):
+    capture = CaptureFile(directory=tmp_path, max_bytes=32 * 1024)
+    log = VirtualLog(capture, display_format=display_format, predicate=predicate)
+    try:
+        fill(capture, 500)
+        while log.pending:
+            log.refresh()
+        base = log._base
+        # Indexed as it arrives, like the GUI tick does
+        for start in range(500, 5500, 100):
+            fill(capture, 100, start)
+            while log.pending:
+                log.refresh()
+        assert capture.first_index > 0
+        # Evicted records hide their rows instead of forcing a rebuild
+        assert log._base == base
+        top = log.first_row
+        lines = log.render(top, 3)
+        record, _ = log.locate(top)
+        assert record >= capture.first_index
+        expected = capture.get(record)
+        assert lines[0] == log._lines(expected[0], expected[1], record % 3)[0]
+        assert log.render(0, 3) == lines
+    finally:
+        log.close()
+        capture.close()
@@ -0,0 +1,119 @@
+"""CaptureSession over the fake BLE backend and an asyncio serial transport"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from ble_service import BleService
+from capture_file import CaptureFile
+from capture_session import CaptureSession, EVENT_RECONNECTING, EVENT_RECONNECTED, EVENT_CLOSED
+from framing import make_framer
+from serial_transport import READER_ASYNCIO
+from tests.fake_ble import FakeBackend, FakeCharacteristic, FakePeripheral, FakeService
+
+SERVICE_UUID = "0000ffe0-0000-1000-8000-00805f9b34fb"
+DATA_UUID = "0000ffe1-0000-1000-8000-00805f9b34fb"
+ADDRESS = "AA:BB:CC:DD:EE:01"
+
+# Seconds any single wait may take before the test fails
+TIMEOUT = 5.0
+
+
+@pytest.fixture
+def peripheral():
+    service = FakeService(SERVICE_UUID, [FakeCharacteristic(DATA_UUID, ("read", "notify"))])
+    return FakePeripheral(ADDRESS, "Sensor Node", [service])
+
+
+@pytest.fixture
+def service(peripheral):
+    backend = FakeBackend([peripheral])
+    service = BleService(backend.scanner_cls, backend.client_cls).start()
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CaptureFile(directory=tmp_path)
+    yield store
+    store.close()
+
+
+class Events:
+    """Collects on_event calls and lets a test wait for one"""
+
+    def __init__(self):
+        self.seen = []
+        self.changed = threading.Condition()
+
+    def __call__(self, event, detail):
+        with self.changed:
+            self.seen.append(event)
+            self.changed.notify_all()
+
+    def wait(self, event):
+        with self.changed:
+            return self.changed.wait_for(lambda: event in self.seen, TIMEOUT)
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_ble_session_reconnects_and_keeps_storing(service, peripheral, store):
+    events = Events()
+    session = CaptureSession(make_framer("Line (\\n)"), store=store, on_event=events, reconnect=True)
+    try:
+        assert session.open_ble(ADDRESS, service=service) == DATA_UUID
+        service.submit(peripheral.push(DATA_UUID, b"one\n")).result(TIMEOUT)
+
+        service.call_soon(peripheral.client.simulate_drop)
+        assert events.wait(EVENT_RECONNECTED)
+        service.submit(peripheral.push(DATA_UUID, b"two\n")).result(TIMEOUT)
+        assert [data for _, data in store.records()] == [b"one", b"two"]
+    finally:
+        session.close()
+    assert events.seen[-1] == EVENT_CLOSED
+
+
+def test_close_during_reconnect_releases_the_new_link(service, peripheral, store):
+    events = Events()
+    session = CaptureSession(make_framer("Line (\\n)"), store=store, on_event=events, reconnect=True)
+    session.open_ble(ADDRESS, service=service)
+    peripheral.connect_delay = 0.3
+    service.call_soon(peripheral.client.simulate_drop)
+    assert events.wait(EVENT_RECONNECTING)
+    session.close()
+    # The attempt in flight connects after close() and must let go of the device
+    time.sleep(peripheral.connect_delay)
+    wait_until(lambda: not session.supervisor.active)
+    wait_until(lambda: peripheral.client is None)
+    assert not service.is_connected(ADDRESS)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a pseudo-terminal")
+def test_asyncio_serial_session(service, store):
+    import pty
+    master, slave = pty.openpty()
+    events = Events()
+    session = CaptureSession(make_framer("Line (\\n)"), store=store, on_event=events)
+    try:
+        session.open_serial(os.ttyname(slave), 115200, reader_mode=READER_ASYNCIO, service=service)
+        assert session.connection in service.transports
+        os.write(master, b"alpha\nbeta\n")
+        wait_until(lambda: len(store) == 2)
+        assert [data for _, data in store.records()] == [b"alpha", b"beta"]
+
+        session.close()
+        assert events.wait(EVENT_CLOSED)
+        wait_until(lambda: not service.transports)
+    finally:
+        session.close()
+        os.close(master)
+        os.close(slave)
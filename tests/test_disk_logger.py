@@ -0,0 +1,63 @@
+"""DiskLogger segments and error reporting from the writer thread"""
+import threading
+import time
+
+from disk_logger import DiskLogger, LOG_BINARY, SYNC_NONE, read_binary_records
+
+# Seconds any single wait may take before the test fails
+TIMEOUT = 5.0
+
+
+class FailingFile:
+    """Segment file whose writes and flushes fail, like a full disk"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        raise OSError("write failed")
+
+    def flush(self):
+        raise OSError("flush failed")
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_binary_records_round_trip(tmp_path):
+    logger = DiskLogger(tmp_path, record_format=LOG_BINARY).start()
+    for n in range(100):
+        logger.write(b"record %d" % n, float(n))
+    logger.stop()
+    assert len(logger.segments) == 1
+    with open(logger.segments[0], "rb") as f:
+        assert [data for _, data in read_binary_records(f)] == [b"record %d" % n for n in range(100)]
+
+
+def test_first_write_error_is_reported(tmp_path, monkeypatch):
+    errors = []
+    thread_errors = []
+    monkeypatch.setattr(threading, "excepthook", thread_errors.append)
+    logger = DiskLogger(tmp_path, sync_policy=SYNC_NONE, flush_interval=TIMEOUT, on_error=errors.append).start()
+    logger.write(b"first")
+    wait_until(lambda: logger.records_written == 1)
+    segment = logger._file
+    logger._file = FailingFile(segment)
+
+    logger.write(b"second")
+    logger.stop()
+    # Closing the failed segment fails again; that must not replace the first error
+    assert [str(e) for e in errors] == ["write failed"]
+    assert thread_errors == []
+    assert segment.closed
+    assert logger._file is None
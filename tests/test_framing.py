@@ -0,0 +1,53 @@
+"""Delimiter parsing for the Delimiter framer and the length prefix bound"""
+import pytest
+
+from framing import FramingError, LengthPrefixFramer, make_framer, parse_delimiter
+
+
+@pytest.mark.parametrize("text, delimiter", [
+    # Text that only looks like hex stays text
+    ("ab", b"ab"),
+    ("0D0A", b"0D0A"),
+    ("END", b"END"),
+    ("\\r\\n", b"\r\n"),
+    ("\\x00", b"\x00"),
+    ("\\xab", b"\xab"),
+    ("0x0D0A", b"\r\n"),
+    ("0X0d 0x0a", b"\r\n"),
+    (" 0xAB ", b"\xab"),
+])
+def test_parse_delimiter(text, delimiter):
+    assert parse_delimiter(text) == delimiter
+
+
+@pytest.mark.parametrize("text", ["", "   ", "0x", "0x0D 0A", "0xZZ", "0xABC"])
+def test_parse_delimiter_rejects(text):
+    with pytest.raises(FramingError):
+        parse_delimiter(text)
+
+
+def test_delimiter_framer_splits_on_text():
+    framer = make_framer("Delimiter", "ab")
+    assert framer.feed(b"1ab2ab3", 0.0) == [(0.0, b"1"), (0.0, b"2")]
+
+
+@pytest.mark.parametrize("header_size", [1, 2, 4])
+def test_length_prefix_accepts_frame_filling_max_length(header_size):
+    max_length = 64
+    framer = LengthPrefixFramer(header_size, max_length=max_length)
+    payload = bytes(range(max_length - header_size))
+    data = len(payload).to_bytes(header_size, "big") + payload
+    # Split so the partial frame sits in the buffer at its full size minus one
+    assert framer.feed(data[:-1], 0.0) == []
+    assert framer.feed(data[-1:], 1.0) == [(1.0, payload)]
+    assert framer.errors == 0
+
+
+@pytest.mark.parametrize("header_size", [1, 2, 4])
+def test_length_prefix_rejects_frame_over_max_length(header_size):
+    max_length = 64
+    framer = LengthPrefixFramer(header_size, max_length=max_length)
+    header = (max_length - header_size + 1).to_bytes(header_size, "big")
+    assert framer.feed(header, 0.0) == []
+    assert framer.errors >= 1
+    assert framer.pending < header_size
@@ -0,0 +1,54 @@
+"""ReconnectSupervisor attempts, cancellation and a loop superseded while connecting"""
+import threading
+
+from reconnect import Backoff, ReconnectSupervisor
+
+# Seconds any single wait may take before the test fails
+TIMEOUT = 5.0
+
+
+def test_retries_until_connected():
+    failures = [OSError("busy"), OSError("busy")]
+    recovered = threading.Event()
+
+    def connect(attempt):
+        if failures:
+            raise failures.pop()
+
+    supervisor = ReconnectSupervisor(connect, on_recovered=lambda incident: recovered.set(),
+                                     backoff=Backoff(initial=0.001, jitter=0))
+    supervisor.link_lost("gone")
+    assert recovered.wait(TIMEOUT)
+    assert supervisor.current.attempts == 3
+    assert supervisor.current.outcome == "recovered"
+    assert supervisor.metrics()["recovered"] == 1
+
+
+def test_link_lost_supersedes_cancelled_loop_still_connecting():
+    release = threading.Event()
+    entered = threading.Event()
+    recovered = []
+
+    def connect(attempt):
+        if supervisor.current is first:
+            entered.set()
+            release.wait(TIMEOUT)
+
+    supervisor = ReconnectSupervisor(connect, on_recovered=recovered.append)
+    supervisor.link_lost("first")
+    first = supervisor.current
+    assert entered.wait(TIMEOUT)
+    stuck = supervisor._thread
+    supervisor.cancel()
+
+    # A new loss while the cancelled loop is still inside connect() starts over
+    supervisor.link_lost("second")
+    second = supervisor.current
+    assert second is not first
+    supervisor._thread.join(TIMEOUT)
+    assert recovered == [second]
+
+    release.set()
+    stuck.join(TIMEOUT)
+    assert recovered == [second]
+    assert first.outcome == "cancelled"
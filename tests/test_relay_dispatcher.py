@@ -0,0 +1,208 @@
+"""RelayCommandDispatcher queueing and AckTracker retries, driven on a real event loop"""
+import asyncio
+
+import pytest
+
+from relay_ack import AckTracker
+from relay_dispatcher import RelayCommandDispatcher
+
+# Short enough that a few expiries fit in a test
+ACK_TIMEOUT = 0.05
+
+
+class FakeLink:
+    """Records written payloads; fails the next `fail` writes and waits on `hold` if set"""
+
+    def __init__(self):
+        self.payloads = []
+        self.fail = 0
+        self.hold = None
+
+    async def write(self, payload, response):
+        await asyncio.sleep(0)
+        if self.hold:
+            await self.hold.wait()
+        if self.fail:
+            self.fail -= 1
+            raise OSError("write failed")
+        self.payloads.append(payload)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+
+def settle(loop, seconds=0.0):
+    """Let queued callbacks and the consumer task run"""
+    loop.run_until_complete(asyncio.sleep(seconds))
+    for _ in range(5):
+        loop.run_until_complete(asyncio.sleep(0))
+
+
+def make_pair(loop, link, **options):
+    """Dispatcher and tracker wired the way Relay.py wires them"""
+    errors = []
+    timeouts = []
+    dispatcher = None
+    tracker = AckTracker(loop, lambda relay, state: dispatcher.resubmit(relay, state),
+                         ack_timeout=ACK_TIMEOUT, max_retries=2,
+                         on_timeout=lambda relay, state: timeouts.append((relay, state)))
+    dispatcher = RelayCommandDispatcher(loop, link.write, on_error=lambda commands, e: errors.append(commands),
+                                        on_dispatched=tracker.on_dispatched, **options)
+    return dispatcher, tracker, errors, timeouts
+
+
+def test_commands_go_out_in_order(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link, coalesce=False)
+    for relay, state in ((0, 1), (0, 0), (2, 1)):
+        dispatcher.submit(relay, state)
+    settle(loop)
+    assert link.payloads == [b"R11", b"R10", b"R31"]
+    assert dispatcher.metrics()["dispatched"] == 3
+
+
+def test_coalesce_collapses_queued_commands(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    for state in (1, 0, 1, 0):
+        dispatcher.submit(1, state)
+    dispatcher.submit(3, 1)
+    settle(loop)
+    # Queued in the same tick, a relay's commands collapse to its final state
+    assert link.payloads == [b"R20", b"R41"]
+    assert dispatcher.coalesced == 3
+    # A command behind an in-progress write still collapses with those queued after it
+    link.hold = asyncio.Event()
+    dispatcher.submit(0, 1)
+    settle(loop)
+    dispatcher.submit(0, 0)
+    dispatcher.submit(0, 1)
+    link.hold.set()
+    settle(loop)
+    assert link.payloads == [b"R20", b"R41", b"R11", b"R11"]
+    assert dispatcher.coalesced == 4
+
+
+def test_batch_folds_queue_into_one_frame(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link, batch=True)
+    dispatcher.submit(0, 1)
+    settle(loop)
+    dispatcher.submit(2, 1)
+    dispatcher.submit(3, 1)
+    dispatcher.submit(0, 0)
+    settle(loop)
+    assert link.payloads == [b"S1000", b"S0011"]
+    assert dispatcher.states == [0, 0, 1, 1]
+    assert dispatcher.writes == 2
+    assert dispatcher.dispatched == 4
+
+
+def test_full_queue_drops_same_relay_or_rejects(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link, coalesce=False, max_queue=2)
+    for relay, state in ((0, 1), (1, 1), (0, 0), (2, 1)):
+        dispatcher.submit(relay, state)
+    settle(loop)
+    assert link.payloads == [b"R21", b"R10"]
+    assert dispatcher.dropped == 1
+    assert dispatcher.rejected == 1
+
+
+def test_write_error_drops_command_untracked(loop):
+    link = FakeLink()
+    link.fail = 1
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    dispatcher.submit(1, 1)
+    settle(loop)
+    assert [[(c.relay, c.state) for c in commands] for commands in errors] == [[(0, 1)]]
+    assert link.payloads == [b"R21"]
+    assert dispatcher.errors == 1
+    assert tracker.in_flight == 1
+
+
+def test_ack_matches_command(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    settle(loop)
+    tracker.on_notification(None, b"ACK_R11")
+    assert tracker.acked == 1
+    assert tracker.in_flight == 0
+    assert tracker.confirmed_states[0] == 1
+    settle(loop, ACK_TIMEOUT * 2)
+    assert tracker.retries == 0
+
+
+def test_timeout_retries_then_flags(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    settle(loop, ACK_TIMEOUT * 10)
+    assert link.payloads == [b"R11"] * 3
+    assert tracker.retries == 2
+    assert timeouts == [(0, 1)]
+    assert tracker.in_flight == 0
+
+
+def test_failed_retry_still_times_out(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    settle(loop)
+    link.fail = 10
+    settle(loop, ACK_TIMEOUT * 10)
+    assert link.payloads == [b"R11"]
+    assert dispatcher.errors == 2
+    assert timeouts == [(0, 1)]
+    assert tracker.in_flight == 0
+
+
+def test_skipped_retry_is_superseded(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    settle(loop)
+    # A newer command for relay 1 is stuck behind a slow write when the deadline passes
+    link.hold = asyncio.Event()
+    dispatcher.submit(1, 1)
+    dispatcher.submit(0, 0)
+    settle(loop, ACK_TIMEOUT * 1.5)
+    assert tracker.retries == 1
+    assert dispatcher.depth == 1
+    link.hold.set()
+    settle(loop)
+    assert link.payloads == [b"R11", b"R21", b"R10"]
+    tracker.on_notification(None, b"ACK_R21")
+    tracker.on_notification(None, b"ACK_R10")
+    settle(loop, ACK_TIMEOUT * 4)
+    assert tracker.superseded == 1
+    assert timeouts == []
+    assert tracker.in_flight == 0
+
+
+def test_new_command_does_not_adopt_stale_entry(loop):
+    link = FakeLink()
+    dispatcher, tracker, errors, timeouts = make_pair(loop, link)
+    dispatcher.submit(0, 1)
+    settle(loop)
+    # The retry write fails, leaving the entry waiting for a resend that never went out
+    link.fail = 1
+    settle(loop, ACK_TIMEOUT * 1.5)
+    assert dispatcher.errors == 1
+    dispatcher.submit(0, 1)
+    settle(loop)
+    tracker.on_notification(None, b"ACK_R11")
+    assert tracker.superseded == 1
+    assert tracker.acked == 1
+    assert tracker.in_flight == 0
+    # Timed from the new press, not the first one
+    assert tracker.end_to_end.max < ACK_TIMEOUT
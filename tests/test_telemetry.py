@@ -0,0 +1,74 @@
+"""Record parsing and min/max decimation for the telemetry plot"""
+import pytest
+
+from telemetry import parse_fields
+
+
+@pytest.mark.parametrize("record, fields", [
+    (b"T=23.5,H=41\r\n", [("T", 23.5), ("H", 41.0)]),
+    (b"temp: -1.2e3 v = .5;w=+1e-3", [("temp", -1200.0), ("v", 0.5), ("w", 0.001)]),
+    (b"1 2,3", [(None, 1.0), (None, 2.0), (None, 3.0)]),
+    (b"3.3V 45%", [(None, 3.3), (None, 45.0)]),
+])
+def test_parse_fields(record, fields):
+    assert parse_fields(record) == fields
+
+
+@pytest.mark.parametrize("record, fields", [
+    # Digits inside identifiers are part of the name, not values
+    (b"ch1=5 ch2=6", [("ch1", 5.0), ("ch2", 6.0)]),
+    (b"RX ch3 12", [(None, 12.0)]),
+    (b"0x1F ab12 v2.1 12", [(None, 12.0)]),
+    # Timestamp prefixes are not channels
+    (b"[12:34:56] T=23.5", [("T", 23.5)]),
+    (b"12:34:56.789 T=1;H=2", [("T", 1.0), ("H", 2.0)]),
+    (b"[12:34:56.789] ch1 -0.5", [(None, -0.5)]),
+])
+def test_parse_fields_skips_prefixes(record, fields):
+    assert parse_fields(record) == fields
+
+
+def test_parse_fields_limit():
+    assert parse_fields(b"1 2 3 4", limit=2) == [(None, 1.0), (None, 2.0)]
+
+
+def brute_force(times, values, t0, t1, width):
+    """Per-column fmin/fmax straight from the samples, for comparison"""
+    np = pytest.importorskip("numpy")
+    out_min = np.full((values.shape[0], width), np.nan, dtype=np.float32)
+    out_max = np.full((values.shape[0], width), np.nan, dtype=np.float32)
+    scale = width / (t1 - t0)
+    for t, sample in zip(times, values.T):
+        if t0 <= t <= t1:
+            column = min(width - 1, max(0, int((t - t0) * scale)))
+            out_min[:, column] = np.fmin(out_min[:, column], sample)
+            out_max[:, column] = np.fmax(out_max[:, column], sample)
+    return out_min, out_max
+
+
+@pytest.mark.parametrize("capacity, count", [(4096, 3000), (1024, 3000)])
+@pytest.mark.parametrize("width", [1, 3, 7, 40])
+@pytest.mark.parametrize("gaps", [False, True])
+def test_decimate_matches_brute_force(capacity, count, width, gaps):
+    np = pytest.importorskip("numpy")
+    from telemetry import TelemetryBuffer
+
+    rng = np.random.default_rng(width)
+    steps = rng.uniform(0.0, 0.002, count)
+    if gaps:
+        # Pauses long enough for one block to span several columns
+        steps[::97] = 0.5
+    times = np.cumsum(steps)
+    values = rng.normal(size=(3, count)).astype(np.float32)
+    values[2, ::5] = np.nan
+    buffer = TelemetryBuffer(capacity=capacity, channels=3, block=16)
+    for t, sample in zip(times, values.T):
+        buffer.append_values(t, [(None, float(v)) for v in sample])
+
+    # Only what the ring still holds can be plotted
+    kept = slice(count - len(buffer), count)
+    for t0, t1 in ((times[0], times[-1]), (times[count // 3], times[-200]), (times[-900], times[-1])):
+        low, high = buffer.decimate(t0, t1, width)
+        expected_low, expected_high = brute_force(times[kept], values[:, kept], t0, t1, width)
+        np.testing.assert_array_equal(low, expected_low)
+        np.testing.assert_array_equal(high, expected_high)
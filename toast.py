@@ -0,0 +1,92 @@
+import time
+
+import customtkinter as ctk
+
+from notifications import NotificationQueue
+
+# Text colour per level
+LEVEL_COLORS = {"success": "green", "warning": "orange", "error": "red", "info": "#3b8ed0"}
+
+# Seconds a toast stays up; errors stay longer
+DISPLAY_SECONDS = 3.0
+ERROR_DISPLAY_SECONDS = 5.0
+
+# Shortest time a toast is shown before a waiting one may replace it
+MIN_DISPLAY_SECONDS = 0.8
+
+
+class ToastManager:
+    """Non-modal toasts in one pooled widget, shared by both apps
+
+    One frame and label are created up front and re-configured for every
+    toast, so a burst of errors never creates widgets or stacks timers:
+    repeats are coalesced by NotificationQueue into a counter on the
+    toast already shown, new toasts are rate-limited, and a single
+    root.after timer is pending at most. Call post() on the Tk thread.
+    """
+
+    def __init__(self, root, parent=None, rely=0.1, queue=None):
+        self.root = root
+        self.queue = queue or NotificationQueue()
+        self.rely = rely
+        self.showing = None
+        self.shown_at = 0.0
+        self.hide_at = 0.0
+        self._timer = None
+
+        self.frame = ctk.CTkFrame(parent or root, fg_color=("gray70", "gray25"))
+        self.label = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=12, weight="bold"))
+        self.label.pack(padx=20, pady=10)
+
+    def post(self, message, level="info"):
+        """Show a message without blocking; repeats update the toast in place"""
+        notification = self.queue.post(message, level)
+        if notification is self.showing:
+            self.label.configure(text=notification.text)
+            self.hide_at = max(self.hide_at, time.monotonic() + self._duration(notification))
+            return
+        if self._timer is None:
+            self._schedule(0)
+
+    def _duration(self, notification):
+        return ERROR_DISPLAY_SECONDS if notification.level == "error" else DISPLAY_SECONDS
+
+    def _schedule(self, seconds):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = self.root.after(max(1, int(seconds * 1000)), self._tick)
+
+    def _tick(self):
+        self._timer = None
+        now = time.monotonic()
+        if self.showing is not None and now < self.hide_at:
+            if not len(self.queue) or now < self.shown_at + MIN_DISPLAY_SECONDS:
+                wait = self.hide_at - now if not len(self.queue) else self.shown_at + MIN_DISPLAY_SECONDS - now
+                self._schedule(wait)
+                return
+
+        notification = self.queue.next(now)
+        if notification is not None:
+            self._show(notification, now)
+            self._schedule(MIN_DISPLAY_SECONDS if len(self.queue) else self.hide_at - now)
+            return
+
+        if self.showing is not None and now >= self.hide_at:
+            self._hide()
+        if len(self.queue):
+            self._schedule(self.queue.retry_in(now))
+        elif self.showing is not None:
+            self._schedule(self.hide_at - now)
+
+    def _show(self, notification, now):
+        self.showing = notification
+        self.shown_at = now
+        self.hide_at = now + self._duration(notification)
+        self.label.configure(text=notification.text, text_color=LEVEL_COLORS.get(notification.level, "gray"))
+        self.frame.place(relx=0.5, rely=self.rely, anchor="center")
+        self.frame.lift()
+
+    def _hide(self):
+        self.showing = None
+        self.queue.dismiss()
+        self.frame.place_forget()
@@ -0,0 +1,276 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from render import format_record, record_line_count
+
+# Records examined per refresh() while an index catches up with the capture
+SCAN_BUDGET = 50000
+
+# Records indexed per lock hold by the background indexer
+BACKGROUND_CHUNK = 4096
+
+# Records per entry of the sparse row index used for multi-line formats
+ROW_STRIDE = 64
+
+
+def _single_line(line):
+    return line.replace("\r", "").replace("\n", " ⏎ ")
+
+
+class VirtualLog:
+    """Display rows of a capture, resolved to records only when drawn
+
+    A view asks for row_count and render(top, count); nothing else is
+    formatted. Rows map to records in one of three ways:
+
+    - one row per record (text/hex, no filter): pure arithmetic, no index
+    - hexdump, no filter: a sparse index of cumulative row counts every
+      ROW_STRIDE records, built from record lengths alone
+    - with a predicate(timestamp, data, source): a dense index of the
+      matching records (and their row starts for hexdump)
+
+    Indexes grow incrementally in refresh(), at most SCAN_BUDGET records
+    per call, so a view of a huge capture comes up at once and catches up
+    over a few ticks. With background=True refresh() only wakes an
+    indexer thread instead, so a slow predicate (a regex filter over
+    hours of history) never runs on the GUI thread. history limits how
+    many of the newest rows can be scrolled to.
+
+    Records the capture drops (CaptureFile / CaptureStore limits) keep
+    their row numbers; rows before the oldest retained record are simply
+    no longer shown, so eviction never forces a rebuild.
+    """
+
+    def __init__(self, capture, display_format="text", labels=None, predicate=None, history=None,
+                 background=False):
+        self.capture = capture
+        self.display_format = display_format
+        self.labels = labels
+        self.predicate = predicate
+        self.history = history
+        self.background = background
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._stopped = False
+        self.reset()
+
+    def close(self):
+        """Stop the background indexer (waits for the chunk it is on)"""
+        self._stopped = True
+        self._wake.set()
+        with self._lock:
+            pass
+
+    def configure(self, display_format=None, labels=False, predicate=False, history=False):
+        """Change what is shown; False leaves a setting as it is"""
+        with self._lock:
+            self._configure(display_format, labels, predicate, history)
+        self._wake.set()
+
+    def _configure(self, display_format, labels, predicate, history):
+        rebuild = False
+        if display_format is not None and display_format != self.display_format:
+            rebuild = rebuild or (display_format == "hexdump") != (self.display_format == "hexdump")
+            self.display_format = display_format
+        if labels is not False:
+            self.labels = labels
+        if predicate is not False:
+            self.predicate = predicate
+            rebuild = True
+        if history is not False:
+            self.history = history
+        if rebuild:
+            self.reset()
+
+    def reset(self):
+        """Forget the row index; it is rebuilt by refresh()"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._base = self.capture.first_index
+        self._scanned = self._base
+        self._rows = 0
+        self._block_rows = array("Q")
+        self._matches = array("Q")
+        self._match_rows = array("Q")
+
+    @property
+    def multiline(self):
+        return self.display_format == "hexdump"
+
+    @property
+    def indexed(self):
+        return self.predicate is not None or self.multiline
+
+    @property
+    def pending(self):
+        """True while the index has not caught up with the capture"""
+        return self.indexed and self._scanned < self.capture.end_index
+
+    def refresh(self, budget=SCAN_BUDGET):
+        """Extend the index over newly captured records; returns row_count"""
+        if self.indexed and self.capture.first_index > self._scanned:
+            self.reset()  # Cleared, or dropped past everything indexed
+        if not self.indexed:
+            return self.row_count
+        if self.background:
+            if self.pending:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, daemon=True, name="log-indexer")
+                    self._worker.start()
+                self._wake.set()
+            return self._rows
+        with self._lock:
+            return self._extend(budget)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            while self.pending and not self._stopped:
+                with self._lock:
+                    if self.indexed:
+                        self._extend(BACKGROUND_CHUNK)
+
+    def _extend(self, budget):
+        end = min(self.capture.end_index, self._scanned + budget)
+        if end <= self._scanned:
+            return self._rows
+        fmt = self.display_format
+        if self.predicate is None:
+            # Sparse cumulative rows from lengths; no payload is read
+            rows = self._rows
+            for i, (timestamp, length, source) in enumerate(self.capture.headers(self._scanned, end),
+                                                            self._scanned - self._base):
+                if i % ROW_STRIDE == 0:
+                    self._block_rows.append(rows)
+                rows += record_line_count(length, fmt)
+            self._rows = rows
+        else:
+            predicate = self.predicate
+            multiline = self.multiline
+            for index, (timestamp, data, source) in enumerate(self.capture.tagged_records(self._scanned, end),
+                                                              self._scanned):
+                if predicate(timestamp, data, source):
+                    self._matches.append(index)
+                    if multiline:
+                        self._match_rows.append(self._rows)
+                        self._rows += record_line_count(len(data), fmt)
+                    else:
+                        self._rows += 1
+        self._scanned = end
+        return self._rows
+
+    @property
+    def row_count(self):
+        if self.indexed:
+            return self._rows
+        return self.capture.end_index - self._base
+
+    @property
+    def first_row(self):
+        """Oldest row a view can scroll to: still in the capture and within the history limit"""
+        first = self._retained_row()
+        if self.history is None:
+            return first
+        return max(first, self.row_count - self.history)
+
+    def _retained_row(self):
+        first = self.capture.first_index
+        if first <= self._base:
+            return 0
+        if self.predicate is not None:
+            position = bisect_left(self._matches, first)
+            if not self.multiline:
+                return position
+            return self._match_rows[position] if position < len(self._match_rows) else self._rows
+        if not self.multiline:
+            return first - self._base
+        # Rows are known at block starts only; the oldest whole block left is the first shown
+        block = -(-(first - self._base) // ROW_STRIDE)
+        return self._block_rows[block] if block < len(self._block_rows) else self._rows
+
+    @property
+    def match_count(self):
+        return len(self._matches)
+
+    # Rendering
+
+    def _lines(self, timestamp, data, source):
+        label = self.labels.get(source, source) if self.labels else None
+        line = format_record(timestamp, data, self.display_format, label)
+        if self.multiline:
+            return line.split("\n")
+        return [_single_line(line)]
+
+    def row_of(self, record):
+        """Display row of a record; when filtered, of the first shown record at or after it"""
+        with self._lock:
+            if self.predicate is not None:
+                position = bisect_left(self._matches, record)
+                if position >= len(self._matches):
+                    return max(0, self._rows - 1)
+                return self._match_rows[position] if self.multiline else position
+            if not self.multiline:
+                return record - self._base
+            block = (record - self._base) // ROW_STRIDE
+            if block >= len(self._block_rows):
+                return max(0, self._rows - 1)
+            start = self._base + block * ROW_STRIDE
+            rows = self._block_rows[block]
+            for timestamp, length, source in self.capture.headers(start, record):
+                rows += record_line_count(length, self.display_format)
+            return rows
+
+    def locate(self, row):
+        """(record_index, line_within_record) for a display row"""
+        if self.predicate is not None:
+            if self.multiline:
+                position = bisect_right(self._match_rows, row) - 1
+                return self._matches[position], row - self._match_rows[position]
+            return self._matches[row], 0
+        if not self.multiline:
+            return self._base + row, 0
+        block = bisect_right(self._block_rows, row) - 1
+        start = self._base + block * ROW_STRIDE
+        rows = self._block_rows[block]
+        for index, (timestamp, length, source) in enumerate(
+                self.capture.headers(start, start + ROW_STRIDE), start):
+            count = record_line_count(length, self.display_format)
+            if row < rows + count:
+                return index, row - rows
+            rows += count
+        return start + ROW_STRIDE, 0
+
+    def render(self, top, count):
+        """Lines for rows top..top+count (fewer at the end of the capture)"""
+        with self._lock:
+            return self._render(top, count)
+
+    def _render(self, top, count):
+        total = self.row_count
+        top = max(self.first_row, min(top, total))
+        count = max(0, min(count, total - top))
+        if not count:
+            return []
+        record, skip = self.locate(top)
+
+        if self.predicate is None:
+            if not self.multiline:
+                return [self._lines(*r)[0] for r in self.capture.tagged_records(record, record + count)]
+            # Every hexdump record spans at least two lines
+            lines = []
+            for r in self.capture.tagged_records(record, record + count):
+                lines.extend(self._lines(*r))
+            return lines[skip:skip + count]
+
+        position = bisect_right(self._matches, record) - 1
+        lines = []
+        while len(lines) < skip + count and position < len(self._matches):
+            index = self._matches[position]
+            lines.extend(self._lines(*self.capture.tagged_records(index, index + 1)[0]))
+            position += 1
+        return lines[skip:skip + count]